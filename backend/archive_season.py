@@ -0,0 +1,64 @@
+"""
+Archive the active season and start the next one.
+
+Freezes the final standings, moves the season's fixtures, results,
+predictions and wildcards into the season_archives table (compressed) and
+makes NEXT_SEASON active, leaving the hot tables empty for it. The display
+season name is replaced by NEXT_SEASON. Users, leagues and other settings are
+kept. Same as POST /admin/seasons/archive.
+
+Run from the backend/ directory:
+    python archive_season.py 2026/27          # refuses while fixtures are unscored
+    python archive_season.py 2026/27 --force  # archive anyway
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
+
+from database import SessionLocal
+from seasons import SeasonArchiveError, archive_season, ensure_active_season
+
+
+def main() -> None:
+    args = [a for a in sys.argv[1:] if a != "--force"]
+    if len(args) != 1:
+        print(__doc__)
+        sys.exit(1)
+    next_season, force = args[0], "--force" in sys.argv[1:]
+
+    db = SessionLocal()
+    try:
+        current = ensure_active_season(db)
+        confirm = input(f"Archive {current} and start {next_season} (also the new display name)? [y/N] ").strip().lower()
+        if confirm != "y":
+            print("Aborted.")
+            return
+
+        summary = archive_season(db, next_season, force=force)
+        db.commit()
+        print()
+        print(f"✅  Archived {summary['archived']}")
+        print(f"    Fixtures    : {summary['fixtures']}")
+        print(f"    Predictions : {summary['predictions']}")
+        print(f"    Champion    : {summary['champion'] or '—'}")
+        print(f"    Active now  : {summary['active']}")
+        print(f"    Season name : {summary['season_name']}")
+
+    except SeasonArchiveError as exc:
+        db.rollback()
+        print(f"❌  {exc}")
+        sys.exit(1)
+    except Exception as exc:
+        db.rollback()
+        print(f"Error — rolled back. {exc}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
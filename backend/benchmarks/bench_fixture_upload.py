@@ -0,0 +1,147 @@
+"""
+Benchmark: CSV fixture upload (POST /admin/fixtures/upload) for a 380-row
+season file and a 5,000-row file.
+
+Each size is uploaded twice against a throwaway SQLite database — once into
+an empty table (all inserts) and once more (all updates) — and compared with
+the previous row-by-row upsert (one SELECT per CSV row). SQLite round trips
+are nearly free, so ``--latency-ms`` adds an artificial per-statement delay
+to approximate a remote Postgres such as Supabase.
+
+Run from the backend/ directory:
+    python benchmarks/bench_fixture_upload.py [--latency-ms 2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only-secret")
+_db_path = os.path.join(tempfile.gettempdir(), "rnli_bench_upload.db")
+if os.path.exists(_db_path):
+    os.remove(_db_path)
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from auth import create_access_token, hash_password  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models import Fixture, User  # noqa: E402
+
+
+def make_csv(rows: int) -> str:
+    lines = ["week,date,time,home,away,venue"]
+    start = date(2026, 8, 15)
+    for i in range(rows):
+        week = i % 38 + 1
+        d = start + timedelta(weeks=week - 1)
+        lines.append(f"{week},{d.isoformat()},15:00,Home {i},Away {i},Ground {i % 20}")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_upsert(rows: list[dict]) -> None:
+    """The previous implementation: one SELECT per row, then one commit."""
+    db = SessionLocal()
+    try:
+        for r in rows:
+            existing = (
+                db.query(Fixture)
+                .filter(
+                    Fixture.home_team == r["home_team"],
+                    Fixture.away_team == r["away_team"],
+                    Fixture.gameweek == r["gameweek"],
+                )
+                .first()
+            )
+            if existing:
+                existing.date = r["date"]
+                existing.venue = r["venue"]
+            else:
+                db.add(Fixture(status="scheduled", **r))
+        db.commit()
+    finally:
+        db.close()
+
+
+def parsed_rows(rows: int) -> list[dict]:
+    start = date(2026, 8, 15)
+    out = []
+    for i in range(rows):
+        week = i % 38 + 1
+        out.append({
+            "gameweek": week,
+            "date": start + timedelta(weeks=week - 1),
+            "day": "Sat",
+            "time": "15:00",
+            "home_team": f"Home {i}",
+            "away_team": f"Away {i}",
+            "venue": f"Ground {i % 20}",
+            "kickoff_time": None,
+        })
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="artificial delay added to every SQL statement")
+    args = parser.parse_args()
+
+    if args.latency_ms:
+        delay = args.latency_ms / 1000
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _latency(*_):
+            time.sleep(delay)
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        admin = User(username="bench_admin", email="bench@example.com",
+                     password_hash=hash_password("benchmark"), role="admin")
+        db.add(admin)
+        db.commit()
+        header = {"Authorization": "Bearer " + create_access_token(
+            data={"sub": admin.id, "email": admin.email, "role": admin.role})}
+        db.close()
+
+        print(f"Simulated latency per statement: {args.latency_ms} ms")
+        for size in (380, 5000):
+            csv_text = make_csv(size).encode("utf-8")
+            for phase in ("insert", "update"):
+                db = SessionLocal()
+                if phase == "insert":
+                    db.query(Fixture).delete()
+                    db.commit()
+                db.close()
+                start = time.perf_counter()
+                resp = client.post(
+                    "/admin/fixtures/upload",
+                    files={"file": ("bench.csv", csv_text, "text/csv")},
+                    headers=header,
+                )
+                elapsed = (time.perf_counter() - start) * 1000
+                body = resp.json()
+                print(f"\n{size:>5} rows, {phase:<6} — set-based: {elapsed:8.1f} ms "
+                      f"(inserted {body['inserted']}, updated {body['updated']})")
+                print(f"      phases: {body['timings_ms']}")
+
+                db = SessionLocal()
+                if phase == "insert":
+                    db.query(Fixture).delete()
+                    db.commit()
+                db.close()
+                rows = parsed_rows(size)
+                start = time.perf_counter()
+                legacy_upsert(rows)
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"      row-by-row (previous): {elapsed:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
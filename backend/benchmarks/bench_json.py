@@ -0,0 +1,97 @@
+"""
+Benchmark: JSON encode time for a 1,000-player leaderboard and a full
+380-fixture season list.
+
+Compares the old path (FastAPI's jsonable_encoder + stdlib json, with
+per-row .isoformat() calls) against FastJSONResponse (orjson, native
+date/datetime handling, no jsonable_encoder pass).
+
+Run from the backend/ directory:
+    python benchmarks/bench_json.py
+"""
+import os
+import sys
+import timeit
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import FastJSONResponse, JSON_BACKEND
+
+PLAYERS = 1000
+FIXTURES = 380
+REPEAT = 20
+
+
+def make_leaderboard(players: int) -> dict:
+    rows = []
+    for i in range(players):
+        row = {"player": f"player_{i:04d}", "exact_scores": i % 17}
+        total = 0
+        for week in range(1, 39):
+            pts = (i * week) % 23
+            row[f"week_{week}"] = pts
+            total += pts
+        row["total"] = total
+        row["rank"] = i + 1
+        rows.append(row)
+    return {"leaderboard": rows, "version": 1234}
+
+
+def make_fixtures(count: int, *, as_strings: bool) -> dict:
+    start = date(2025, 8, 16)
+    rows = []
+    for i in range(count):
+        d = start + timedelta(days=(i // 10) * 7)
+        kickoff = datetime.combine(d, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=15)
+        rows.append({
+            "id": i + 1,
+            "gameweek": i // 10 + 1,
+            "date": d.isoformat() if as_strings else d,
+            "day": d.strftime("%a"),
+            "time": "15:00",
+            "home_team": f"Home {i % 20}",
+            "away_team": f"Away {(i + 7) % 20}",
+            "venue": f"Stadium {i % 20}",
+            "kickoff_time": kickoff.isoformat() if as_strings else kickoff,
+            "status": "scheduled",
+        })
+    return {"fixtures": rows}
+
+
+def old_path(payload: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def new_path(payload: dict) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def bench(label: str, fn, payload) -> float:
+    best = min(timeit.repeat(lambda: fn(payload), number=1, repeat=REPEAT))
+    print(f"  {label:<38} {best * 1000:8.2f} ms")
+    return best
+
+
+def main() -> None:
+    print(f"JSON backend: {JSON_BACKEND} (best of {REPEAT})")
+
+    board = make_leaderboard(PLAYERS)
+    print(f"\nLeaderboard — {PLAYERS} players x 38 weeks")
+    old = bench("jsonable_encoder + stdlib json", old_path, board)
+    new = bench("FastJSONResponse", new_path, board)
+    print(f"  speed-up: {old / new:.1f}x")
+
+    print(f"\nFixtures — {FIXTURES} rows")
+    old = bench(".isoformat() + jsonable_encoder + json",
+                lambda _: old_path(make_fixtures(FIXTURES, as_strings=True)), None)
+    new = bench("native dates + FastJSONResponse",
+                lambda _: new_path(make_fixtures(FIXTURES, as_strings=False)), None)
+    print(f"  speed-up: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
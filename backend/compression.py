@@ -0,0 +1,180 @@
+"""
+Response compression.
+
+Two pieces:
+
+* ``CompressionMiddleware`` — gzip (or brotli, when a brotli module is
+  installed and the client accepts it) for any JSON/text response whose body
+  is at least ``COMPRESSION_MIN_SIZE`` bytes. Streaming responses and bodies
+  that already carry a Content-Encoding pass through untouched.
+* ``PrecompressedBody`` — a serialised body that remembers its compressed
+  variants. Cached public responses (e.g. the leaderboard) keep one of these
+  alongside the cache entry so each encoding is computed once per cache
+  entry instead of once per request.
+
+Bytes in/out are tracked in ``metrics`` under ``compression.*``.
+"""
+import gzip
+import os
+import threading
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+
+from metrics import metrics
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(token)
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Pick the best encoding we support from an Accept-Encoding header."""
+    accepted = _accepted_encodings(accept_encoding or "")
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _is_compressible(content_type: str | None) -> bool:
+    return bool(content_type) and content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+def _record(original: int, sent: int) -> None:
+    metrics.incr("compression.responses")
+    metrics.incr("compression.bytes_in", original)
+    metrics.incr("compression.bytes_out", sent)
+    metrics.incr("compression.bytes_saved", original - sent)
+
+
+class PrecompressedBody:
+    """A cached response body plus its lazily-built compressed variants."""
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body = body
+        self.media_type = media_type
+        self._variants: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding: str) -> bytes:
+        with self._lock:
+            data = self._variants.get(encoding)
+            if data is None:
+                data = compress(self.body, encoding)
+                self._variants[encoding] = data
+                metrics.incr("compression.cache_variant_builds")
+            else:
+                metrics.incr("compression.cache_variant_hits")
+            return data
+
+    def to_response(self, request: Request) -> Response:
+        """Build a response, using a stored compressed variant when possible."""
+        headers = {"Vary": "Accept-Encoding"}
+        content = self.body
+        if len(self.body) >= COMPRESSION_MIN_SIZE:
+            encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+            if encoding is not None:
+                data = self.variant(encoding)
+                if len(data) < len(self.body):
+                    content = data
+                    headers["Content-Encoding"] = encoding
+                    _record(len(self.body), len(data))
+        return Response(content=content, media_type=self.media_type, headers=headers)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing single-chunk JSON/text responses."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough or self.start_message is None:
+            await self.send(message)
+            return
+
+        # First body chunk: decide once whether this response gets compressed.
+        self.passthrough = True
+        body = message.get("body", b"")
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if (
+            "content-encoding" in headers
+            or message.get("more_body", False)
+            or not _is_compressible(headers.get("content-type"))
+        ):
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if len(body) >= self.minimum_size:
+            compressed = compress(body, self.encoding)
+            if len(compressed) < len(body):
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(compressed))
+                _record(len(body), len(compressed))
+                body = compressed
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": body})
@@ -0,0 +1,170 @@
+"""
+Per-fixture prediction consensus: home/draw/away split, scoreline histogram
+and average goals.
+
+Rather than scanning every prediction for a fixture on request, one
+``PredictionConsensus`` row per fixture is adjusted in the same transaction as
+the prediction write: ``apply_prediction_changes`` takes (old score, new
+score) pairs and moves the counters, taking a row lock first so concurrent
+submissions for the same fixture can't lose an update.
+
+Paths that change many predictions at once (user deletes, resets, the
+simulator) call ``rebuild_consensus`` instead, which recomputes the rows from
+one grouped query. Migrations use it to backfill existing databases.
+"""
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import Prediction, PredictionConsensus
+
+Score = tuple[int, int]
+
+TOP_SCORELINES = 3
+
+_OUTCOME_COLUMNS = {1: "home_wins", 0: "draws", -1: "away_wins"}
+
+
+def _outcome_column(score: Score) -> str:
+    home, away = score
+    return _OUTCOME_COLUMNS[(home > away) - (home < away)]
+
+
+_EMPTY_ROW = {
+    "predictions": 0, "home_wins": 0, "draws": 0, "away_wins": 0,
+    "home_goals": 0, "away_goals": 0, "scorelines": {},
+}
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _create_missing_rows(db: Session, fixture_ids: list[int]) -> None:
+    """Make sure every fixture has a consensus row, tolerating concurrent creators."""
+    dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        # No portable upsert; fall back to inserting whatever is missing now.
+        present = set(db.scalars(
+            select(PredictionConsensus.fixture_id).where(PredictionConsensus.fixture_id.in_(fixture_ids))
+        ))
+        missing = [{"fixture_id": fid, **_EMPTY_ROW} for fid in fixture_ids if fid not in present]
+        if missing:
+            db.execute(insert(PredictionConsensus), missing)
+        return
+    db.execute(
+        dialect_insert(PredictionConsensus)
+        .values([{"fixture_id": fid, **_EMPTY_ROW} for fid in fixture_ids])
+        .on_conflict_do_nothing(index_elements=["fixture_id"])
+    )
+
+
+def apply_prediction_changes(
+    db: Session,
+    changes: Iterable[tuple[int, Optional[Score], Optional[Score]]],
+) -> None:
+    """
+    Adjust consensus rows for ``(fixture_id, old_score, new_score)`` changes;
+    ``old_score`` is None for a new prediction, ``new_score`` None for a
+    removed one. Does NOT commit.
+    """
+    by_fixture = defaultdict(list)
+    for fixture_id, old, new in changes:
+        if old != new:
+            by_fixture[fixture_id].append((old, new))
+    if not by_fixture:
+        return
+
+    # Sorted so concurrent multi-fixture writers lock rows in the same order.
+    fixture_ids = sorted(by_fixture)
+    _create_missing_rows(db, fixture_ids)
+    rows = {
+        row.fixture_id: row
+        for row in db.scalars(
+            select(PredictionConsensus)
+            .where(PredictionConsensus.fixture_id.in_(fixture_ids))
+            .order_by(PredictionConsensus.fixture_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+    }
+    for fixture_id, pairs in by_fixture.items():
+        row = rows[fixture_id]
+        scorelines = dict(row.scorelines or {})
+        for old, new in pairs:
+            for score, step in ((old, -1), (new, 1)):
+                if score is None:
+                    continue
+                key = f"{score[0]}-{score[1]}"
+                count = scorelines.get(key, 0) + step
+                if count > 0:
+                    scorelines[key] = count
+                else:
+                    scorelines.pop(key, None)
+                column = _outcome_column(score)
+                setattr(row, column, getattr(row, column) + step)
+                row.predictions += step
+                row.home_goals += step * score[0]
+                row.away_goals += step * score[1]
+        # Assign a new dict so the JSON column is seen as changed.
+        row.scorelines = scorelines
+
+
+def rebuild_consensus(db: Session, fixture_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute consensus rows for ``fixture_ids`` (every fixture if None) from
+    the predictions table. Returns the number of rows written. Does NOT commit.
+    """
+    ids = None if fixture_ids is None else list(set(fixture_ids))
+    if ids is not None and not ids:
+        return 0
+
+    query = (
+        select(Prediction.fixture_id, Prediction.predicted_home, Prediction.predicted_away, func.count())
+        .group_by(Prediction.fixture_id, Prediction.predicted_home, Prediction.predicted_away)
+    )
+    clear = delete(PredictionConsensus)
+    if ids is not None:
+        query = query.where(Prediction.fixture_id.in_(ids))
+        clear = clear.where(PredictionConsensus.fixture_id.in_(ids))
+
+    rows: dict[int, dict] = {}
+    for fixture_id, home, away, count in db.execute(query):
+        row = rows.setdefault(fixture_id, {
+            "fixture_id": fixture_id, "predictions": 0, "home_wins": 0, "draws": 0,
+            "away_wins": 0, "home_goals": 0, "away_goals": 0, "scorelines": {},
+        })
+        row[_outcome_column((home, away))] += count
+        row["predictions"] += count
+        row["home_goals"] += home * count
+        row["away_goals"] += away * count
+        row["scorelines"][f"{home}-{away}"] = count
+
+    db.execute(clear)
+    if rows:
+        db.execute(insert(PredictionConsensus), list(rows.values()))
+    return len(rows)
+
+
+def consensus_summary(row: Optional[PredictionConsensus]) -> dict:
+    """The API shape for one fixture's consensus (zeros when nobody predicted)."""
+    total = row.predictions if row is not None else 0
+    counts = {
+        "home": row.home_wins if row is not None else 0,
+        "draw": row.draws if row is not None else 0,
+        "away": row.away_wins if row is not None else 0,
+    }
+    scorelines = dict(row.scorelines or {}) if row is not None else {}
+    top = sorted(scorelines.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_SCORELINES]
+    return {
+        "predictions": total,
+        "outcomes": counts,
+        "outcome_pct": {k: round(100 * v / total, 1) if total else 0.0 for k, v in counts.items()},
+        "top_scorelines": [{"score": score, "count": count} for score, count in top],
+        "average_goals": {
+            "home": round(row.home_goals / total, 2) if total else None,
+            "away": round(row.away_goals / total, 2) if total else None,
+        },
+        "scorelines": scorelines,
+    }
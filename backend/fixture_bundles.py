@@ -0,0 +1,145 @@
+"""
+Precomputed fixture lists, served from memory.
+
+``/fixtures`` is called with just ``?gameweek=N`` (or nothing, for the whole
+season) by the fixtures and predictions pages, and the answer only changes
+when an admin edits fixtures. The 38 gameweek bundles and the season list are
+therefore kept as ready-to-send ``PrecompressedBody`` bytes. A cold cache is
+filled from one season query; afterwards the admin fixture routes call
+``invalidate`` with the gameweeks they touched, and only those bundles (plus
+the season list) are rebuilt, on next request.
+
+Each request still reads a one-row stamp (fixture count, max id, max
+``updated_at``). If it moved without an ``invalidate`` — another worker, a
+script, raw SQL — every bundle is dropped, as with the standings cache.
+
+Only the season list and gameweeks 1-38 are ever kept, whatever gameweek a
+request names, so the cache can't be grown by walking ``?gameweek=N``.
+
+Hits, misses and drops are counted under ``fixture_bundles.*`` in metrics.
+"""
+import threading
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from compression import PrecompressedBody
+from metrics import metrics
+from models import Fixture
+from responses import dumps
+
+SEASON = None  # bundle key for the full season list
+GAMEWEEKS = range(1, 39)
+
+
+def fixture_row(f: Fixture) -> dict:
+    """The public fixtures API shape. Dates stay as objects; the JSON layer
+    renders them as ISO strings."""
+    return {
+        "id": f.id,
+        "gameweek": f.gameweek,
+        "date": f.date,
+        "day": f.day,
+        "time": f.time,
+        "home_team": f.home_team,
+        "away_team": f.away_team,
+        "home_team_id": f.home_team_id,
+        "away_team_id": f.away_team_id,
+        "venue": f.venue,
+        "kickoff_time": f.kickoff_time,
+        "status": f.status,
+    }
+
+
+def _ordered_fixtures(db: Session, gameweek: Optional[int]) -> list[Fixture]:
+    query = db.query(Fixture)
+    if gameweek is not None:
+        query = query.filter(Fixture.gameweek == gameweek)
+    return query.order_by(Fixture.gameweek, Fixture.date, Fixture.time).all()
+
+
+def _bundle(rows: list[dict]) -> PrecompressedBody:
+    return PrecompressedBody(dumps({"fixtures": rows}))
+
+
+def _read_stamp(db: Session) -> tuple:
+    return tuple(db.execute(
+        select(func.count(Fixture.id), func.max(Fixture.id), func.max(Fixture.updated_at))
+    ).one())
+
+
+class FixtureBundles:
+    """Thread-safe map of gameweek (or ``SEASON``) → serialised fixture list."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._bundles: dict[Optional[int], PrecompressedBody] = {}
+
+    def get(self, db: Session, gameweek: Optional[int] = SEASON) -> PrecompressedBody:
+        stamp = _read_stamp(db)
+        with self._lock:
+            if stamp != self._stamp:
+                if self._bundles:
+                    metrics.incr("fixture_bundles.stale_drops")
+                self._bundles.clear()
+                self._stamp = stamp
+
+            body = self._bundles.get(gameweek)
+            if body is not None:
+                metrics.incr("fixture_bundles.hits")
+            else:
+                metrics.incr("fixture_bundles.misses")
+                if not self._bundles:
+                    self._build_all(db)
+                body = self._bundles.get(gameweek)
+                if body is None:
+                    body = _bundle([fixture_row(f) for f in _ordered_fixtures(db, gameweek)])
+                    if gameweek is SEASON or gameweek in GAMEWEEKS:
+                        self._bundles[gameweek] = body
+            self._record_hit_rate()
+            return body
+
+    def _build_all(self, db: Session) -> None:
+        """Fill every bundle from one ordered season query."""
+        season = [fixture_row(f) for f in _ordered_fixtures(db, SEASON)]
+        by_gameweek: dict[int, list[dict]] = {gw: [] for gw in GAMEWEEKS}
+        for row in season:
+            if row["gameweek"] in by_gameweek:
+                by_gameweek[row["gameweek"]].append(row)
+        self._bundles[SEASON] = _bundle(season)
+        for gw, rows in by_gameweek.items():
+            self._bundles[gw] = _bundle(rows)
+        metrics.incr("fixture_bundles.full_builds")
+
+    def invalidate(self, db: Session, gameweeks: Optional[Iterable[int]] = None) -> None:
+        """
+        Drop the bundles for ``gameweeks`` (all bundles if None) and the season
+        list. Call after the commit, so the recorded stamp includes the change
+        and other gameweeks stay cached.
+        """
+        stamp = _read_stamp(db)
+        with self._lock:
+            if gameweeks is None:
+                self._bundles.clear()
+            else:
+                for gw in set(gameweeks):
+                    self._bundles.pop(gw, None)
+                self._bundles.pop(SEASON, None)
+            self._stamp = stamp
+            metrics.incr("fixture_bundles.invalidations")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bundles.clear()
+            self._stamp = None
+
+    def _record_hit_rate(self) -> None:
+        hits = metrics.get("fixture_bundles.hits")
+        total = hits + metrics.get("fixture_bundles.misses")
+        if total:
+            metrics.set_gauge("fixture_bundles.hit_rate", round(hits / total, 4))
+
+
+fixture_bundles = FixtureBundles()
@@ -0,0 +1,134 @@
+"""
+Process-local index of fixture lock state for prediction submission.
+
+``submit_prediction`` used to load the Fixture row (normalising its kickoff
+timezone every time) and then look for a Result on every call. On deadline
+day that is thousands of identical lookups, so this index keeps
+
+    fixture_id → LockState(kickoff epoch, has_result, status, gameweek)
+
+loaded from one fixtures ⟕ results query, and a lock check becomes a dict
+lookup and an integer comparison.
+
+Consistency:
+
+* the result and admin fixture routes call ``invalidate`` after they commit,
+  so this process never serves a lock state it knows is out of date;
+* a fixture missing from the index (added by another worker, a script, raw
+  SQL) is read from the database and added;
+* the whole index is reloaded once it is ``FIXTURE_LOCK_INDEX_TTL_SECONDS``
+  old, which bounds how long another worker's edits can go unnoticed;
+* a fixture with no kickoff time and no result is always confirmed against
+  the database. For every other fixture the result routes refuse a result
+  before kickoff, so the kickoff comparison already locks it; without a
+  kickoff the result is the only gate and must not be missed.
+
+Hits, misses, reloads and confirmations are counted under ``fixture_locks.*``
+in metrics.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from metrics import metrics
+from models import Fixture, Result
+
+FIXTURE_LOCK_INDEX_TTL_SECONDS = float(os.getenv("FIXTURE_LOCK_INDEX_TTL_SECONDS", "30"))
+
+
+class LockState(NamedTuple):
+    kickoff: Optional[int]  # UTC epoch seconds; None means never kickoff-locked
+    has_result: bool
+    status: str
+    gameweek: int
+
+    def kickoff_passed(self, now: Optional[int] = None) -> bool:
+        if self.kickoff is None:
+            return False
+        return (int(time.time()) if now is None else now) >= self.kickoff
+
+
+def kickoff_epoch(kickoff: Optional[datetime]) -> Optional[int]:
+    """
+    kickoff_time is stored as UTC-aware by _parse_kickoff, but rows that
+    pre-date that fix may still carry a naive value (SQLite migration path).
+    Naive values are treated as UTC by attaching the zone, never by stripping
+    it from "now".
+    """
+    if kickoff is None:
+        return None
+    if kickoff.tzinfo is None:
+        kickoff = kickoff.replace(tzinfo=timezone.utc)
+    return int(kickoff.timestamp())
+
+
+def _load(db: Session, fixture_ids: Optional[list[int]] = None) -> dict[int, LockState]:
+    query = (
+        select(Fixture.id, Fixture.kickoff_time, Fixture.status, Fixture.gameweek, Result.id)
+        .outerjoin(Result, Result.fixture_id == Fixture.id)
+    )
+    if fixture_ids is not None:
+        query = query.where(Fixture.id.in_(fixture_ids))
+    return {
+        fixture_id: LockState(kickoff_epoch(kickoff), result_id is not None, status, gameweek)
+        for fixture_id, kickoff, status, gameweek, result_id in db.execute(query)
+    }
+
+
+class FixtureLockIndex:
+    """Thread-safe fixture_id → ``LockState`` map with a DB fallback."""
+
+    def __init__(self, ttl: float = FIXTURE_LOCK_INDEX_TTL_SECONDS):
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._loaded_at: Optional[float] = None
+        self._states: dict[int, LockState] = {}
+
+    def get(self, db: Session, fixture_id: int) -> Optional[LockState]:
+        """Lock state for ``fixture_id``, or None if the fixture doesn't exist."""
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self._ttl:
+                self._states = _load(db)
+                self._loaded_at = time.monotonic()
+                metrics.incr("fixture_locks.reloads")
+            state = self._states.get(fixture_id)
+
+        if state is not None and (state.kickoff is not None or state.has_result):
+            metrics.incr("fixture_locks.hits")
+            return state
+
+        if state is None:
+            metrics.incr("fixture_locks.misses")
+        else:
+            metrics.incr("fixture_locks.confirms")
+        state = _load(db, [fixture_id]).get(fixture_id)
+        with self._lock:
+            if state is None:
+                self._states.pop(fixture_id, None)
+            else:
+                self._states[fixture_id] = state
+        return state
+
+    def invalidate(self, fixture_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Forget ``fixture_ids`` (everything if None) so their next check reads
+        the database. Call after the commit.
+        """
+        with self._lock:
+            if fixture_ids is None:
+                self._states.clear()
+                self._loaded_at = None
+            else:
+                for fixture_id in fixture_ids:
+                    self._states.pop(fixture_id, None)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+
+fixture_locks = FixtureLockIndex()
@@ -0,0 +1,312 @@
+"""
+Fixture sync: schedule diffing, the stored diff, and the background job.
+
+``diff_schedule`` compares the football-data.org PL schedule with local
+fixtures and proposes KICKOFF_CHANGED / GAMEWEEK_CHANGED / NEW_FIXTURE
+changes. ``refresh_sync_diff`` fetches the schedule (through the cached
+``football_data_client``), diffs it and stores the result as the single
+``FixtureSyncDiff`` row, which the admin preview serves instantly.
+
+``SyncScheduler`` refreshes that row every ``FIXTURE_SYNC_INTERVAL_SECONDS``
+from an asyncio task started in ``main.lifespan``. With several uvicorn
+workers only the one holding an exclusive lock on ``FIXTURE_SYNC_LOCK_FILE``
+runs it; the others just read the stored diff.
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from football_data import ScheduleSnapshot, football_data_client
+from models import Fixture, FixtureSyncDiff
+from team_mapping import resolve_team
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no lock needed
+    fcntl = None
+
+FIXTURE_SYNC_INTERVAL_SECONDS = int(os.getenv("FIXTURE_SYNC_INTERVAL_SECONDS", "1800"))
+FIXTURE_SYNC_LOCK_FILE = os.getenv(
+    "FIXTURE_SYNC_LOCK_FILE", os.path.join(tempfile.gettempdir(), "rnli-fixture-sync.lock")
+)
+
+STORED_DIFF_ID = 1
+
+
+def parse_api_kickoff(utc_date: str) -> tuple[str, str, datetime]:
+    """Split a football-data.org utcDate into (YYYY-MM-DD, HH:MM UK-local, aware UTC datetime).
+
+    Date and time are converted to Europe/London so they compare correctly against
+    CSV-sourced DB values (which use UK local time: 12:30, 15:00, 17:30, 20:00 etc).
+    Without this, every BST-season fixture generates a spurious KICKOFF_CHANGED diff
+    because 15:00 BST = 14:00 UTC and the times would never match.
+    """
+    from zoneinfo import ZoneInfo
+    _LONDON = ZoneInfo("Europe/London")
+    dt_utc = datetime.fromisoformat(utc_date.replace("Z", "+00:00"))
+    dt_local = dt_utc.astimezone(_LONDON)
+    return dt_local.strftime("%Y-%m-%d"), dt_local.strftime("%H:%M"), dt_utc
+
+
+def diff_schedule(db: Session, matches: list[dict]) -> tuple[list[dict], list[str]]:
+    """Compare football-data.org matches against local fixtures.
+
+    Returns (changes, unmapped_team_names). Read-only and blocking — async
+    callers run it in the threadpool.
+    """
+
+    # Local lookups — ALL fixtures, including postponed (a postponed match is
+    # exactly the one whose reschedule we want to catch).
+    fixtures = db.query(Fixture).all()
+    by_teams: dict[tuple[str, str], Fixture] = {}
+    by_teams_gw: dict[tuple[str, str, int], Fixture] = {}
+    for f in fixtures:
+        key = (f.home_team.lower(), f.away_team.lower())
+        by_teams[key] = f
+        by_teams_gw[(key[0], key[1], f.gameweek)] = f
+
+    changes = []
+    unmapped: list[str] = []
+
+    fuzzy: dict[str, tuple[str, float]] = {}
+
+    def _map_side(team_obj: dict) -> str | None:
+        # shortName is usually closest to our DB names; fall back to full name.
+        for api_name in (team_obj.get("shortName") or "", team_obj.get("name") or ""):
+            match = resolve_team(api_name)
+            if match.name is not None:
+                if match.confidence < 1.0:
+                    fuzzy[api_name] = (match.name, match.confidence)
+                return match.name
+        return None
+
+    for m in matches:
+        home = _map_side(m.get("homeTeam") or {})
+        away = _map_side(m.get("awayTeam") or {})
+        if home is None or away is None:
+            for side, mapped in ((m.get("homeTeam") or {}, home), (m.get("awayTeam") or {}, away)):
+                if mapped is None:
+                    api_name = side.get("shortName") or side.get("name") or "unknown"
+                    if api_name not in unmapped:
+                        unmapped.append(api_name)
+            continue
+
+        gameweek = m.get("matchday")
+        utc_date = m.get("utcDate")
+        if gameweek is None or not utc_date:
+            continue
+        api_date, api_time, api_dt = parse_api_kickoff(utc_date)
+
+        api_block = {
+            "home_team": home,
+            "away_team": away,
+            "gameweek": gameweek,
+            "date": api_date,
+            "time": api_time,
+            "kickoff_utc": api_dt.isoformat(),
+        }
+
+        # Prefer the exact (home, away, gameweek) match, fall back to team pair.
+        local = (
+            by_teams_gw.get((home.lower(), away.lower(), gameweek))
+            or by_teams.get((home.lower(), away.lower()))
+        )
+
+        if local is None:
+            changes.append({
+                "change_id": str(uuid.uuid4()),
+                "type": "NEW_FIXTURE",
+                "api": api_block,
+                "local": None,
+                "description": (
+                    f"New fixture: {home} vs {away} — GW{gameweek}, {api_date} {api_time}"
+                ),
+            })
+            continue
+
+        local_block = {
+            "fixture_id": local.id,
+            "home_team": local.home_team,
+            "away_team": local.away_team,
+            "gameweek": local.gameweek,
+            "date": local.date.isoformat(),
+            "time": local.time or "",
+        }
+
+        gw_differs = local.gameweek != gameweek
+        kickoff_differs = (
+            local.date.isoformat() != api_date or (local.time or "") != api_time
+        )
+
+        if gw_differs:
+            # Higher priority than a kickoff change: the admin moves the GW
+            # first (via the Phase A move endpoint), then the kickoff diff
+            # will surface on the next preview if still relevant.
+            changes.append({
+                "change_id": str(uuid.uuid4()),
+                "type": "GAMEWEEK_CHANGED",
+                "api": api_block,
+                "local": local_block,
+                "description": (
+                    f"{home} vs {away}: gameweek {local.gameweek} → {gameweek}"
+                ),
+            })
+        elif kickoff_differs:
+            changes.append({
+                "change_id": str(uuid.uuid4()),
+                "type": "KICKOFF_CHANGED",
+                "api": api_block,
+                "local": local_block,
+                "description": (
+                    f"{home} vs {away} (GW{gameweek}): kickoff "
+                    f"{local_block['date']} {local_block['time'] or '--:--'}"
+                    f" → {api_date} {api_time}"
+                ),
+            })
+        # else: no diff — skip.
+
+    if unmapped:
+        # Console breadcrumb for whoever maintains team_mapping.py.
+        print(f"[fixture-sync] unmapped teams from football-data.org: {unmapped}")
+    if fuzzy:
+        # Resolved, but worth adding to TEAM_NAME_MAP as exact aliases.
+        print(f"[fixture-sync] fuzzy-matched teams from football-data.org: {fuzzy}")
+
+    return changes, unmapped
+
+
+def store_sync_diff(db: Session, snapshot: ScheduleSnapshot, source: str) -> FixtureSyncDiff:
+    """Diff ``snapshot`` against local fixtures and save it as the stored diff."""
+    changes, unmapped = diff_schedule(db, snapshot.matches)
+    row = db.merge(FixtureSyncDiff(
+        id=STORED_DIFF_ID,
+        computed_at=datetime.now(timezone.utc),
+        fetched_at=snapshot.fetched_at,
+        source=source,
+        api_match_count=len(snapshot.matches),
+        changes=changes,
+        unmapped_teams=unmapped,
+    ))
+    db.commit()
+    return row
+
+
+def load_sync_diff(db: Session) -> Optional[FixtureSyncDiff]:
+    return db.get(FixtureSyncDiff, STORED_DIFF_ID)
+
+
+def clear_sync_diff(db: Session) -> None:
+    """Drop the stored diff (e.g. after changes were applied); no commit."""
+    db.query(FixtureSyncDiff).filter(FixtureSyncDiff.id == STORED_DIFF_ID).delete()
+
+
+def sync_diff_payload(row: FixtureSyncDiff, cached: bool) -> dict:
+    """Preview response body for a stored diff."""
+    computed_at = row.computed_at
+    if computed_at.tzinfo is None:
+        # SQLite hands back naive datetimes; they were written as UTC.
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+    fetched_at = row.fetched_at
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    return {
+        "sync_available": True,
+        "fetched_at": fetched_at.isoformat(),
+        "computed_at": computed_at.isoformat(),
+        "age_seconds": round((datetime.now(timezone.utc) - computed_at).total_seconds(), 1),
+        "source": row.source,
+        "cached": cached,
+        "api_match_count": row.api_match_count,
+        "changes": row.changes,
+        "unmapped_teams": row.unmapped_teams,
+    }
+
+
+async def refresh_sync_diff(db: Session, api_key: str, *, force: bool, source: str) -> dict:
+    """Fetch (or reuse) the schedule, recompute the diff and store it.
+
+    ``force`` skips the client's cache window; the upstream call is still
+    conditional, so an unchanged schedule costs a 304. Raises the client's
+    ``httpx.HTTPError`` / ``FootballDataError``.
+    """
+    snapshot, cached = await football_data_client.get_schedule(api_key, force=force)
+    row = await run_in_threadpool(store_sync_diff, db, snapshot, source)
+    return sync_diff_payload(row, cached)
+
+
+class SyncScheduler:
+    """Periodic ``refresh_sync_diff`` in the background of one worker."""
+
+    def __init__(self, interval: int = FIXTURE_SYNC_INTERVAL_SECONDS, lock_path: str = FIXTURE_SYNC_LOCK_FILE):
+        self.interval = interval
+        self.lock_path = lock_path
+        self._lock_file = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _acquire_lock(self) -> bool:
+        if fcntl is None:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def start(self) -> bool:
+        """Start the job in the running loop. Returns False if it isn't ours to run."""
+        if self.interval <= 0 or not os.environ.get("FOOTBALL_DATA_API_KEY"):
+            return False
+        if not self._acquire_lock():
+            print("ℹ️ [fixture-sync] scheduler already running in another worker")
+            return False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        print(f"✅ [fixture-sync] scheduler started (every {self.interval}s)")
+        return True
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._release_lock()
+
+    async def run_once(self) -> None:
+        api_key = os.environ.get("FOOTBALL_DATA_API_KEY")
+        if not api_key:
+            return
+        db = SessionLocal()
+        try:
+            payload = await refresh_sync_diff(db, api_key, force=True, source="scheduler")
+            print(f"✅ [fixture-sync] diff refreshed: {len(payload['changes'])} changes")
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:  # never let one bad fetch kill the loop
+                print(f"❌ [fixture-sync] scheduled refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+sync_scheduler = SyncScheduler()
@@ -0,0 +1,159 @@
+"""
+football-data.org client for the fixture sync.
+
+The sync preview used to make a blocking ``httpx.get`` for the whole PL
+schedule (380 matches) on every click. This client instead:
+
+* reuses one ``httpx.AsyncClient`` (keep-alive connection pool), opened on the
+  app's event loop by the lifespan; a call from any other loop gets a one-off
+  client that is closed before it returns, so no pool outlives its loop;
+* caches the last schedule with its fetch time, and serves repeat requests
+  within ``FOOTBALL_DATA_CACHE_SECONDS`` without going upstream at all;
+* once the cache window has passed, revalidates with ``If-None-Match`` /
+  ``If-Modified-Since`` so an unchanged schedule costs a 304, not a download.
+
+``FOOTBALL_DATA_BASE_URL`` points the client somewhere else (a local stand-in
+server in tests or development).
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from metrics import metrics
+
+FOOTBALL_DATA_BASE_URL = os.getenv("FOOTBALL_DATA_BASE_URL", "https://api.football-data.org/v4")
+FOOTBALL_DATA_CACHE_SECONDS = int(os.getenv("FOOTBALL_DATA_CACHE_SECONDS", "300"))
+FOOTBALL_DATA_TIMEOUT = float(os.getenv("FOOTBALL_DATA_TIMEOUT", "10"))
+
+PL_MATCHES_PATH = "/competitions/PL/matches"
+
+
+class FootballDataError(Exception):
+    """football-data.org answered with an unexpected HTTP status."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Football-data.org API error: {status_code}")
+        self.status_code = status_code
+
+
+@dataclass
+class ScheduleSnapshot:
+    matches: list[dict]
+    fetched_at: datetime          # when the body was last downloaded (UTC)
+    checked_at: float             # monotonic time of the last upstream round trip
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    api_key: Optional[str] = None
+
+    def age_seconds(self) -> float:
+        return round((datetime.now(timezone.utc) - self.fetched_at).total_seconds(), 1)
+
+
+class FootballDataClient:
+    def __init__(
+        self,
+        base_url: str = FOOTBALL_DATA_BASE_URL,
+        cache_seconds: int = FOOTBALL_DATA_CACHE_SECONDS,
+        timeout: float = FOOTBALL_DATA_TIMEOUT,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cache_seconds = cache_seconds
+        self.timeout = timeout
+        self._snapshot: Optional[ScheduleSnapshot] = None
+        # httpx connections and asyncio locks belong to the loop that created
+        # them. The pooled client only serves its own loop (see ``_http``);
+        # the fetch lock is rebuilt if we're called from a different loop.
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self._lock_loop = None
+        self._fetch_lock: Optional[asyncio.Lock] = None
+
+    async def open(self) -> None:
+        """Open the pooled client on the running loop. Called from the lifespan."""
+        await self.aclose()
+        self._client = httpx.AsyncClient(timeout=self.timeout)
+        self._client_loop = asyncio.get_running_loop()
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock_loop = loop
+            self._fetch_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _http(self):
+        if self._client is not None and self._client_loop is asyncio.get_running_loop():
+            yield self._client
+        else:
+            # Not the app's loop: a pool created here couldn't be closed once
+            # this loop is gone, so use a client that closes with the call.
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                yield client
+
+    async def get_schedule(self, api_key: str, force: bool = False) -> tuple[ScheduleSnapshot, bool]:
+        """
+        Return ``(snapshot, from_cache)`` for the PL schedule.
+
+        ``from_cache`` is True when no upstream request was made. ``force``
+        skips the cache window but still revalidates conditionally.
+        Raises ``httpx.HTTPError`` on transport failures and
+        ``FootballDataError`` on non-200/304 responses.
+        """
+        self._bind_loop()
+        # Concurrent previews share one upstream request instead of racing.
+        async with self._fetch_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.api_key != api_key:
+                snapshot = None
+            if (
+                snapshot is not None
+                and not force
+                and time.monotonic() - snapshot.checked_at < self.cache_seconds
+            ):
+                metrics.incr("football_data.cache_hits")
+                return snapshot, True
+
+            headers = {"X-Auth-Token": api_key}
+            if snapshot is not None and snapshot.etag:
+                headers["If-None-Match"] = snapshot.etag
+            if snapshot is not None and snapshot.last_modified:
+                headers["If-Modified-Since"] = snapshot.last_modified
+
+            metrics.incr("football_data.requests")
+            async with self._http() as client:
+                resp = await client.get(self.base_url + PL_MATCHES_PATH, headers=headers)
+
+            if resp.status_code == 304 and snapshot is not None:
+                metrics.incr("football_data.not_modified")
+                snapshot.checked_at = time.monotonic()
+                return snapshot, False
+            if resp.status_code != 200:
+                raise FootballDataError(resp.status_code)
+
+            self._snapshot = ScheduleSnapshot(
+                matches=resp.json().get("matches", []),
+                fetched_at=datetime.now(timezone.utc),
+                checked_at=time.monotonic(),
+                etag=resp.headers.get("etag"),
+                last_modified=resp.headers.get("last-modified"),
+                api_key=api_key,
+            )
+            return self._snapshot, False
+
+    def clear(self) -> None:
+        self._snapshot = None
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._client_loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+
+football_data_client = FootballDataClient()
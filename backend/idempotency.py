@@ -0,0 +1,154 @@
+"""
+``Idempotency-Key`` support for submission endpoints.
+
+Mobile clients on flaky connections retry ``POST /predictions`` and admins
+double-click result entry. A request carrying an ``Idempotency-Key`` header
+is remembered here together with its response; a repeat with the same key
+gets the stored response back (marked ``Idempotent-Replayed: true``) without
+running the handler again, so the scoring tables, the event log and the
+caches are not touched a second time.
+
+* Keys are scoped to the caller and the endpoint, so two users (or two
+  endpoints) can't collide.
+* Reusing a key with a different body is rejected with 422; a repeat that
+  arrives while the first request is still running gets 409.
+* Only successful responses are stored. A failed request releases its key,
+  so the client can retry it for real.
+* The store is per process, bounded to ``IDEMPOTENCY_MAX_KEYS`` entries
+  (oldest evicted first) and entries expire after ``IDEMPOTENCY_TTL_SECONDS``.
+  A retry that lands on another worker runs again; the submissions are
+  upserts, so that still converges on the same state.
+
+Replays, conflicts and the number of stored keys are tracked under
+``idempotency.*`` in metrics.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response
+
+from metrics import metrics
+from responses import dumps
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_MAX_KEY_LENGTH = 255
+
+_IN_FLIGHT = object()
+
+
+def _fingerprint(payload: Any) -> str:
+    return hashlib.sha256(dumps(payload)).hexdigest()
+
+
+class IdempotentCall:
+    """One request's claim on a key: either a replay or a pending entry."""
+
+    def __init__(self, store: "IdempotencyStore", scope_key: Optional[tuple], fingerprint: Optional[str],
+                 stored: Optional[tuple[int, Any]] = None):
+        self._store = store
+        self._scope_key = scope_key
+        self._fingerprint = fingerprint
+        self._stored = stored
+
+    @property
+    def replayed(self) -> bool:
+        return self._stored is not None
+
+    def replay(self, response: Response) -> Any:
+        """Apply the stored status to ``response`` and return the stored body."""
+        status_code, body = self._stored
+        response.status_code = status_code
+        response.headers["Idempotent-Replayed"] = "true"
+        return body
+
+    def complete(self, response: Response, body: Any) -> Any:
+        """Remember ``body`` (and the status set on ``response``) for repeats."""
+        if self._scope_key is not None:
+            self._store._save(self._scope_key, self._fingerprint, response.status_code or 200, body)
+        return body
+
+    def abort(self) -> None:
+        """Forget the pending entry so a retry runs the request again."""
+        if self._scope_key is not None:
+            self._store._release(self._scope_key)
+
+
+class IdempotencyStore:
+    """Bounded, TTL-evicted map of (scope, key) → stored response."""
+
+    def __init__(self, ttl: int = IDEMPOTENCY_TTL_SECONDS, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._max_keys = max_keys
+        # (scope, key) → (expires_at, fingerprint, (status_code, body) | _IN_FLIGHT)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    def begin(self, key: Optional[str], scope: str, payload: Any) -> IdempotentCall:
+        """
+        Claim ``key`` for this request. Without a key the call is a no-op
+        wrapper, so handlers can use the same code path either way.
+        """
+        if not key:
+            return IdempotentCall(self, None, None)
+        if len(key) > IDEMPOTENCY_MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+        scope_key = (scope, key)
+        fingerprint = _fingerprint(payload)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(scope_key)
+            if entry is not None:
+                _, stored_fingerprint, stored = entry
+                if stored_fingerprint != fingerprint:
+                    metrics.incr("idempotency.conflicts")
+                    raise HTTPException(
+                        status_code=422,
+                        detail="Idempotency-Key was already used for a different request",
+                    )
+                if stored is _IN_FLIGHT:
+                    metrics.incr("idempotency.conflicts")
+                    raise HTTPException(
+                        status_code=409,
+                        detail="A request with this Idempotency-Key is still in progress",
+                    )
+                metrics.incr("idempotency.replays")
+                return IdempotentCall(self, None, None, stored)
+
+            self._entries[scope_key] = (now + self._ttl, fingerprint, _IN_FLIGHT)
+            metrics.set_gauge("idempotency.keys", len(self._entries))
+        return IdempotentCall(self, scope_key, fingerprint)
+
+    def _save(self, scope_key: tuple, fingerprint: str, status_code: int, body: Any) -> None:
+        with self._lock:
+            self._entries[scope_key] = (time.monotonic() + self._ttl, fingerprint, (status_code, body))
+            self._entries.move_to_end(scope_key)
+
+    def _release(self, scope_key: tuple) -> None:
+        with self._lock:
+            entry = self._entries.get(scope_key)
+            if entry is not None and entry[2] is _IN_FLIGHT:
+                del self._entries[scope_key]
+            metrics.set_gauge("idempotency.keys", len(self._entries))
+
+    def _evict(self, now: float) -> None:
+        # Entries are kept in insertion order and share one TTL, so expired
+        # ones are always at the front.
+        while self._entries:
+            scope_key, (expires_at, _, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) < self._max_keys:
+                break
+            del self._entries[scope_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+idempotency_store = IdempotencyStore()
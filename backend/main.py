@@ -10,7 +10,13 @@ from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from database import create_tables
 from migrate import run_migrations
 from limiter import limiter
-from routes import fixtures, predictions, results, leaderboard, auth, users, admin, settings
+from compression import CompressionMiddleware
+from football_data import football_data_client
+from fixture_sync import sync_scheduler
+from prediction_queue import prediction_queue_worker
+from projection import shutdown_pool as shutdown_projection_pool
+from responses import FastJSONResponse
+from routes import fixtures, predictions, results, leaderboard, auth, users, admin, settings, gameweeks, leagues, seasons
 
 
 def get_allowed_origins() -> list[str]:
@@ -38,8 +44,19 @@ async def lifespan(app: FastAPI):
     # Run lightweight, idempotent column migrations for existing databases
     run_migrations()
     print("✅ Migrations applied")
+    # Pooled football-data.org connections, bound to this loop
+    await football_data_client.open()
+    # Background fixture-sync job (one worker only; no-op without an API key)
+    sync_scheduler.start()
+    # Write-behind prediction flusher (only with PREDICTION_QUEUE_ENABLED)
+    prediction_queue_worker.start()
     yield
-    # Shutdown logic (if needed)
+    # Shutdown: drain the prediction queue, stop the sync job, release the
+    # pooled football-data.org connections and the projection workers
+    await prediction_queue_worker.stop()
+    await sync_scheduler.stop()
+    await football_data_client.aclose()
+    shutdown_projection_pool()
     print("👋 Shutting down API...")
 
 
@@ -47,7 +64,9 @@ app = FastAPI(
     title="RNLI Premier League Predictor",
     description="API for Premier League prediction competition",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson-backed by default; see responses.py (JSON_BACKEND to override).
+    default_response_class=FastJSONResponse,
 )
 
 app.state.limiter = limiter
@@ -71,16 +90,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for JSON bodies above COMPRESSION_MIN_SIZE bytes (default 1 KiB).
+# Responses that arrive already encoded (cached leaderboard variants) pass through.
+app.add_middleware(CompressionMiddleware)
+
 # Include all routers
 app.include_router(auth.router)
 app.include_router(auth.register_router)
 app.include_router(fixtures.router)
 app.include_router(predictions.router)
 app.include_router(results.router)
+app.include_router(gameweeks.router)
 app.include_router(leaderboard.router)
+app.include_router(leagues.router)
 app.include_router(users.router)
 app.include_router(admin.router)
 app.include_router(settings.router)
+app.include_router(seasons.router)
 
 
 @app.get("/")
@@ -9,9 +9,16 @@ up new columns without manual intervention.
 
 Every statement is written to be safe to run repeatedly.
 """
-from sqlalchemy import inspect, text
+from sqlalchemy import exists, inspect, select, text
+from sqlalchemy.orm import Session
 
+from consensus import rebuild_consensus
 from database import engine
+from models import Prediction, PredictionConsensus
+from seasons import ensure_active_season
+from teams import backfill_team_ids, canonicalise_team_names
+
+_SEASON_TABLES = ("fixtures", "predictions", "results", "wildcards")
 
 
 def _column_exists(inspector, table: str, column: str) -> bool:
@@ -30,6 +37,11 @@ def run_migrations() -> None:
     Adds:
       - fixtures.kickoff_time (TIMESTAMP, nullable)
       - fixtures.status (VARCHAR, default 'scheduled')
+      - fixtures.home_team_id / away_team_id (INTEGER → teams.id, indexed),
+        backfilled from the team name strings (canonicalised first)
+      - fixtures.updated_at (TIMESTAMP, nullable)
+      - fixtures / predictions / results / wildcards.season (VARCHAR, indexed),
+        backfilled with the active season
 
     Postgres supports ``ADD COLUMN IF NOT EXISTS``; SQLite does not, so we guard
     with an inspector check and issue a plain ``ADD COLUMN`` only when missing.
@@ -55,6 +67,17 @@ def run_migrations() -> None:
         statements.append(
             "ALTER TABLE invites ADD COLUMN IF NOT EXISTS revoked_at TIMESTAMP"
         )
+        statements.append(
+            "ALTER TABLE fixtures ADD COLUMN IF NOT EXISTS home_team_id INTEGER REFERENCES teams(id)"
+        )
+        statements.append(
+            "ALTER TABLE fixtures ADD COLUMN IF NOT EXISTS away_team_id INTEGER REFERENCES teams(id)"
+        )
+        statements.append(
+            "ALTER TABLE fixtures ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP"
+        )
+        for table in _SEASON_TABLES:
+            statements.append(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS season VARCHAR(20)")
     else:
         # SQLite (and other dialects without IF NOT EXISTS support)
         if not _column_exists(inspector, "fixtures", "kickoff_time"):
@@ -69,9 +92,21 @@ def run_migrations() -> None:
             statements.append("ALTER TABLE invites ADD COLUMN recipient_email VARCHAR")
         if not _column_exists(inspector, "invites", "revoked_at"):
             statements.append("ALTER TABLE invites ADD COLUMN revoked_at TIMESTAMP")
+        if not _column_exists(inspector, "fixtures", "home_team_id"):
+            statements.append("ALTER TABLE fixtures ADD COLUMN home_team_id INTEGER REFERENCES teams(id)")
+        if not _column_exists(inspector, "fixtures", "away_team_id"):
+            statements.append("ALTER TABLE fixtures ADD COLUMN away_team_id INTEGER REFERENCES teams(id)")
+        if not _column_exists(inspector, "fixtures", "updated_at"):
+            statements.append("ALTER TABLE fixtures ADD COLUMN updated_at TIMESTAMP")
+        for table in _SEASON_TABLES:
+            if not _column_exists(inspector, table, "season"):
+                statements.append(f"ALTER TABLE {table} ADD COLUMN season VARCHAR(20)")
 
-    if not statements:
-        return
+    # Both dialects support IF NOT EXISTS on indexes.
+    statements.append("CREATE INDEX IF NOT EXISTS ix_fixtures_home_team_id ON fixtures (home_team_id)")
+    statements.append("CREATE INDEX IF NOT EXISTS ix_fixtures_away_team_id ON fixtures (away_team_id)")
+    for table in _SEASON_TABLES:
+        statements.append(f"CREATE INDEX IF NOT EXISTS ix_{table}_season ON {table} (season)")
 
     with engine.begin() as conn:
         for stmt in statements:
@@ -81,3 +116,38 @@ def run_migrations() -> None:
                 # Idempotency safety net: ignore "already exists" style errors so a
                 # partially-migrated DB doesn't crash startup.
                 print(f"⚠️  Migration step skipped ({stmt}): {exc}")
+
+    # Data step: store every club under one spelling, as the write paths now
+    # do, so the name-keyed fixture upsert can't duplicate a fixture.
+    with engine.begin() as conn:
+        renamed = canonicalise_team_names(conn)
+    if renamed:
+        print(f"✅ Canonicalised {renamed} fixture team names")
+
+    # Data step: link fixtures created before the teams table (or by a bulk
+    # path that predates it) to their team rows. A no-op once backfilled.
+    with engine.begin() as conn:
+        linked = backfill_team_ids(conn)
+    if linked:
+        print(f"✅ Linked {linked} fixtures to team rows")
+
+    # Data step: fill prediction_consensus for predictions made before it
+    # existed. Once any row is there the table is maintained incrementally.
+    with Session(engine) as db, db.begin():
+        if not db.scalar(select(exists().select_from(PredictionConsensus))) and db.scalar(
+            select(exists().select_from(Prediction))
+        ):
+            built = rebuild_consensus(db)
+            print(f"✅ Built prediction consensus for {built} fixtures")
+
+    # Data step: pick the active season (from season_name on first run) and
+    # stamp rows that predate the season column with it.
+    with Session(engine) as db, db.begin():
+        season = ensure_active_season(db)
+        stamped = sum(
+            db.execute(text(f"UPDATE {table} SET season = :season WHERE season IS NULL"),
+                       {"season": season}).rowcount
+            for table in _SEASON_TABLES
+        )
+    if stamped:
+        print(f"✅ Stamped {stamped} rows with season {season}")
@@ -1,4 +1,7 @@
-from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    Column, String, Integer, DateTime, Date, ForeignKey, JSON, LargeBinary, UniqueConstraint, column, event,
+    inspect, select, table,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone, timedelta
 import uuid
@@ -14,6 +17,17 @@ def default_invite_expiry():
     return datetime.now(timezone.utc) + timedelta(days=7)
 
 
+def active_season_default():
+    """
+    Column default stamping a row with the active season: a subquery on
+    ``site_settings`` rendered inside the INSERT itself, so ORM and bulk
+    writes alike pick up the current value without an extra round trip, and
+    every worker agrees the moment a season is archived.
+    """
+    settings = table("site_settings", column("key"), column("value"))
+    return select(settings.c.value).where(settings.c.key == "active_season").scalar_subquery()
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -29,6 +43,22 @@ class User(Base):
     wildcards = relationship("Wildcard", back_populates="user", cascade="all, delete-orphan")
 
 
+class Team(Base):
+    """
+    A club, under its canonical name (the spelling fixtures.csv uses).
+
+    ``aliases`` holds every lowercased variant ``team_mapping`` knows for it.
+    Rows are created on demand the first time a fixture names the club.
+    """
+    __tablename__ = "teams"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), unique=True, nullable=False, index=True)
+    short_name = Column(String(50), nullable=True)
+    aliases = Column(JSON, nullable=False, default=list)
+    venue = Column(String(100), nullable=True)
+
+
 class Fixture(Base):
     __tablename__ = "fixtures"
 
@@ -39,6 +69,12 @@ class Fixture(Base):
     time = Column(String(10))
     home_team = Column(String(50), nullable=False)
     away_team = Column(String(50), nullable=False)
+    # Normalized team references. The name columns stay as the display
+    # strings; the ids are what filters and joins should use. Kept in step
+    # with the names by the listeners below (ORM writes) and by
+    # ``teams.ensure_team_ids`` (bulk writes).
+    home_team_id = Column(Integer, ForeignKey("teams.id"), nullable=True, index=True)
+    away_team_id = Column(Integer, ForeignKey("teams.id"), nullable=True, index=True)
     venue = Column(String(100))
     # Full kickoff timestamp (date + time). Nullable for backwards compatibility
     # with fixtures imported before this column existed — when null, predictions
@@ -46,13 +82,39 @@ class Fixture(Base):
     kickoff_time = Column(DateTime, nullable=True)
     # Lifecycle status: 'scheduled' | 'postponed' | 'completed'.
     status = Column(String(20), default="scheduled", nullable=False)
+    # Season label, e.g. '2025/26'. The hot tables only ever hold the active
+    # season; finished ones are moved to season_archives (see seasons.py).
+    season = Column(String(20), nullable=True, index=True, default=active_season_default())
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Bumped on every ORM or bulk UPDATE; part of the fixture bundle cache stamp.
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=True)
 
     # Relationships
     predictions = relationship("Prediction", back_populates="fixture", cascade="all, delete-orphan")
     result = relationship("Result", back_populates="fixture", uselist=False, cascade="all, delete-orphan")
 
 
+def _assign_team_ids(connection, fixture) -> None:
+    from teams import ensure_team_ids  # teams.py imports this module
+
+    ids = ensure_team_ids(connection, [fixture.home_team, fixture.away_team])
+    fixture.home_team_id = ids.get(fixture.home_team)
+    fixture.away_team_id = ids.get(fixture.away_team)
+
+
+@event.listens_for(Fixture, "before_insert")
+def _fixture_team_ids_on_insert(mapper, connection, fixture):
+    if fixture.home_team_id is None or fixture.away_team_id is None:
+        _assign_team_ids(connection, fixture)
+
+
+@event.listens_for(Fixture, "before_update")
+def _fixture_team_ids_on_update(mapper, connection, fixture):
+    attrs = inspect(fixture).attrs
+    if attrs.home_team.history.has_changes() or attrs.away_team.history.has_changes():
+        _assign_team_ids(connection, fixture)
+
+
 class Prediction(Base):
     __tablename__ = "predictions"
 
@@ -62,6 +124,7 @@ class Prediction(Base):
     gameweek = Column(Integer, nullable=False)
     predicted_home = Column(Integer, nullable=False)
     predicted_away = Column(Integer, nullable=False)
+    season = Column(String(20), nullable=True, index=True, default=active_season_default())
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
@@ -75,6 +138,27 @@ class Prediction(Base):
     )
 
 
+class PredictionConsensus(Base):
+    """
+    How the league predicted one fixture, kept up to date as predictions are
+    written (see ``consensus.py``) so reading it never scans predictions.
+
+    ``scorelines`` is a sparse histogram ``{"h-a": count}`` over the 0–20
+    range ``PredictionSubmit`` allows; goal totals let averages be derived.
+    """
+    __tablename__ = "prediction_consensus"
+
+    fixture_id = Column(Integer, ForeignKey("fixtures.id", ondelete="CASCADE"), primary_key=True)
+    predictions = Column(Integer, nullable=False, default=0)
+    home_wins = Column(Integer, nullable=False, default=0)
+    draws = Column(Integer, nullable=False, default=0)
+    away_wins = Column(Integer, nullable=False, default=0)
+    home_goals = Column(Integer, nullable=False, default=0)
+    away_goals = Column(Integer, nullable=False, default=0)
+    scorelines = Column(JSON, nullable=False, default=dict)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+
 class Result(Base):
     __tablename__ = "results"
 
@@ -83,6 +167,7 @@ class Result(Base):
     gameweek = Column(Integer, nullable=False)
     actual_home = Column(Integer, nullable=False)
     actual_away = Column(Integer, nullable=False)
+    season = Column(String(20), nullable=True, index=True, default=active_season_default())
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
@@ -107,6 +192,7 @@ class Wildcard(Base):
     id = Column(String, primary_key=True, default=generate_uuid)
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     gameweek = Column(Integer, nullable=False)
+    season = Column(String(20), nullable=True, index=True, default=active_season_default())
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     # Relationships
@@ -126,6 +212,26 @@ class SiteSetting(Base):
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
 
+class SeasonArchive(Base):
+    """
+    A finished season, moved out of the hot tables.
+
+    ``standings`` is the final leaderboard frozen at archive time (the same
+    rows ``/leaderboard`` served). ``data`` is the season's fixtures, results,
+    predictions and wildcards as gzip-compressed, column-oriented JSON — see
+    ``seasons.archive_season`` / ``seasons.archive_data``.
+    """
+    __tablename__ = "season_archives"
+
+    season = Column(String(20), primary_key=True)
+    season_name = Column(String(255), nullable=True)
+    archived_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    fixtures = Column(Integer, nullable=False)
+    predictions = Column(Integer, nullable=False)
+    standings = Column(JSON, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+
 class Invite(Base):
     """
     Single-use registration invite.
@@ -150,3 +256,77 @@ class Invite(Base):
     # Relationships (explicit foreign_keys because there are two FKs to users)
     creator = relationship("User", foreign_keys=[created_by])
     redeemer = relationship("User", foreign_keys=[used_by])
+
+
+class League(Base):
+    """
+    A mini-league: a named group of players with its own leaderboard.
+
+    Unlike registration invites, ``invite_token`` is reusable — anyone
+    holding it can join — until the league's creator or an admin rotates it,
+    which invalidates the old one.
+    """
+    __tablename__ = "leagues"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    name = Column(String(60), nullable=False)
+    invite_token = Column(String(36), unique=True, nullable=False, index=True, default=generate_uuid)
+    created_by = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    members = relationship("LeagueMember", back_populates="league", cascade="all, delete-orphan")
+
+
+class LeagueMember(Base):
+    """One player's membership of one mini-league."""
+    __tablename__ = "league_members"
+
+    id = Column(Integer, primary_key=True, index=True)
+    league_id = Column(String, ForeignKey("leagues.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    joined_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    league = relationship("League", back_populates="members")
+
+    __table_args__ = (UniqueConstraint("league_id", "user_id", name="uix_league_member"),)
+
+
+class ScoringEvent(Base):
+    """
+    Append-only log of mutations that can change scores.
+
+    Each row's autoincrement ``id`` doubles as the global scoring version: the
+    leaderboard reports the highest id it has seen, and clients ask for what
+    changed since that version. Rows are written in the same transaction as the
+    mutation they describe, so a committed change always has a matching event.
+
+    ``fixture_id`` is deliberately not a foreign key — events must outlive the
+    fixture they describe (e.g. a deleted fixture still changed the board).
+    """
+    __tablename__ = "scoring_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(30), nullable=False)
+    fixture_id = Column(Integer, nullable=True)
+    gameweek = Column(Integer, nullable=True)
+    user_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class FixtureSyncDiff(Base):
+    """
+    The most recent football-data.org schedule diff, precomputed.
+
+    Written by the background sync job (and by explicit preview refreshes) so
+    the admin preview can answer from the database instead of waiting on the
+    upstream API. Only one row (id=1) is kept; every worker reads it.
+    """
+    __tablename__ = "fixture_sync_diffs"
+
+    id = Column(Integer, primary_key=True)
+    computed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    fetched_at = Column(DateTime, nullable=False)  # when the schedule was downloaded
+    source = Column(String(20), nullable=False)    # 'scheduler' | 'preview'
+    api_match_count = Column(Integer, nullable=False)
+    changes = Column(JSON, nullable=False)
+    unmapped_teams = Column(JSON, nullable=False)
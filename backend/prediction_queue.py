@@ -0,0 +1,329 @@
+"""
+Write-behind prediction ingestion for deadline spikes.
+
+Just before a gameweek's first kickoff every player submits at once, and each
+``submit_prediction`` held a database connection through its queries and a
+commit. With ``PREDICTION_QUEUE_ENABLED`` set, a prediction that passes the
+lock checks (still done at acceptance time, against ``fixture_locks``) is
+instead appended to a local SQLite journal in WAL mode and acknowledged with
+202. The append is committed with ``synchronous=FULL``, so an acknowledged
+prediction survives a crash. That only holds if the journal itself survives,
+so ``PREDICTION_QUEUE_PATH`` must name a file on persistent storage; there is
+no default (temp directories are routinely wiped) and the app refuses to
+start with the queue enabled and no path.
+
+``PredictionQueueWorker`` drains the journal every
+``PREDICTION_QUEUE_FLUSH_SECONDS``: it reads up to
+``PREDICTION_QUEUE_BATCH_SIZE`` entries in order, keeps the latest per
+(user, fixture), upserts them into the main database in one transaction and
+only then deletes them from the journal. A crash between the two replays the
+batch, which is harmless because the upsert is last-write-wins. Entries for
+fixtures or users deleted in the meantime are dropped.
+
+Several uvicorn workers may append to the same journal; like the fixture
+sync scheduler, only the worker holding an exclusive lock on
+``<journal>.lock`` flushes it, so batches are never applied out of order.
+Every worker runs the flush loop and the ones without the lock try for it on
+each tick, so if the flushing worker exits or is recycled another takes over
+within one interval.
+
+Depth, throughput and latency are exposed under ``prediction_queue.*`` in
+metrics: ``depth`` (entries waiting), ``flush_ms`` (last flush duration) and
+``flush_latency_ms`` (acceptance → main database, oldest entry of the last
+batch).
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from consensus import apply_prediction_changes
+from database import SessionLocal
+from metrics import metrics
+from models import Fixture, Prediction, User
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no lock needed
+    fcntl = None
+
+PREDICTION_QUEUE_ENABLED = os.getenv("PREDICTION_QUEUE_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+PREDICTION_QUEUE_PATH = os.getenv("PREDICTION_QUEUE_PATH", "").strip()
+if PREDICTION_QUEUE_ENABLED and not PREDICTION_QUEUE_PATH:
+    raise RuntimeError(
+        "PREDICTION_QUEUE_ENABLED is set but PREDICTION_QUEUE_PATH is not. Refusing to start: "
+        "the journal must be on persistent storage."
+    )
+PREDICTION_QUEUE_FLUSH_SECONDS = float(os.getenv("PREDICTION_QUEUE_FLUSH_SECONDS", "0.5"))
+PREDICTION_QUEUE_BATCH_SIZE = int(os.getenv("PREDICTION_QUEUE_BATCH_SIZE", "500"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    fixture_id INTEGER NOT NULL,
+    gameweek INTEGER NOT NULL,
+    predicted_home INTEGER NOT NULL,
+    predicted_away INTEGER NOT NULL,
+    accepted_at REAL NOT NULL
+)
+"""
+
+
+def _journal_depth(conn: sqlite3.Connection) -> int:
+    # Flushes only ever delete a prefix of seq, so the journal is one
+    # contiguous range and its size is MAX - MIN + 1. Each bound is a single
+    # primary-key lookup, where COUNT(*) would walk the whole journal.
+    first, last = conn.execute(
+        "SELECT (SELECT MIN(seq) FROM journal), (SELECT MAX(seq) FROM journal)"
+    ).fetchone()
+    return 0 if first is None else last - first + 1
+
+
+def upsert_predictions(db: Session, entries: list[dict]) -> tuple[int, int]:
+    """
+    Insert or update predictions keyed by (user_id, fixture_id), last entry
+    wins. Entries whose fixture or user no longer exists are skipped.
+    Returns (written, skipped). The caller commits.
+    """
+    latest = {(e["user_id"], e["fixture_id"]): e for e in entries}
+    fixture_ids = {fixture_id for _, fixture_id in latest}
+    user_ids = {user_id for user_id, _ in latest}
+    live_fixtures = set(db.scalars(select(Fixture.id).where(Fixture.id.in_(fixture_ids))))
+    live_users = set(db.scalars(select(User.id).where(User.id.in_(user_ids))))
+    latest = {
+        key: e for key, e in latest.items()
+        if key[0] in live_users and key[1] in live_fixtures
+    }
+    skipped = len({(e["user_id"], e["fixture_id"]) for e in entries}) - len(latest)
+    if not latest:
+        return 0, skipped
+
+    existing = {
+        (user_id, fixture_id): (prediction_id, (home, away))
+        for prediction_id, user_id, fixture_id, home, away in db.execute(
+            select(Prediction.id, Prediction.user_id, Prediction.fixture_id,
+                   Prediction.predicted_home, Prediction.predicted_away)
+            .where(tuple_(Prediction.user_id, Prediction.fixture_id).in_(list(latest)))
+            .with_for_update()
+        )
+    }
+    updates, inserts, consensus_changes = [], [], []
+    for key, e in latest.items():
+        values = {
+            "gameweek": e["gameweek"],
+            "predicted_home": e["predicted_home"],
+            "predicted_away": e["predicted_away"],
+        }
+        new_score = (e["predicted_home"], e["predicted_away"])
+        if key in existing:
+            prediction_id, old_score = existing[key]
+            updates.append({"id": prediction_id, **values})
+            consensus_changes.append((key[1], old_score, new_score))
+        else:
+            inserts.append({"user_id": key[0], "fixture_id": key[1], **values})
+            consensus_changes.append((key[1], None, new_score))
+    if updates:
+        db.execute(update(Prediction), updates)
+    if inserts:
+        db.execute(insert(Prediction), inserts)
+    apply_prediction_changes(db, consensus_changes)
+    return len(latest), skipped
+
+
+class PredictionQueue:
+    """Append-only SQLite journal of accepted predictions."""
+
+    def __init__(self, path: str = PREDICTION_QUEUE_PATH, enabled: bool = PREDICTION_QUEUE_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection shared by the threadpool; SQLite allows a single
+        # writer anyway, so appends serialise on the lock.
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def append(self, *, user_id: str, fixture_id: int, gameweek: int,
+               predicted_home: int, predicted_away: int) -> int:
+        """Durably record one accepted prediction. Returns its sequence number."""
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "INSERT INTO journal (user_id, fixture_id, gameweek, predicted_home, predicted_away, accepted_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, fixture_id, gameweek, predicted_home, predicted_away, time.time()),
+            )
+            depth = _journal_depth(conn)
+        metrics.incr("prediction_queue.accepted")
+        metrics.set_gauge("prediction_queue.depth", depth)
+        return cursor.lastrowid
+
+    def depth(self) -> int:
+        with self._lock:
+            return _journal_depth(self._connection())
+
+    def pending(self, user_id: str, gameweek: Optional[int] = None) -> list[dict]:
+        """The caller's entries not yet flushed, oldest first."""
+        query = "SELECT fixture_id, gameweek, predicted_home, predicted_away FROM journal WHERE user_id = ?"
+        params: list = [user_id]
+        if gameweek is not None:
+            query += " AND gameweek = ?"
+            params.append(gameweek)
+        with self._lock:
+            rows = self._connection().execute(query + " ORDER BY seq", params).fetchall()
+        return [
+            {"fixture_id": f, "gameweek": gw, "predicted_home": h, "predicted_away": a}
+            for f, gw, h, a in rows
+        ]
+
+    def flush(self, batch_size: int = PREDICTION_QUEUE_BATCH_SIZE) -> int:
+        """
+        Move up to ``batch_size`` journal entries into the main database.
+        Returns how many entries were consumed (0 when the journal is empty).
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT seq, user_id, fixture_id, gameweek, predicted_home, predicted_away, accepted_at"
+                " FROM journal ORDER BY seq LIMIT ?",
+                (batch_size,),
+            ).fetchall()
+        if not rows:
+            metrics.set_gauge("prediction_queue.depth", 0)
+            return 0
+
+        t0 = time.perf_counter()
+        entries = [
+            {"user_id": u, "fixture_id": f, "gameweek": gw, "predicted_home": h, "predicted_away": a}
+            for _, u, f, gw, h, a, _ in rows
+        ]
+        db = SessionLocal()
+        try:
+            written, skipped = upsert_predictions(db, entries)
+            db.commit()
+        except Exception:
+            db.rollback()
+            metrics.incr("prediction_queue.flush_failures")
+            raise
+        finally:
+            db.close()
+
+        # Only forget entries once the main database has them.
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM journal WHERE seq <= ?", (rows[-1][0],))
+            depth = _journal_depth(conn)
+
+        metrics.incr("prediction_queue.flushes")
+        metrics.incr("prediction_queue.flushed", written)
+        if skipped:
+            metrics.incr("prediction_queue.skipped", skipped)
+            print(f"⚠️  [prediction-queue] dropped {skipped} entries for deleted fixtures/users")
+        metrics.set_gauge("prediction_queue.depth", depth)
+        metrics.set_gauge("prediction_queue.flush_ms", round((time.perf_counter() - t0) * 1000, 2))
+        metrics.set_gauge(
+            "prediction_queue.flush_latency_ms",
+            round((time.time() - min(r[6] for r in rows)) * 1000, 2),
+        )
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class PredictionQueueWorker:
+    """
+    Background flusher for ``PredictionQueue``. Runs in every worker process;
+    only the one holding the journal lock flushes, the rest retry the lock
+    each tick.
+    """
+
+    def __init__(self, queue: PredictionQueue, interval: float = PREDICTION_QUEUE_FLUSH_SECONDS):
+        self.queue = queue
+        self.interval = interval
+        self._lock_file = None
+        self._holding = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def holding_lock(self) -> bool:
+        return self._holding
+
+    def _acquire_lock(self) -> bool:
+        if fcntl is None:
+            self._holding = True
+            return True
+        lock_file = open(self.queue.path + ".lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self._holding = True
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self._holding = False
+
+    def start(self) -> bool:
+        """Start the flush loop in the running loop. Returns False if the queue is disabled."""
+        if not self.queue.enabled:
+            return False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        print(f"✅ [prediction-queue] flush loop started (every {self.interval}s)")
+        return True
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            # Drain what's left so a clean shutdown leaves an empty journal.
+            if self._holding:
+                try:
+                    while await run_in_threadpool(self.queue.flush):
+                        pass
+                except Exception as e:
+                    print(f"❌ [prediction-queue] final flush failed, entries kept for next start: {e}")
+        self._release_lock()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._holding and self._acquire_lock():
+                print("✅ [prediction-queue] this worker now flushes the journal")
+            if self._holding:
+                try:
+                    # Keep going while full batches come back; sleep once drained.
+                    while await run_in_threadpool(self.queue.flush) >= PREDICTION_QUEUE_BATCH_SIZE:
+                        pass
+                except Exception as e:  # entries stay in the journal for the next pass
+                    print(f"❌ [prediction-queue] flush failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+prediction_queue = PredictionQueue()
+prediction_queue_worker = PredictionQueueWorker(prediction_queue)
@@ -0,0 +1,267 @@
+"""
+Monte Carlo season projection.
+
+Plays out every unscored, non-postponed fixture ``simulations`` times,
+drawing each score from the same goal distribution the simulator uses, and
+scores every player's existing predictions against each outcome. The result
+is each player's chance of finishing first or in the top three (competition
+ranking, so players level on points share the place) and their expected
+final total.
+
+Scoring is vectorised without an array library: every player owns a
+fixed-width bit lane of one Python int, so a fixture's points for all
+players under one scoreline pack into a single int and a whole simulated
+season is one sum of table lookups. Only the final totals are unpacked.
+
+Players only get projections built from predictions on fixtures that have
+kicked off (``locked_only``), as with the consensus and what-if views:
+otherwise repeated runs would show when and how rivals change open picks.
+Admins see the projection over every prediction.
+
+Results are cached per scoring version, simulation count, seed and a stamp
+of the predictions and wildcards used, so repeat calls don't burn another
+run. Without a seed one is derived from the scoring version, which keeps
+unseeded calls cacheable too.
+
+Simulations run in chunks of ``PROJECTION_CHUNK_SIZE``; each chunk gets its
+own RNG seeded from the request seed and the chunk index, so a seeded
+projection is reproducible whatever the number of workers. Chunks are spread
+over a process pool of ``PROJECTION_WORKERS`` (spawned lazily, shut down
+with the app); with one worker they run inline.
+"""
+import os
+import random
+import threading
+import time
+from bisect import bisect
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+from multiprocessing import get_context
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from fixture_locks import kickoff_epoch
+from metrics import metrics
+from models import Fixture, Prediction, Result, User, Wildcard
+from scoring import calculate_points, wildcard_multiplier
+from standings import standings_cache
+
+PROJECTION_WORKERS = int(os.getenv("PROJECTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+PROJECTION_CHUNK_SIZE = int(os.getenv("PROJECTION_CHUNK_SIZE", "1000"))
+PROJECTION_DEFAULT_SIMULATIONS = 5000
+PROJECTION_MAX_SIMULATIONS = 50000
+PROJECTION_CACHE_SIZE = 32
+
+# Probability weights for 0-5 goals per side, roughly realistic. Shared with
+# the admin simulator so projections and seeded data look alike.
+GOAL_WEIGHTS = (18, 30, 25, 15, 8, 4)
+
+# Every simulated scoreline, with home and away goals drawn independently.
+SCORELINES = [(h, a) for h in range(len(GOAL_WEIGHTS)) for a in range(len(GOAL_WEIGHTS))]
+_CUM_WEIGHTS = list(accumulate(GOAL_WEIGHTS[h] * GOAL_WEIGHTS[a] for h, a in SCORELINES))
+
+
+def _pack(values: list[int], lane_bits: int) -> int:
+    packed = 0
+    for lane, value in enumerate(values):
+        packed |= value << (lane * lane_bits)
+    return packed
+
+
+def _run_chunk(base: int, tables: list[list[int]], players: int, lane_bits: int,
+               simulations: int, seed: int) -> tuple[list[int], list[int], list[int]]:
+    """
+    Simulate ``simulations`` seasons. Returns per-player (firsts, top-threes,
+    summed final points). Top level so the process pool can pickle it.
+    """
+    rng = random.Random(seed)
+    total_weight = _CUM_WEIGHTS[-1]
+    # One column of scoreline indexes per fixture, all simulations at once.
+    draws = [
+        [bisect(_CUM_WEIGHTS, rng.random() * total_weight) for _ in range(simulations)]
+        for _ in tables
+    ]
+    mask = (1 << lane_bits) - 1
+    shifts = [lane * lane_bits for lane in range(players)]
+    firsts = [0] * players
+    top_threes = [0] * players
+    points = [0] * players
+    seasons = zip(*draws) if draws else repeat((), simulations)
+    for season in seasons:
+        packed = base + sum(map(list.__getitem__, tables, season))
+        totals = [(packed >> shift) & mask for shift in shifts]
+        ordered = sorted(totals, reverse=True)
+        best, third = ordered[0], ordered[min(2, players - 1)]
+        for i, total in enumerate(totals):
+            points[i] += total
+            if total >= third:
+                top_threes[i] += 1
+                if total == best:
+                    firsts[i] += 1
+    return firsts, top_threes, points
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork: the API process has live threads (the
+            # threadpool, the sync job) whose locks a forked child would copy.
+            _pool = ProcessPoolExecutor(max_workers=PROJECTION_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _kicked_off(kickoff, now: int) -> bool:
+    epoch = kickoff_epoch(kickoff)
+    return epoch is not None and epoch <= now
+
+
+def project_season(
+    db: Session,
+    simulations: int = PROJECTION_DEFAULT_SIMULATIONS,
+    seed: Optional[int] = None,
+    workers: int = PROJECTION_WORKERS,
+    *,
+    locked_only: bool = False,
+) -> dict:
+    """
+    Project the final standings. Players are everyone on the leaderboard plus
+    anyone with a prediction on a remaining fixture; wildcards already placed
+    on remaining gameweeks double as usual. With ``locked_only``, predictions
+    on fixtures that haven't kicked off are left out (they score nothing).
+    """
+    t0 = time.perf_counter()
+    version, rows = standings_cache.current(db)
+    current = {row["player"]: row["total"] for row in rows}
+    if seed is None:
+        seed = version
+
+    remaining = (
+        db.query(Fixture.id, Fixture.kickoff_time)
+        .outerjoin(Result, Result.fixture_id == Fixture.id)
+        .filter(Result.id.is_(None), Fixture.status != "postponed")
+        .order_by(Fixture.id)
+        .all()
+    )
+    remaining_ids = [f.id for f in remaining]
+    now = int(time.time())
+    counted = [
+        f.id for f in remaining
+        if not locked_only or _kicked_off(f.kickoff_time, now)
+    ]
+    scope = "locked" if locked_only else "all"
+    predictions = (
+        db.query(Prediction.user_id, Prediction.fixture_id, Prediction.gameweek,
+                 Prediction.predicted_home, Prediction.predicted_away, Prediction.updated_at)
+        .filter(Prediction.fixture_id.in_(counted))
+        .all()
+        if counted else []
+    )
+    wildcards = set(db.query(Wildcard.user_id, Wildcard.gameweek).all())
+    used_wildcards = frozenset(
+        (p.user_id, p.gameweek) for p in predictions
+    ) & wildcards
+
+    key = (
+        version, simulations, seed, locked_only, tuple(counted), len(predictions),
+        max((p.updated_at for p in predictions), default=None), used_wildcards,
+    )
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    if cached is not None:
+        metrics.incr("projection.cache_hits")
+        return dict(cached)
+
+    usernames = dict(db.query(User.id, User.username).all())
+    predicting = {p.user_id for p in predictions if p.user_id in usernames}
+    user_ids = sorted(
+        {uid for uid, name in usernames.items() if name in current} | predicting,
+        key=lambda uid: usernames[uid],
+    )
+    if not user_ids:
+        return {"version": version, "simulations": 0, "seed": seed,
+                "remaining_fixtures": len(remaining), "predictions_counted": scope, "players": []}
+    lane = {uid: i for i, uid in enumerate(user_ids)}
+
+    # points[fixture][scoreline][player]
+    points = {fid: [[0] * len(user_ids) for _ in SCORELINES] for fid in remaining_ids}
+    for p in predictions:
+        i = lane.get(p.user_id)
+        if i is None:
+            continue
+        # Keyed by the prediction's gameweek, as compute_gameweek_points does.
+        multiplier = wildcard_multiplier((p.user_id, p.gameweek) in wildcards)
+        for s, (home, away) in enumerate(SCORELINES):
+            points[p.fixture_id][s][i] = multiplier * calculate_points(
+                p.predicted_home, p.predicted_away, home, away
+            )
+
+    base_values = [current.get(usernames[uid], 0) for uid in user_ids]
+    ceiling = max(base_values) + sum(
+        max(max(col) for col in table) for table in points.values()
+    )
+    lane_bits = ceiling.bit_length() + 1
+    base = _pack(base_values, lane_bits)
+    tables = [[_pack(col, lane_bits) for col in points[fid]] for fid in remaining_ids if any(map(any, points[fid]))]
+
+    chunks = [
+        (base, tables, len(user_ids), lane_bits, min(PROJECTION_CHUNK_SIZE, simulations - start),
+         seed * 1_000_003 + index)
+        for index, start in enumerate(range(0, simulations, PROJECTION_CHUNK_SIZE))
+    ]
+    if workers > 1 and len(chunks) > 1:
+        pool = _get_pool()
+        outputs = [f.result() for f in [pool.submit(_run_chunk, *chunk) for chunk in chunks]]
+    else:
+        outputs = [_run_chunk(*chunk) for chunk in chunks]
+
+    firsts = [sum(o[0][i] for o in outputs) for i in range(len(user_ids))]
+    top_threes = [sum(o[1][i] for o in outputs) for i in range(len(user_ids))]
+    totals = [sum(o[2][i] for o in outputs) for i in range(len(user_ids))]
+    players = [
+        {
+            "player": usernames[uid],
+            "current_points": base_values[i],
+            "expected_points": round(totals[i] / simulations, 1),
+            "p_first": round(firsts[i] / simulations, 4),
+            "p_top3": round(top_threes[i] / simulations, 4),
+        }
+        for i, uid in enumerate(user_ids)
+    ]
+    players.sort(key=lambda p: (-p["p_first"], -p["expected_points"], p["player"]))
+    result = {
+        "version": version,
+        "simulations": simulations,
+        "seed": seed,
+        "remaining_fixtures": len(remaining),
+        "predictions_counted": scope,
+        "players": players,
+    }
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > PROJECTION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    metrics.incr("projection.runs")
+    metrics.set_gauge("projection.ms", round((time.perf_counter() - t0) * 1000, 2))
+    return dict(result)
@@ -1,6 +1,8 @@
 """
 Soft reset script — clears predictions, results, and wildcards
-while keeping all fixtures intact.
+while keeping all fixtures intact. The cleared data is archived first (see
+seasons.archive_before_reset), so the fixtures carry over into a new
+generated season and the old one stays readable at /seasons.
 
 Fixture status is also reset to 'scheduled' so the UI shows matches
 as upcoming rather than completed.
@@ -16,6 +18,7 @@ load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
 from database import SessionLocal
 from models import Fixture, Prediction, Result, Wildcard
+from seasons import archive_before_reset
 
 
 def main() -> None:
@@ -31,10 +34,8 @@ def main() -> None:
             print("Aborted.")
             return
 
-        print("Clearing wildcards, predictions, results …")
-        db.query(Wildcard).delete()
-        db.query(Prediction).delete()
-        db.query(Result).delete()
+        print("Archiving and clearing wildcards, predictions, results …")
+        archived = archive_before_reset(db, "reset", keep_fixtures=True)
 
         print("Resetting fixture statuses to 'scheduled' …")
         db.query(Fixture).filter(Fixture.status != "scheduled").update({"status": "scheduled"})
@@ -48,6 +49,8 @@ def main() -> None:
         print(f"  Predictions   : deleted {pred_count}")
         print(f"  Results       : deleted {result_count}")
         print(f"  Wildcards     : deleted {wildcard_count}")
+        if archived:
+            print(f"  Archived as   : {archived['archived']}")
         print()
         print("Wayne can now test the full prediction flow from scratch.")
 
@@ -0,0 +1,55 @@
+"""
+Fast JSON response class used as the application default.
+
+FastAPI's stock ``JSONResponse`` runs every payload through the stdlib ``json``
+module. For the large payloads (the leaderboard, the admin predictions matrix,
+the full fixture list) that is a measurable share of request time, so the app
+renders with orjson when it is installed.
+
+Routes that return a ``FastJSONResponse`` directly also skip FastAPI's
+``jsonable_encoder`` pass, and can hand over ``date``/``datetime`` objects
+as-is — both backends serialise them to the same ISO-8601 strings that the
+per-row ``.isoformat()`` calls used to produce.
+
+Set ``JSON_BACKEND=stdlib`` to force the stdlib encoder (e.g. to rule the
+fast path out while debugging).
+"""
+import json
+import os
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson" if orjson is not None else "stdlib")
+
+
+def _stdlib_default(obj: Any):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialise ``content`` with the configured backend."""
+    if JSON_BACKEND == "orjson" and orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_stdlib_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through ``dumps`` (orjson when available)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
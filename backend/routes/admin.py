@@ -1,22 +1,39 @@
+import codecs
 import csv
-import io
 import os
 import random
-import uuid
+import re
+import time
 from datetime import datetime, timezone, date, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from sqlalchemy import and_, case, func, insert, or_, select, tuple_, update
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import User, Fixture, Prediction, Result, Invite, Wildcard
+from models import User, Fixture, Prediction, Result, Invite, Wildcard, PredictionConsensus
 from auth import get_current_admin, hash_password
-from team_mapping import map_team_name
-from scoring import calculate_points, compute_gameweek_points, wildcard_multiplier
+from team_mapping import canonical_team_name
+from teams import ensure_team_ids
+from scoring import compute_gameweek_points, points_expression, wildcard_multiplier_expression
+from consensus import apply_prediction_changes, consensus_summary, rebuild_consensus
+from projection import GOAL_WEIGHTS
+from seasons import SeasonArchiveError, archive_before_reset, archive_season
+from scoring_log import (
+    EVENT_BATCH_LIMIT, current_scoring_version, event_dict, events_after, record_scoring_event,
+    record_scoring_events,
+)
+from responses import FastJSONResponse
+from metrics import metrics
+from fixture_bundles import fixture_bundles, fixture_row
+from fixture_locks import fixture_locks
+from football_data import FootballDataError
+from fixture_sync import clear_sync_diff, load_sync_diff, refresh_sync_diff, sync_diff_payload
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -59,6 +76,42 @@ def get_overview(
     }
 
 
+@router.get("/metrics")
+def get_metrics(current_admin: User = Depends(get_current_admin)):
+    """Process-local counters and gauges (per worker, reset on restart).
+
+    ``compression.bytes_saved`` is the running total of bytes not sent thanks
+    to gzip/brotli; ``compression.cache_variant_hits`` counts responses served
+    from an already-compressed cached body.
+    """
+    return metrics.snapshot()
+
+
+@router.get("/scoring-events")
+def list_scoring_events(
+    since: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=EVENT_BATCH_LIMIT),
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Scoring events after version ``since``, oldest first.
+
+    External consumers pass the returned ``next_since`` back on the next call;
+    ``has_more`` means newer events exist (a page may come back short or
+    empty while an earlier event's transaction could still commit — retry
+    shortly; see ``scoring_log``).
+    """
+    events = events_after(db, since, limit)
+    current = current_scoring_version(db)
+    next_since = events[-1].id if events else since
+    return {
+        "events": [event_dict(e) for e in events],
+        "next_since": next_since,
+        "current_version": current,
+        "has_more": next_since < current,
+    }
+
+
 # ── Users ────────────────────────────────────────────────────────────────────
 
 @router.get("/users")
@@ -105,7 +158,7 @@ def list_users(
             "username": u.username,
             "email": u.email,
             "role": u.role,
-            "created_at": u.created_at.isoformat(),
+            "created_at": u.created_at,
             "prediction_count": prediction_count_by_user.get(u.id, 0),
             "total_points": total_points,
             "wildcard_gameweeks": gameweeks,
@@ -151,7 +204,16 @@ def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     if user.id == current_admin.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
+    # Take the user's predictions out of the per-fixture consensus before the
+    # cascade removes them.
+    apply_prediction_changes(db, [
+        (fixture_id, (home, away), None)
+        for fixture_id, home, away in db.query(
+            Prediction.fixture_id, Prediction.predicted_home, Prediction.predicted_away
+        ).filter(Prediction.user_id == user.id)
+    ])
     db.delete(user)
+    record_scoring_event(db, "user_deleted", user_id=user.id)
     db.commit()
     return {"message": f"User {user.username} deleted"}
 
@@ -180,9 +242,43 @@ def reset_user_password(
 
 # ── Predictions viewer ───────────────────────────────────────────────────────
 
+def _scored_prediction_rows(db: Session, gameweek: int):
+    """Every prediction in ``gameweek`` with its points, in one joined query.
+
+    Points are computed in SQL via ``points_expression`` and the wildcard
+    multiplier is applied through a LEFT JOIN on (user_id, gameweek). ``points`` is NULL
+    when the fixture has no result or is postponed, matching scoring.
+    """
+    points = case(
+        (or_(Result.id.is_(None), Fixture.status == "postponed"), None),
+        else_=points_expression(
+            Prediction.predicted_home, Prediction.predicted_away,
+            Result.actual_home, Result.actual_away,
+        ) * wildcard_multiplier_expression(Wildcard.id.is_not(None)),
+    )
+    return (
+        db.query(
+            Prediction.user_id,
+            Prediction.fixture_id,
+            Prediction.predicted_home,
+            Prediction.predicted_away,
+            points.label("points"),
+        )
+        .join(Fixture, Fixture.id == Prediction.fixture_id)
+        .outerjoin(Result, Result.fixture_id == Prediction.fixture_id)
+        .outerjoin(
+            Wildcard,
+            and_(Wildcard.user_id == Prediction.user_id, Wildcard.gameweek == Prediction.gameweek),
+        )
+        .filter(Prediction.gameweek == gameweek)
+        .all()
+    )
+
+
 @router.get("/predictions")
 def get_all_predictions(
     gameweek: int | None = None,
+    compact: bool = False,
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -193,6 +289,12 @@ def get_all_predictions(
     all). The response also surfaces ``available_gameweeks`` — the sorted list
     of distinct gameweeks that have predictions — so the admin UI can populate
     its selector without a second request.
+
+    ``compact=true`` returns a matrix instead of one dict per (fixture, user)
+    cell: ``users`` fixes the column order and each fixture carries parallel
+    ``predicted_home`` / ``predicted_away`` / ``points`` arrays, with nulls
+    where a user has no prediction. Payload size stays proportional to the
+    data rather than to per-cell key overhead as the user count grows.
     """
     # Distinct gameweeks that have at least one prediction, sorted ascending.
     available_gameweeks = sorted(
@@ -201,72 +303,133 @@ def get_all_predictions(
     if gameweek is None:
         gameweek = available_gameweeks[-1] if available_gameweeks else 1
 
-    fixtures = db.query(Fixture).filter(Fixture.gameweek == gameweek).order_by(Fixture.id).all()
-    users = db.query(User).order_by(User.username).all()
-    results = db.query(Result).filter(Result.gameweek == gameweek).all()
-    result_lookup = {r.fixture_id: r for r in results}
-    predictions = db.query(Prediction).filter(Prediction.gameweek == gameweek).all()
-    pred_lookup = {(p.user_id, p.fixture_id): p for p in predictions}
-
-    # Postponed fixtures in this gameweek contribute 0, matching scoring.
-    postponed_fixture_ids = {f.id for f in fixtures if f.status == "postponed"}
-
-    # Users with an active wildcard for THIS gameweek get their per-fixture
-    # points doubled here too, so the admin viewer's cells stay consistent with
-    # the doubled totals shown elsewhere.
-    wildcard_user_ids = {
-        w.user_id
-        for w in db.query(Wildcard).filter(Wildcard.gameweek == gameweek).all()
-    }
+    fixtures = (
+        db.query(
+            Fixture.id, Fixture.home_team, Fixture.away_team, Result.actual_home, Result.actual_away,
+            PredictionConsensus,
+        )
+        .outerjoin(Result, Result.fixture_id == Fixture.id)
+        .outerjoin(PredictionConsensus, PredictionConsensus.fixture_id == Fixture.id)
+        .filter(Fixture.gameweek == gameweek)
+        .order_by(Fixture.id)
+        .all()
+    )
+    users = db.query(User.id, User.username).order_by(User.username).all()
+    user_index = {u.id: i for i, u in enumerate(users)}
+    fixture_index = {f.id: i for i, f in enumerate(fixtures)}
+
+    # Fill a users-wide column per fixture straight from the joined rows; no
+    # per-cell scoring or dict building.
+    width = len(users)
+    columns = [([None] * width, [None] * width, [None] * width) for _ in fixtures]
+    for row in _scored_prediction_rows(db, gameweek):
+        fi = fixture_index.get(row.fixture_id)
+        ui = user_index.get(row.user_id)
+        if fi is None or ui is None:
+            continue
+        home, away, pts = columns[fi]
+        home[ui] = row.predicted_home
+        away[ui] = row.predicted_away
+        pts[ui] = row.points
 
     fixture_rows = []
-    for f in fixtures:
-        result = result_lookup.get(f.id)
-        user_preds = []
-        for u in users:
-            pred = pred_lookup.get((u.id, f.id))
-            if pred:
-                pts = None
-                if result and f.id not in postponed_fixture_ids:
-                    base = calculate_points(pred.predicted_home, pred.predicted_away,
-                                            result.actual_home, result.actual_away)
-                    pts = base * wildcard_multiplier(u.id in wildcard_user_ids)
-                user_preds.append({
-                    "user_id": u.id,
-                    "username": u.username,
-                    "predicted_home": pred.predicted_home,
-                    "predicted_away": pred.predicted_away,
-                    "points": pts,
-                })
-            else:
-                user_preds.append({
-                    "user_id": u.id,
-                    "username": u.username,
-                    "predicted_home": None,
-                    "predicted_away": None,
-                    "points": None,
-                })
-        fixture_rows.append({
+    for f, (home, away, pts) in zip(fixtures, columns):
+        entry = {
             "fixture_id": f.id,
             "home_team": f.home_team,
             "away_team": f.away_team,
-            "result": {"home": result.actual_home, "away": result.actual_away} if result else None,
-            "predictions": user_preds,
-        })
-
-    return {
+            "result": {"home": f.actual_home, "away": f.actual_away} if f.actual_home is not None else None,
+            "consensus": consensus_summary(f.PredictionConsensus),
+        }
+        if compact:
+            entry["predicted_home"] = home
+            entry["predicted_away"] = away
+            entry["points"] = pts
+        else:
+            entry["predictions"] = [
+                {
+                    "user_id": u.id,
+                    "username": u.username,
+                    "predicted_home": home[i],
+                    "predicted_away": away[i],
+                    "points": pts[i],
+                }
+                for i, u in enumerate(users)
+            ]
+        fixture_rows.append(entry)
+
+    return FastJSONResponse({
         "gameweek": gameweek,
         "available_gameweeks": available_gameweeks,
         "users": [{"id": u.id, "username": u.username} for u in users],
         "fixtures": fixture_rows,
-    }
+    })
 
 
 # ── Missing predictions ──────────────────────────────────────────────────────
 
+def _missing_for_open_gameweeks(db: Session) -> dict:
+    """Missing-prediction counts for every open gameweek in one response.
+
+    A gameweek is open while at least one of its non-postponed fixtures is
+    still ahead of kickoff (or has no kickoff time) and has no result, i.e.
+    players can still predict it. Per-user counts come from a single query
+    grouped by (user, gameweek); users with no row simply have nothing
+    submitted.
+    """
+    # Kickoffs are written UTC-aware, so compare against an aware "now".
+    not_started = and_(
+        Result.id.is_(None),
+        or_(Fixture.kickoff_time.is_(None), Fixture.kickoff_time > datetime.now(timezone.utc)),
+    )
+    # Totals count every non-postponed fixture in the GW, started or not, so
+    # they line up with the single-gameweek report. The outer join can't
+    # multiply rows: a fixture has at most one result.
+    totals = dict(
+        db.query(Fixture.gameweek, func.count(Fixture.id))
+        .outerjoin(Result, Result.fixture_id == Fixture.id)
+        .filter(Fixture.status != "postponed")
+        .group_by(Fixture.gameweek)
+        .having(func.sum(case((not_started, 1), else_=0)) > 0)
+        .all()
+    )
+    open_gameweeks = sorted(totals)
+    open_set = set(open_gameweeks)
+
+    submitted = {}
+    if open_set:
+        rows = (
+            db.query(Prediction.user_id, Fixture.gameweek, func.count(Prediction.id))
+            .join(Fixture, Fixture.id == Prediction.fixture_id)
+            .filter(Fixture.status != "postponed", Fixture.gameweek.in_(open_set))
+            .group_by(Prediction.user_id, Fixture.gameweek)
+            .all()
+        )
+        submitted = {(user_id, gw): count for user_id, gw, count in rows}
+
+    users = db.query(User.id, User.username).order_by(User.username).all()
+    summary = []
+    for u in users:
+        missing = [totals[gw] - submitted.get((u.id, gw), 0) for gw in open_gameweeks]
+        summary.append({
+            "user_id": u.id,
+            "username": u.username,
+            "missing": missing,
+            "total_missing": sum(missing),
+            "complete": not any(missing),
+        })
+
+    return {
+        "gameweeks": open_gameweeks,
+        "total_fixtures": [totals[gw] for gw in open_gameweeks],
+        "summary": summary,
+    }
+
+
 @router.get("/missing-predictions")
 def get_missing_predictions(
     gameweek: int | None = None,
+    all_open: bool = False,
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -278,7 +441,15 @@ def get_missing_predictions(
     The response includes ``available_gameweeks`` — distinct gameweeks that
     have at least one fixture — so the UI can populate its selector without
     a second request.
+
+    ``all_open=true`` instead returns a matrix covering every open gameweek
+    (any non-postponed fixture not yet kicked off): ``gameweeks`` and
+    ``total_fixtures`` are parallel arrays, and each user's ``missing`` array
+    lines up with them. One call replaces a request per gameweek.
     """
+    if all_open:
+        return _missing_for_open_gameweeks(db)
+
     # Gameweeks that have at least one non-postponed fixture, sorted ascending.
     available_gameweeks = sorted(
         r[0] for r in db.query(Fixture.gameweek)
@@ -297,33 +468,45 @@ def get_missing_predictions(
         upcoming = [gw for gw in available_gameweeks if gw not in scored_gameweeks]
         gameweek = upcoming[0] if upcoming else (available_gameweeks[-1] if available_gameweeks else 1)
 
-    fixtures = db.query(Fixture).filter(
-        Fixture.gameweek == gameweek,
-        Fixture.status != "postponed",
-    ).all()
-    users = db.query(User).order_by(User.username).all()
-    predictions = db.query(Prediction).filter(Prediction.gameweek == gameweek).all()
+    total = (
+        db.query(func.count(Fixture.id))
+        .filter(Fixture.gameweek == gameweek, Fixture.status != "postponed")
+        .scalar()
+    )
 
-    fixture_ids = {f.id for f in fixtures}
-    pred_lookup = {(p.user_id, p.fixture_id) for p in predictions}
+    # users LEFT JOIN predictions restricted to this GW's non-postponed
+    # fixtures, grouped per user: one row per user with their submitted count.
+    gameweek_fixture_ids = (
+        select(Fixture.id)
+        .where(Fixture.gameweek == gameweek, Fixture.status != "postponed")
+    )
+    rows = (
+        db.query(User.id, User.username, func.count(Prediction.id).label("submitted"))
+        .outerjoin(
+            Prediction,
+            and_(Prediction.user_id == User.id, Prediction.fixture_id.in_(gameweek_fixture_ids)),
+        )
+        .group_by(User.id, User.username)
+        .order_by(User.username)
+        .all()
+    )
 
-    summary = []
-    for u in users:
-        submitted = [fid for fid in fixture_ids if (u.id, fid) in pred_lookup]
-        missing = [fid for fid in fixture_ids if (u.id, fid) not in pred_lookup]
-        summary.append({
-            "user_id": u.id,
-            "username": u.username,
-            "submitted": len(submitted),
-            "missing": len(missing),
-            "total": len(fixture_ids),
-            "complete": len(missing) == 0,
-        })
+    summary = [
+        {
+            "user_id": r.id,
+            "username": r.username,
+            "submitted": r.submitted,
+            "missing": total - r.submitted,
+            "total": total,
+            "complete": r.submitted >= total,
+        }
+        for r in rows
+    ]
 
     return {
         "gameweek": gameweek,
         "available_gameweeks": available_gameweeks,
-        "total_fixtures": len(fixture_ids),
+        "total_fixtures": total,
         "summary": summary,
     }
 
@@ -331,6 +514,9 @@ def get_missing_predictions(
 # ── Fixture Upload ────────────────────────────────────────────────────────────
 
 REQUIRED_COLS = {"week", "date", "home", "away"}
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_BATCH_SIZE = int(os.getenv("FIXTURE_UPLOAD_BATCH_SIZE", "500"))
+UPLOAD_MAX_ERRORS = int(os.getenv("FIXTURE_UPLOAD_MAX_ERRORS", "20"))
 OPTIONAL_COLS = {"time", "day", "venue"}
 # Accept common aliases
 COL_ALIASES = {
@@ -370,33 +556,148 @@ def _parse_kickoff(fixture_date, time_str: str):
     return None
 
 
-@router.post("/fixtures/upload")
-async def upload_fixtures(
-    file: UploadFile = File(...),
-    replace: bool = True,
-    current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
-):
-    """
-    Upload a CSV file of fixtures for the new season.
-    Required columns: week, date, home, away
-    Optional columns: time, day (auto-computed if absent), venue
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
 
-    Fixtures are upserted: existing rows (matched on home_team + away_team +
-    gameweek) are updated in place and new rows are inserted. Existing fixtures
-    are never deleted, so predictions and results are preserved. The ``replace``
-    flag is retained for API compatibility but no longer deletes data.
+
+class _IndexedFixture(NamedTuple):
+    id: int
+    date: date
+    day: Optional[str]
+    time: Optional[str]
+    venue: Optional[str]
+
+
+def _fixture_key_index(db: Session) -> dict[tuple[str, str, int], _IndexedFixture]:
+    """Every existing fixture's natural key → its id and CSV-editable fields,
+    from one query. Shared by the real upsert and the dry-run diff."""
+    return {
+        (home, away, gameweek): _IndexedFixture(fixture_id, fixture_date, day, time_str, venue)
+        for fixture_id, home, away, gameweek, fixture_date, day, time_str, venue in db.query(
+            Fixture.id, Fixture.home_team, Fixture.away_team, Fixture.gameweek,
+            Fixture.date, Fixture.day, Fixture.time, Fixture.venue,
+        )
+    }
+
+
+def _indexed(fixture_id: int, params: dict) -> _IndexedFixture:
+    return _IndexedFixture(fixture_id, params["date"], params["day"], params["time"], params["venue"])
+
+
+def _link_team_ids(db: Session, rows: list[dict]) -> None:
+    """Add home_team_id/away_team_id to bulk-INSERT params. Bulk inserts skip
+    the ORM listeners that do this for ``db.add(Fixture(...))``."""
+    ids = ensure_team_ids(
+        db,
+        [r["home_team"] for r in rows] + [r["away_team"] for r in rows],
+        venues={r["home_team"]: r.get("venue") for r in rows},
+    )
+    for r in rows:
+        r["home_team_id"] = ids[r["home_team"]]
+        r["away_team_id"] = ids[r["away_team"]]
+
+
+def _plan_fixture_upsert(rows: list[dict], index: dict) -> tuple[list[dict], list[dict]]:
+    """Split parsed CSV rows into bulk-UPDATE params and bulk-INSERT params.
+
+    A key repeated within the file is applied once, last row wins — otherwise
+    the INSERT batch would carry two copies of the same fixture.
     """
-    if not file.filename.endswith(".csv"):
-        raise HTTPException(status_code=400, detail="File must be a .csv")
+    updates: dict[int, dict] = {}
+    inserts: dict[tuple, dict] = {}
+    for r in rows:
+        key = (r["home_team"], r["away_team"], r["gameweek"])
+        existing = index.get(key)
+        if existing is not None:
+            # Status is deliberately not touched: re-importing must not
+            # clobber a postponed/completed fixture.
+            updates[existing.id] = {
+                "id": existing.id,
+                "date": r["date"],
+                "day": r["day"],
+                "time": r["time"],
+                "venue": r["venue"],
+                "kickoff_time": r["kickoff_time"],
+            }
+        else:
+            inserts[key] = {"status": "scheduled", **r}
+    return list(updates.values()), list(inserts.values())
+
+
+_DIFF_FIELDS = ("date", "day", "time", "venue")
+
+
+def _diff_fixture_row(row: dict, existing: Optional[_IndexedFixture]) -> dict:
+    """Field-level changes a CSV row would make to an indexed fixture."""
+    if existing is None:
+        return {}
+    changes = {}
+    for field in _DIFF_FIELDS:
+        old = getattr(existing, field) or ""
+        new = row[field] or ""
+        if old != new:
+            changes[field] = {"from": old, "to": new}
+    return changes
+
+
+# A CSV line ends at \r\n, \r or \n only — what csv expects from a file opened
+# with newline="". str.splitlines would also break on \x0b, \x0c, \x1c-\x1e,
+# \x85, \u2028 and \u2029, cutting a row in two when one appears in a name
+# (0x85 is a plain byte in latin-1 uploads).
+_CSV_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+")
+
+
+def _iter_decoded_lines(raw, encoding: str):
+    """Yield text lines from a binary file, decoding ``UPLOAD_CHUNK_SIZE`` bytes
+    at a time so the whole upload is never held in memory as one string."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    while True:
+        chunk = raw.read(UPLOAD_CHUNK_SIZE)
+        final = not chunk
+        lines = _CSV_LINE.findall(pending + decoder.decode(chunk, final=final))
+        # Hold back a trailing partial line (or a \r whose \n may be in the
+        # next chunk) until the next chunk completes it.
+        pending = lines.pop() if lines and not final and not lines[-1].endswith("\n") else ""
+        yield from lines
+        if final:
+            return
+
+
+def _parse_fixture_row(raw_row: dict) -> dict:
+    """Validate one CSV row into Fixture column values. Raises ValueError/KeyError."""
+    row = {_normalise_header(k): (v or "").strip() for k, v in raw_row.items() if k}
+    week = int(row["week"])
+    if not (1 <= week <= 38):
+        raise ValueError(f"week must be 1–38, got {week}")
+
+    fixture_date = datetime.strptime(row["date"], "%Y-%m-%d").date()
+    if not row["home"] or not row["away"]:
+        raise ValueError("home and away team names cannot be empty")
+    # "Man United" / "Manchester United FC" → the one spelling fixtures use.
+    home = canonical_team_name(row["home"])
+    away = canonical_team_name(row["away"])
+
+    # Auto-compute day from date if not provided
+    day = row.get("day") or fixture_date.strftime("%a")
+    time_str = row.get("time") or ""
+    venue = row.get("venue") or ""
 
-    content = await file.read()
-    try:
-        text = content.decode("utf-8-sig")  # handle BOM from Excel
-    except UnicodeDecodeError:
-        text = content.decode("latin-1")
+    return {
+        "gameweek": week,
+        "date": fixture_date,
+        "day": day,
+        "time": time_str,
+        "home_team": home,
+        "away_team": away,
+        "venue": venue,
+        "kickoff_time": _parse_kickoff(fixture_date, time_str),
+    }
 
-    reader = csv.DictReader(io.StringIO(text))
+
+def _fixture_csv_reader(raw, encoding: str) -> csv.DictReader:
+    """A streaming DictReader over the upload, with required headers checked."""
+    reader = csv.DictReader(_iter_decoded_lines(raw, encoding))
 
     # Normalise headers
     if reader.fieldnames is None:
@@ -410,85 +711,247 @@ async def upload_fixtures(
             detail=f"CSV is missing required columns: {', '.join(sorted(missing))}. "
                    f"Required: week, date, home, away. Optional: time, day, venue",
         )
+    return reader
 
-    rows = []
-    errors = []
-    for i, raw_row in enumerate(reader, start=2):  # row 2 = first data row
-        row = {_normalise_header(k): v.strip() for k, v in raw_row.items() if k}
-        try:
-            week = int(row["week"])
-            if not (1 <= week <= 38):
-                raise ValueError(f"week must be 1–38, got {week}")
-
-            fixture_date = datetime.strptime(row["date"], "%Y-%m-%d").date()
-            home = row["home"]
-            away = row["away"]
-            if not home or not away:
-                raise ValueError("home and away team names cannot be empty")
-
-            # Auto-compute day from date if not provided
-            day = row.get("day") or fixture_date.strftime("%a")
-            time_str = row.get("time") or ""
-            venue = row.get("venue") or ""
-
-            rows.append({
-                "gameweek": week,
-                "date": fixture_date,
-                "day": day,
-                "time": time_str,
-                "home_team": home,
-                "away_team": away,
-                "venue": venue,
-                "kickoff_time": _parse_kickoff(fixture_date, time_str),
-            })
-        except (ValueError, KeyError) as e:
-            errors.append(f"Row {i}: {e}")
-
-    if errors:
-        raise HTTPException(
-            status_code=422,
-            detail={"message": "CSV contains invalid rows", "errors": errors[:20]},
-        )
 
-    # Non-destructive upsert: match on (home_team, away_team, gameweek). Update
-    # the mutable details of existing fixtures and insert any that are new. This
-    # preserves predictions and results tied to existing fixtures.
-    inserted = 0
-    updated = 0
-    for r in rows:
-        existing = (
-            db.query(Fixture)
-            .filter(
-                Fixture.home_team == r["home_team"],
-                Fixture.away_team == r["away_team"],
-                Fixture.gameweek == r["gameweek"],
+def _ingest_fixture_csv(db: Session, raw, encoding: str) -> dict:
+    """Stream, validate and upsert a fixtures CSV inside one transaction.
+
+    Rows are validated as they are read and written in batches of
+    ``UPLOAD_BATCH_SIZE`` (one bulk UPDATE + one bulk INSERT per batch, against
+    the key index loaded once up front). Memory is bounded by the batch size
+    and the error cap, not by the file. Any invalid row rolls the whole upload
+    back, so a bad file never half-applies.
+    """
+    timings = {"parse_ms": 0.0, "index_ms": 0.0, "update_ms": 0.0, "insert_ms": 0.0, "commit_ms": 0.0}
+    reader = _fixture_csv_reader(raw, encoding)
+
+    t0 = time.perf_counter()
+    index = _fixture_key_index(db)
+    timings["index_ms"] = _elapsed_ms(t0)
+
+    counts = {"imported": 0, "inserted": 0, "updated": 0, "batches": 0}
+    gameweeks: set[int] = set()
+    errors: list[str] = []
+    error_count = 0
+    batch: list[dict] = []
+
+    def flush() -> None:
+        updates, inserts = _plan_fixture_upsert(batch, index)
+        t = time.perf_counter()
+        if updates:
+            db.execute(update(Fixture), updates)
+        timings["update_ms"] += _elapsed_ms(t)
+        t = time.perf_counter()
+        if inserts:
+            _link_team_ids(db, inserts)
+            new_ids = db.scalars(
+                insert(Fixture).returning(Fixture.id, sort_by_parameter_order=True), inserts
+            ).all()
+            # Later batches may repeat a key inserted here; they must update it.
+            for params, fixture_id in zip(inserts, new_ids):
+                index[(params["home_team"], params["away_team"], params["gameweek"])] = _indexed(fixture_id, params)
+        timings["insert_ms"] += _elapsed_ms(t)
+        counts["updated"] += len(updates)
+        counts["inserted"] += len(inserts)
+        counts["batches"] += 1
+        batch.clear()
+
+    try:
+        t0 = time.perf_counter()
+        for i, raw_row in enumerate(reader, start=2):  # row 2 = first data row
+            try:
+                parsed = _parse_fixture_row(raw_row)
+            except (ValueError, KeyError) as e:
+                error_count += 1
+                if len(errors) < UPLOAD_MAX_ERRORS:
+                    errors.append(f"Row {i}: {e}")
+                continue
+            counts["imported"] += 1
+            gameweeks.add(parsed["gameweek"])
+            if error_count:
+                # The upload will be rejected; keep validating, stop writing.
+                continue
+            batch.append(parsed)
+            if len(batch) >= UPLOAD_BATCH_SIZE:
+                timings["parse_ms"] += _elapsed_ms(t0)
+                flush()
+                t0 = time.perf_counter()
+        timings["parse_ms"] += _elapsed_ms(t0)
+
+        if error_count:
+            db.rollback()
+            raise HTTPException(
+                status_code=422,
+                detail={
+                    "message": "CSV contains invalid rows",
+                    "errors": errors,
+                    "error_count": error_count,
+                },
             )
-            .first()
-        )
-        if existing:
-            existing.date = r["date"]
-            existing.day = r["day"]
-            existing.time = r["time"]
-            existing.venue = r["venue"]
-            existing.kickoff_time = r["kickoff_time"]
-            # Don't clobber a postponed/completed status on re-import.
-            # (existing.status is non-nullable so the None branch never fired.)
-            updated += 1
-        else:
-            db.add(Fixture(status="scheduled", **r))
-            inserted += 1
 
-    db.commit()
+        if batch:
+            flush()
+        # The stored sync preview was diffed against the old fixtures.
+        clear_sync_diff(db)
+        t0 = time.perf_counter()
+        db.commit()
+        timings["commit_ms"] = _elapsed_ms(t0)
+        fixture_bundles.invalidate(db, gameweeks)
+        fixture_locks.invalidate()
+    except (HTTPException, UnicodeDecodeError):
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        print("❌ Error upserting fixtures:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to save fixtures")
 
     return {
-        "imported": len(rows),
-        "inserted": inserted,
-        "updated": updated,
+        "imported": counts["imported"],
+        "inserted": counts["inserted"],
+        "updated": counts["updated"],
         "replaced": False,
-        "gameweeks": sorted({r["gameweek"] for r in rows}),
+        "gameweeks": sorted(gameweeks),
+        "batches": counts["batches"],
+        "timings_ms": {k: round(v, 2) for k, v in timings.items()},
     }
 
 
+def _diff_fixture_csv(db: Session, raw, encoding: str) -> dict:
+    """Classify every CSV row against the existing fixtures without writing.
+
+    Uses the same single-query key index as the real upsert, so the preview
+    predicts exactly what an import would do: ``new`` rows would be inserted,
+    ``changed`` rows would update date/day/time/venue (old and new values are
+    listed), ``unchanged`` rows are no-ops, and ``collisions`` are rows whose
+    key already appeared earlier in the file. Like the import, the last row
+    for a key wins: it is the one classified, and each collision names the
+    earlier row it overrides. Invalid rows are reported alongside the diff
+    rather than failing it.
+    """
+    timings = {"parse_ms": 0.0, "index_ms": 0.0}
+    reader = _fixture_csv_reader(raw, encoding)
+
+    t0 = time.perf_counter()
+    index = _fixture_key_index(db)
+    timings["index_ms"] = _elapsed_ms(t0)
+
+    collisions: list[dict] = []
+    latest: dict[tuple[str, str, int], tuple[dict, dict]] = {}
+    gameweeks: set[int] = set()
+    errors: list[str] = []
+    error_count = 0
+
+    t0 = time.perf_counter()
+    try:
+        for i, raw_row in enumerate(reader, start=2):  # row 2 = first data row
+            try:
+                parsed = _parse_fixture_row(raw_row)
+            except (ValueError, KeyError) as e:
+                error_count += 1
+                if len(errors) < UPLOAD_MAX_ERRORS:
+                    errors.append(f"Row {i}: {e}")
+                continue
+            gameweeks.add(parsed["gameweek"])
+            key = (parsed["home_team"], parsed["away_team"], parsed["gameweek"])
+            summary = {
+                "row": i,
+                "gameweek": parsed["gameweek"],
+                "home_team": parsed["home_team"],
+                "away_team": parsed["away_team"],
+            }
+
+            earlier = latest.pop(key, None)
+            if earlier is not None:
+                collisions.append({**summary, "overrides_row": earlier[1]["row"]})
+            latest[key] = (parsed, summary)
+
+        new: list[dict] = []
+        changed: list[dict] = []
+        unchanged = 0
+        for key, (parsed, summary) in latest.items():
+            existing = index.get(key)
+            if existing is None:
+                new.append({**summary, "date": parsed["date"], "time": parsed["time"],
+                            "venue": parsed["venue"]})
+                continue
+            changes = _diff_fixture_row(parsed, existing)
+            if changes:
+                changed.append({**summary, "fixture_id": existing.id, "changes": changes})
+            else:
+                unchanged += 1
+    finally:
+        # Nothing was written, but don't leave the read transaction open.
+        db.rollback()
+    timings["parse_ms"] = _elapsed_ms(t0)
+
+    return {
+        "dry_run": True,
+        "rows": len(latest) + len(collisions),
+        "gameweeks": sorted(gameweeks),
+        "summary": {
+            "new": len(new),
+            "changed": len(changed),
+            "unchanged": unchanged,
+            "collisions": len(collisions),
+            "errors": error_count,
+        },
+        "new": new,
+        "changed": changed,
+        "collisions": collisions,
+        "errors": errors,
+        "error_count": error_count,
+        "timings_ms": timings,
+    }
+
+
+def _ingest_fixture_upload(db: Session, raw, dry_run: bool = False) -> dict:
+    """UTF-8 (BOM-tolerant, for Excel exports) first; if the bytes turn out not
+    to be UTF-8, discard any batches written so far and re-read as latin-1."""
+    ingest = _diff_fixture_csv if dry_run else _ingest_fixture_csv
+    try:
+        return ingest(db, raw, "utf-8-sig")
+    except UnicodeDecodeError:
+        raw.seek(0)
+        return ingest(db, raw, "latin-1")
+
+
+@router.post("/fixtures/upload")
+async def upload_fixtures(
+    file: UploadFile = File(...),
+    replace: bool = True,
+    dry_run: bool = False,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """
+    Upload a CSV file of fixtures for the new season.
+    Required columns: week, date, home, away
+    Optional columns: time, day (auto-computed if absent), venue
+
+    Fixtures are upserted: existing rows (matched on home_team + away_team +
+    gameweek) are updated in place and new rows are inserted. Existing fixtures
+    are never deleted, so predictions and results are preserved. The ``replace``
+    flag is retained for API compatibility but no longer deletes data.
+
+    The file is streamed: decoded in chunks, validated row by row and written
+    in fixed-size batches within a single transaction, so memory stays flat
+    for multi-season files. At most ``UPLOAD_MAX_ERRORS`` error messages are
+    returned (``error_count`` has the total). ``timings_ms`` breaks the request
+    down by phase.
+
+    With ``dry_run=true`` nothing is written: the response is a diff of the
+    file against the existing fixtures (new / changed / unchanged / colliding
+    rows, plus any invalid rows).
+    """
+    if not file.filename.endswith(".csv"):
+        raise HTTPException(status_code=400, detail="File must be a .csv")
+
+    # Parsing and DB writes are blocking; keep them off the event loop.
+    return await run_in_threadpool(_ingest_fixture_upload, db, file.file, dry_run)
+
+
 # ── Fixture status (postpone / reschedule / complete) ─────────────────────────
 
 class UpdateFixtureStatusRequest(BaseModel):
@@ -512,7 +975,11 @@ def update_fixture_status(
     if not fixture:
         raise HTTPException(status_code=404, detail="Fixture not found")
     fixture.status = body.status
+    record_scoring_event(db, "status", fixture_id=fixture.id, gameweek=fixture.gameweek)
+    clear_sync_diff(db)
     db.commit()
+    fixture_bundles.invalidate(db, [fixture.gameweek])
+    fixture_locks.invalidate([fixture.id])
     return {
         "message": f"{fixture.home_team} vs {fixture.away_team} is now {body.status}",
         "fixture_id": fixture.id,
@@ -524,18 +991,7 @@ def update_fixture_status(
 
 def _fixture_dict(f: Fixture) -> dict:
     """Serialise a fixture in the same shape as the public fixtures API."""
-    return {
-        "id": f.id,
-        "gameweek": f.gameweek,
-        "date": f.date.isoformat(),
-        "day": f.day,
-        "time": f.time,
-        "home_team": f.home_team,
-        "away_team": f.away_team,
-        "venue": f.venue,
-        "kickoff_time": f.kickoff_time.isoformat() if f.kickoff_time else None,
-        "status": f.status,
-    }
+    return fixture_row(f)
 
 
 class EditFixtureRequest(BaseModel):
@@ -579,12 +1035,12 @@ def edit_fixture(
         stripped = body.home_team.strip()
         if not stripped:
             raise HTTPException(status_code=400, detail="home_team cannot be empty")
-        fixture.home_team = stripped
+        fixture.home_team = canonical_team_name(stripped)
     if body.away_team is not None:
         stripped = body.away_team.strip()
         if not stripped:
             raise HTTPException(status_code=400, detail="away_team cannot be empty")
-        fixture.away_team = stripped
+        fixture.away_team = canonical_team_name(stripped)
     if body.venue is not None:
         fixture.venue = body.venue.strip()
 
@@ -614,8 +1070,11 @@ def edit_fixture(
     if fixture.home_team == fixture.away_team:
         raise HTTPException(status_code=400, detail="home_team and away_team cannot be the same")
 
+    clear_sync_diff(db)
     db.commit()
     db.refresh(fixture)
+    fixture_bundles.invalidate(db, [fixture.gameweek])
+    fixture_locks.invalidate([fixture.id])
     return _fixture_dict(fixture)
 
 
@@ -677,7 +1136,13 @@ def move_fixture(
         .filter(Prediction.fixture_id == fixture_id)
         .update({"gameweek": new_gw})
     )
+    # Both gameweeks' points (and wildcard doubling) can shift.
+    record_scoring_event(db, "fixture_moved", fixture_id=fixture_id, gameweek=old_gw)
+    record_scoring_event(db, "fixture_moved", fixture_id=fixture_id, gameweek=new_gw)
+    clear_sync_diff(db)
     db.commit()
+    fixture_bundles.invalidate(db, [old_gw, new_gw])
+    fixture_locks.invalidate([fixture_id])
 
     # Wildcard warning: only users who BOTH wildcarded old_gw AND have a prediction
     # on this fixture are actually affected (they lose the double on this match).
@@ -726,6 +1191,8 @@ def add_fixture(
     away = body.away_team.strip()
     if not home or not away:
         raise HTTPException(status_code=400, detail="home_team and away_team cannot be empty")
+    # Same spelling as the CSV upload, so the (home, away, gameweek) key matches.
+    home, away = canonical_team_name(home), canonical_team_name(away)
     if home == away:
         raise HTTPException(status_code=400, detail="home_team and away_team cannot be the same")
     try:
@@ -762,8 +1229,11 @@ def add_fixture(
         status="scheduled",
     )
     db.add(fixture)
+    clear_sync_diff(db)
     db.commit()
     db.refresh(fixture)
+    fixture_bundles.invalidate(db, [fixture.gameweek])
+    fixture_locks.invalidate([fixture.id])
     return _fixture_dict(fixture)
 
 
@@ -801,33 +1271,22 @@ def delete_fixture(
 
     # cascade="all, delete-orphan" on Fixture.predictions / Fixture.result
     # removes dependent rows automatically.
+    gameweek = fixture.gameweek
+    if fixture.result:
+        record_scoring_event(db, "fixture_deleted", fixture_id=fixture.id, gameweek=gameweek)
     db.delete(fixture)
+    clear_sync_diff(db)
     db.commit()
+    fixture_bundles.invalidate(db, [gameweek])
+    fixture_locks.invalidate([fixture_id])
     return {"deleted": True, "predictions_deleted": predictions_count}
 
 
 # ── Fixture sync (football-data.org diff preview + apply) ────────────────────
 
-FOOTBALL_DATA_MATCHES_URL = "https://api.football-data.org/v4/competitions/PL/matches"
-
-
-def _parse_api_kickoff(utc_date: str) -> tuple[str, str, datetime]:
-    """Split a football-data.org utcDate into (YYYY-MM-DD, HH:MM UK-local, aware UTC datetime).
-
-    Date and time are converted to Europe/London so they compare correctly against
-    CSV-sourced DB values (which use UK local time: 12:30, 15:00, 17:30, 20:00 etc).
-    Without this, every BST-season fixture generates a spurious KICKOFF_CHANGED diff
-    because 15:00 BST = 14:00 UTC and the times would never match.
-    """
-    from zoneinfo import ZoneInfo
-    _LONDON = ZoneInfo("Europe/London")
-    dt_utc = datetime.fromisoformat(utc_date.replace("Z", "+00:00"))
-    dt_local = dt_utc.astimezone(_LONDON)
-    return dt_local.strftime("%Y-%m-%d"), dt_local.strftime("%H:%M"), dt_utc
-
-
 @router.get("/fixtures/sync/preview")
-def preview_fixture_sync(
+async def preview_fixture_sync(
+    refresh: bool = False,
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
@@ -836,146 +1295,31 @@ def preview_fixture_sync(
     Read-only: returns a list of proposed changes for the admin to review.
     Nothing is applied here — the admin selects changes and posts them to
     /admin/fixtures/sync/apply.
+
+    The diff is normally precomputed by the background sync job and returned
+    straight from the database (``source``, ``computed_at`` and
+    ``age_seconds`` say how fresh it is). ``refresh=true`` recomputes it now,
+    revalidating the schedule upstream with ETag/If-Modified-Since. ``cached``
+    is true when this request made no upstream call.
     """
     api_key = os.environ.get("FOOTBALL_DATA_API_KEY")
     if not api_key:
         # Graceful "not configured" state — the UI renders a setup hint.
         return {"sync_available": False, "reason": "no_api_key", "changes": []}
 
+    if not refresh:
+        stored = await run_in_threadpool(load_sync_diff, db)
+        if stored is not None:
+            return sync_diff_payload(stored, cached=True)
+
     try:
-        resp = httpx.get(
-            FOOTBALL_DATA_MATCHES_URL,
-            headers={"X-Auth-Token": api_key},
-            timeout=10.0,
-        )
+        return await refresh_sync_diff(db, api_key, force=refresh, source="preview")
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Football-data.org request timed out")
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Football-data.org API error: {e.__class__.__name__}")
-    if resp.status_code != 200:
-        raise HTTPException(
-            status_code=502,
-            detail=f"Football-data.org API error: {resp.status_code}",
-        )
-
-    matches = resp.json().get("matches", [])
-
-    # Local lookups — ALL fixtures, including postponed (a postponed match is
-    # exactly the one whose reschedule we want to catch).
-    fixtures = db.query(Fixture).all()
-    by_teams: dict[tuple[str, str], Fixture] = {}
-    by_teams_gw: dict[tuple[str, str, int], Fixture] = {}
-    for f in fixtures:
-        key = (f.home_team.lower(), f.away_team.lower())
-        by_teams[key] = f
-        by_teams_gw[(key[0], key[1], f.gameweek)] = f
-
-    changes = []
-    unmapped: list[str] = []
-
-    def _map_side(team_obj: dict) -> str | None:
-        # shortName is usually closest to our DB names; fall back to full name.
-        return (
-            map_team_name(team_obj.get("shortName") or "")
-            or map_team_name(team_obj.get("name") or "")
-        )
-
-    for m in matches:
-        home = _map_side(m.get("homeTeam") or {})
-        away = _map_side(m.get("awayTeam") or {})
-        if home is None or away is None:
-            for side, mapped in ((m.get("homeTeam") or {}, home), (m.get("awayTeam") or {}, away)):
-                if mapped is None:
-                    api_name = side.get("shortName") or side.get("name") or "unknown"
-                    if api_name not in unmapped:
-                        unmapped.append(api_name)
-            continue
-
-        gameweek = m.get("matchday")
-        utc_date = m.get("utcDate")
-        if gameweek is None or not utc_date:
-            continue
-        api_date, api_time, api_dt = _parse_api_kickoff(utc_date)
-
-        api_block = {
-            "home_team": home,
-            "away_team": away,
-            "gameweek": gameweek,
-            "date": api_date,
-            "time": api_time,
-            "kickoff_utc": api_dt.isoformat(),
-        }
-
-        # Prefer the exact (home, away, gameweek) match, fall back to team pair.
-        local = (
-            by_teams_gw.get((home.lower(), away.lower(), gameweek))
-            or by_teams.get((home.lower(), away.lower()))
-        )
-
-        if local is None:
-            changes.append({
-                "change_id": str(uuid.uuid4()),
-                "type": "NEW_FIXTURE",
-                "api": api_block,
-                "local": None,
-                "description": (
-                    f"New fixture: {home} vs {away} — GW{gameweek}, {api_date} {api_time}"
-                ),
-            })
-            continue
-
-        local_block = {
-            "fixture_id": local.id,
-            "home_team": local.home_team,
-            "away_team": local.away_team,
-            "gameweek": local.gameweek,
-            "date": local.date.isoformat(),
-            "time": local.time or "",
-        }
-
-        gw_differs = local.gameweek != gameweek
-        kickoff_differs = (
-            local.date.isoformat() != api_date or (local.time or "") != api_time
-        )
-
-        if gw_differs:
-            # Higher priority than a kickoff change: the admin moves the GW
-            # first (via the Phase A move endpoint), then the kickoff diff
-            # will surface on the next preview if still relevant.
-            changes.append({
-                "change_id": str(uuid.uuid4()),
-                "type": "GAMEWEEK_CHANGED",
-                "api": api_block,
-                "local": local_block,
-                "description": (
-                    f"{home} vs {away}: gameweek {local.gameweek} → {gameweek}"
-                ),
-            })
-        elif kickoff_differs:
-            changes.append({
-                "change_id": str(uuid.uuid4()),
-                "type": "KICKOFF_CHANGED",
-                "api": api_block,
-                "local": local_block,
-                "description": (
-                    f"{home} vs {away} (GW{gameweek}): kickoff "
-                    f"{local_block['date']} {local_block['time'] or '--:--'}"
-                    f" → {api_date} {api_time}"
-                ),
-            })
-        # else: no diff — skip.
-
-    if unmapped:
-        # Console breadcrumb for whoever maintains team_mapping.py.
-        print(f"[fixture-sync] unmapped teams from football-data.org: {unmapped}")
-
-    return {
-        "sync_available": True,
-        "fetched_at": datetime.now(timezone.utc).isoformat(),
-        "api_match_count": len(matches),
-        "changes": changes,
-        "unmapped_teams": unmapped,
-    }
+    except FootballDataError as e:
+        raise HTTPException(status_code=502, detail=str(e))
 
 
 class SyncChange(BaseModel):
@@ -999,91 +1343,138 @@ class SyncApplyRequest(BaseModel):
     changes: list[SyncChange]
 
 
-def _apply_kickoff_change(change: SyncChange, db: Session) -> tuple[str, str]:
-    """Update a fixture's date/time/kickoff_time. Returns (status, detail)."""
+SYNC_APPLY_BATCH_SIZE = int(os.getenv("FIXTURE_SYNC_BATCH_SIZE", "100"))
+
+# Natural-key slot claimed by a NEW_FIXTURE planned earlier in the same batch.
+_PENDING_INSERT = -1
+
+
+def _sync_prefetch(db: Session, changes: list[SyncChange]) -> tuple[dict[int, dict], dict[tuple, int]]:
+    """Load everything a batch of changes needs, in two queries.
+
+    Returns (fixtures, occupied): the referenced fixtures by id (with a
+    ``result_id`` so "already has a result" needs no extra lookup), and the
+    id of every fixture currently holding a (home, away, gameweek) key that a
+    change could move or insert into.
+    """
+    ids = {c.fixture_id for c in changes if c.fixture_id is not None}
+    fixtures: dict[int, dict] = {}
+    if ids:
+        rows = db.execute(
+            select(
+                Fixture.id, Fixture.home_team, Fixture.away_team, Fixture.gameweek,
+                Fixture.date, Fixture.time, Result.id.label("result_id"),
+            )
+            .outerjoin(Result, Result.fixture_id == Fixture.id)
+            .where(Fixture.id.in_(ids))
+        ).mappings()
+        fixtures = {row["id"]: dict(row) for row in rows}
+
+    keys = set()
+    for c in changes:
+        if c.type == "GAMEWEEK_CHANGED" and c.fixture_id in fixtures and c.new_gameweek is not None:
+            f = fixtures[c.fixture_id]
+            keys.add((f["home_team"], f["away_team"], c.new_gameweek))
+        elif c.type == "NEW_FIXTURE" and c.gameweek is not None:
+            keys.add(((c.home_team or "").strip(), (c.away_team or "").strip(), c.gameweek))
+
+    occupied: dict[tuple, int] = {}
+    if keys:
+        rows = db.execute(
+            select(Fixture.id, Fixture.home_team, Fixture.away_team, Fixture.gameweek)
+            .where(tuple_(Fixture.home_team, Fixture.away_team, Fixture.gameweek).in_(keys))
+        )
+        occupied = {(home, away, gw): fixture_id for fixture_id, home, away, gw in rows}
+    return fixtures, occupied
+
+
+def _plan_update(plan: dict, fixture: dict, **values) -> None:
+    plan["updates"].setdefault(fixture["id"], {"id": fixture["id"]}).update(values)
+    plan["gameweeks"].add(fixture["gameweek"])
+
+
+def _plan_kickoff_change(change: SyncChange, fixtures: dict, occupied: dict, plan: dict) -> tuple[str, str]:
+    """Stage a fixture's date/time/kickoff_time update. Returns (status, detail)."""
     if change.fixture_id is None or not change.new_date or not change.new_time:
         return "error", "fixture_id, new_date and new_time are required"
-    fixture = db.query(Fixture).filter(Fixture.id == change.fixture_id).first()
+    fixture = fixtures.get(change.fixture_id)
     if not fixture:
         return "error", f"Fixture {change.fixture_id} not found"
-    if fixture.result:
+    if fixture["result_id"] is not None:
         # A result may have landed between preview and apply — skip, don't fail.
-        return "skipped", f"{fixture.home_team} vs {fixture.away_team} already has a result"
+        return "skipped", f"{fixture['home_team']} vs {fixture['away_team']} already has a result"
     try:
-        fixture.date = datetime.strptime(change.new_date, "%Y-%m-%d").date()
+        new_date = datetime.strptime(change.new_date, "%Y-%m-%d").date()
     except ValueError:
         return "error", "new_date must be YYYY-MM-DD"
-    fixture.day = fixture.date.strftime("%a")
-    fixture.time = change.new_time.strip()
-    fixture.kickoff_time = _parse_kickoff(fixture.date, fixture.time)
-    db.commit()
+    new_time = change.new_time.strip()
+    fixture.update(date=new_date, time=new_time)
+    _plan_update(
+        plan, fixture,
+        date=new_date, day=new_date.strftime("%a"), time=new_time,
+        kickoff_time=_parse_kickoff(new_date, new_time),
+    )
     return "applied", (
-        f"{fixture.home_team} vs {fixture.away_team} kickoff → "
-        f"{change.new_date} {fixture.time}"
+        f"{fixture['home_team']} vs {fixture['away_team']} kickoff → "
+        f"{change.new_date} {new_time}"
     )
 
 
-def _apply_gameweek_change(change: SyncChange, db: Session) -> tuple[str, str]:
-    """Move a fixture to a new gameweek, cascading predictions. Returns (status, detail)."""
+def _plan_gameweek_change(change: SyncChange, fixtures: dict, occupied: dict, plan: dict) -> tuple[str, str]:
+    """Stage a gameweek move, cascading predictions. Returns (status, detail)."""
     if change.fixture_id is None or change.new_gameweek is None:
         return "error", "fixture_id and new_gameweek are required"
     if not (1 <= change.new_gameweek <= 38):
         return "error", "new_gameweek must be between 1 and 38"
-    fixture = db.query(Fixture).filter(Fixture.id == change.fixture_id).first()
+    fixture = fixtures.get(change.fixture_id)
     if not fixture:
         return "error", f"Fixture {change.fixture_id} not found"
-    if fixture.result:
-        return "skipped", f"{fixture.home_team} vs {fixture.away_team} already has a result"
-    if fixture.gameweek == change.new_gameweek:
+    if fixture["result_id"] is not None:
+        return "skipped", f"{fixture['home_team']} vs {fixture['away_team']} already has a result"
+    if fixture["gameweek"] == change.new_gameweek:
         return "skipped", "Fixture is already in this gameweek"
 
-    # Same natural key guard as move_fixture: (home, away, gameweek).
-    collision = (
-        db.query(Fixture)
-        .filter(
-            Fixture.home_team == fixture.home_team,
-            Fixture.away_team == fixture.away_team,
-            Fixture.gameweek == change.new_gameweek,
-            Fixture.id != fixture.id,
-        )
-        .first()
-    )
-    if collision:
+    # Same natural key guard as move_fixture: (home, away, gameweek), including
+    # keys claimed by earlier changes in this batch.
+    home, away, old_gw = fixture["home_team"], fixture["away_team"], fixture["gameweek"]
+    target = (home, away, change.new_gameweek)
+    if occupied.get(target, fixture["id"]) != fixture["id"]:
         return "error", (
-            f"{fixture.home_team} vs {fixture.away_team} already exists "
+            f"{home} vs {away} already exists "
             f"in gameweek {change.new_gameweek}"
         )
+    if occupied.get((home, away, old_gw)) == fixture["id"]:
+        del occupied[(home, away, old_gw)]
+    occupied[target] = fixture["id"]
+
+    plan["gameweeks"].add(old_gw)
+    fixture["gameweek"] = change.new_gameweek
+    _plan_update(plan, fixture, gameweek=change.new_gameweek)
+    plan["moves"][fixture["id"]] = change.new_gameweek
+    plan["moved_from"].setdefault(fixture["id"], old_gw)
 
-    old_gw = fixture.gameweek
-    # One transaction: fixture + its predictions' denormalized gameweek.
-    fixture.gameweek = change.new_gameweek
-    db.query(Prediction).filter(Prediction.fixture_id == fixture.id).update(
-        {"gameweek": change.new_gameweek}
-    )
     # Also update date/time if provided (API moves typically imply a new kickoff).
     if change.new_date:
         try:
-            fixture.date = datetime.strptime(change.new_date, "%Y-%m-%d").date()
-            fixture.day = fixture.date.strftime("%a")
+            fixture["date"] = datetime.strptime(change.new_date, "%Y-%m-%d").date()
+            _plan_update(plan, fixture, date=fixture["date"], day=fixture["date"].strftime("%a"))
         except ValueError:
             pass
     if change.new_time:
-        fixture.time = change.new_time.strip()
+        fixture["time"] = change.new_time.strip()
+        _plan_update(plan, fixture, time=fixture["time"])
     if change.new_date or change.new_time:
-        fixture.kickoff_time = _parse_kickoff(fixture.date, fixture.time)
-    db.commit()
-    return "applied", (
-        f"{fixture.home_team} vs {fixture.away_team} moved "
-        f"GW{old_gw} → GW{change.new_gameweek}"
-    )
+        _plan_update(plan, fixture, kickoff_time=_parse_kickoff(fixture["date"], fixture["time"]))
+    return "applied", f"{home} vs {away} moved GW{old_gw} → GW{change.new_gameweek}"
 
 
-def _apply_new_fixture(change: SyncChange, db: Session) -> tuple[str, str]:
-    """Insert a new fixture (idempotent on the natural key). Returns (status, detail)."""
+def _plan_new_fixture(change: SyncChange, fixtures: dict, occupied: dict, plan: dict) -> tuple[str, str]:
+    """Stage a new fixture (idempotent on the natural key). Returns (status, detail)."""
     home = (change.home_team or "").strip()
     away = (change.away_team or "").strip()
     if not home or not away or change.gameweek is None or not change.date:
         return "error", "home_team, away_team, gameweek and date are required"
+    home, away = canonical_team_name(home), canonical_team_name(away)
     if home == away:
         return "error", "home_team and away_team cannot be the same"
     if not (1 <= change.gameweek <= 38):
@@ -1093,36 +1484,82 @@ def _apply_new_fixture(change: SyncChange, db: Session) -> tuple[str, str]:
     except ValueError:
         return "error", "date must be YYYY-MM-DD"
 
-    existing = (
-        db.query(Fixture)
-        .filter(
-            Fixture.home_team == home,
-            Fixture.away_team == away,
-            Fixture.gameweek == change.gameweek,
-        )
-        .first()
-    )
-    if existing:
+    key = (home, away, change.gameweek)
+    if key in occupied:
         # Idempotent: applying the same NEW_FIXTURE twice is a no-op skip.
         return "skipped", f"{home} vs {away} already exists in gameweek {change.gameweek}"
+    occupied[key] = _PENDING_INSERT
 
     time_str = (change.time or "").strip()
-    fixture = Fixture(
-        gameweek=change.gameweek,
-        date=fixture_date,
-        day=fixture_date.strftime("%a"),
-        time=time_str,
-        home_team=home,
-        away_team=away,
-        venue="",
-        kickoff_time=_parse_kickoff(fixture_date, time_str),
-        status="scheduled",
-    )
-    db.add(fixture)
-    db.commit()
+    plan["gameweeks"].add(change.gameweek)
+    plan["inserts"].append({
+        "gameweek": change.gameweek,
+        "date": fixture_date,
+        "day": fixture_date.strftime("%a"),
+        "time": time_str,
+        "home_team": home,
+        "away_team": away,
+        "venue": "",
+        "kickoff_time": _parse_kickoff(fixture_date, time_str),
+        "status": "scheduled",
+    })
     return "applied", f"Added {home} vs {away} — GW{change.gameweek}, {change.date} {time_str}"
 
 
+_SYNC_PLANNERS = {
+    "KICKOFF_CHANGED": _plan_kickoff_change,
+    "GAMEWEEK_CHANGED": _plan_gameweek_change,
+    "NEW_FIXTURE": _plan_new_fixture,
+}
+
+
+def _execute_sync_plan(db: Session, plan: dict) -> None:
+    """Write a batch's staged changes as (at most) three bulk statements, plus
+    the scoring events for any gameweek moves."""
+    if plan["updates"]:
+        db.execute(update(Fixture), list(plan["updates"].values()))
+    if plan["moves"]:
+        # Predictions carry a denormalized gameweek; move them in the same
+        # statement set as their fixtures.
+        db.execute(
+            update(Prediction)
+            .where(Prediction.fixture_id.in_(plan["moves"]))
+            .values(gameweek=case(plan["moves"], value=Prediction.fixture_id))
+            .execution_options(synchronize_session=False)
+        )
+        record_scoring_events(db, [
+            {"kind": "fixture_moved", "fixture_id": fixture_id, "gameweek": gw}
+            for fixture_id, new_gw in plan["moves"].items()
+            for gw in (plan["moved_from"][fixture_id], new_gw)
+        ])
+    if plan["inserts"]:
+        _link_team_ids(db, plan["inserts"])
+        db.execute(insert(Fixture), plan["inserts"])
+
+
+def _apply_sync_batch(db: Session, changes: list[SyncChange], touched: set[int]) -> list[dict]:
+    """Validate a batch against prefetched state, then write it in a savepoint.
+
+    Gameweeks whose fixtures were written are added to ``touched``. Raises if
+    the writes fail; the savepoint is rolled back and the caller decides how
+    to isolate the bad change.
+    """
+    fixtures, occupied = _sync_prefetch(db, changes)
+    plan: dict = {"updates": {}, "moves": {}, "moved_from": {}, "inserts": [], "gameweeks": set()}
+    results = []
+    for change in changes:
+        planner = _SYNC_PLANNERS.get(change.type)
+        if planner is None:
+            status, detail = "error", f"Unknown change type: {change.type}"
+        else:
+            status, detail = planner(change, fixtures, occupied, plan)
+        results.append({"change_id": change.change_id, "status": status, "detail": detail})
+    with db.begin_nested():
+        _execute_sync_plan(db, plan)
+    touched |= plan["gameweeks"]
+    return results
+
+
 @router.post("/fixtures/sync/apply")
 def apply_fixture_sync(
     body: SyncApplyRequest,
@@ -1132,39 +1569,56 @@ def apply_fixture_sync(
     """Apply an admin-selected subset of changes from the sync preview.
 
     Each change is self-described, so no re-fetch of football-data.org is
-    needed. Changes are applied independently: one failing change is reported
-    as an error but does not block the others.
+    needed. Changes are applied in batches of ``SYNC_APPLY_BATCH_SIZE``: each
+    batch prefetches the fixtures it touches, writes with bulk statements
+    inside a savepoint and commits. If a batch's writes fail, that batch is
+    retried one change at a time, so one bad change is reported as an error
+    without blocking the others.
     """
-    handlers = {
-        "KICKOFF_CHANGED": _apply_kickoff_change,
-        "GAMEWEEK_CHANGED": _apply_gameweek_change,
-        "NEW_FIXTURE": _apply_new_fixture,
-    }
-
     results = []
-    for change in body.changes:
-        handler = handlers.get(change.type)
-        if handler is None:
-            results.append({
-                "change_id": change.change_id,
-                "status": "error",
-                "detail": f"Unknown change type: {change.type}",
-            })
-            continue
+    batches = 0
+    touched: set[int] = set()
+    for start in range(0, len(body.changes), SYNC_APPLY_BATCH_SIZE):
+        batch = body.changes[start:start + SYNC_APPLY_BATCH_SIZE]
+        batches += 1
         try:
-            status, detail = handler(change, db)
-        except Exception as e:  # keep one bad change from poisoning the batch
+            results.extend(_apply_sync_batch(db, batch, touched))
+            db.commit()
+            metrics.incr("fixture_sync.batches")
+            continue
+        except Exception as e:
             db.rollback()
-            # Log the full exception server-side; return only a generic message
-            # to the client so internal details (paths, SQL, etc.) don't leak.
-            print(f"❌ [fixture-sync] apply failed for {change.change_id}: {e}")
-            status, detail = "error", "Unexpected error applying this change"
-        results.append({"change_id": change.change_id, "status": status, "detail": detail})
+            print(f"⚠️ [fixture-sync] batch of {len(batch)} failed, retrying one by one: {e}")
+            metrics.incr("fixture_sync.batch_fallbacks")
+
+        for change in batch:
+            try:
+                results.extend(_apply_sync_batch(db, [change], touched))
+                db.commit()
+            except Exception as e:  # keep one bad change from poisoning the batch
+                db.rollback()
+                # Log the full exception server-side; return only a generic message
+                # to the client so internal details (paths, SQL, etc.) don't leak.
+                print(f"❌ [fixture-sync] apply failed for {change.change_id}: {e}")
+                results.append({
+                    "change_id": change.change_id,
+                    "status": "error",
+                    "detail": "Unexpected error applying this change",
+                })
+
+    if touched:
+        fixture_bundles.invalidate(db, touched)
+        fixture_locks.invalidate()
+    if any(r["status"] == "applied" for r in results):
+        # The stored preview now proposes changes that already happened.
+        clear_sync_diff(db)
+        db.commit()
 
     return {
         "applied": sum(1 for r in results if r["status"] == "applied"),
         "skipped": sum(1 for r in results if r["status"] == "skipped"),
         "errors": sum(1 for r in results if r["status"] == "error"),
+        "batches": batches,
         "results": results,
     }
 
@@ -1245,9 +1699,9 @@ def list_invites(
                 "status": _invite_status(i),
                 "recipient_name": i.recipient_name,
                 "recipient_email": i.recipient_email,
-                "created_at": i.created_at.isoformat() if i.created_at else None,
-                "expires_at": i.expires_at.isoformat() if i.expires_at else None,
-                "used_at": i.used_at.isoformat() if i.used_at else None,
+                "created_at": i.created_at,
+                "expires_at": i.expires_at,
+                "used_at": i.used_at,
                 "used_by": redeemer_lookup.get(i.used_by),
                 "invite_url": f"/register?invite={i.token}",
             }
@@ -1277,14 +1731,56 @@ def revoke_invite(
     return {"message": "Invite revoked"}
 
 
+# ── Seasons ───────────────────────────────────────────────────────────────────
+
+class ArchiveSeasonRequest(BaseModel):
+    next_season: str
+    season_name: Optional[str] = None  # display label; defaults to next_season
+    force: bool = False
+
+
+@router.post("/seasons/archive")
+def archive_current_season(
+    body: ArchiveSeasonRequest,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """
+    Archive the active season and start ``next_season``.
+
+    The final standings are frozen, the season's fixtures, results,
+    predictions and wildcards move into ``season_archives`` (compressed) and
+    the hot tables are left empty for the new season. The display season
+    name is replaced by ``season_name`` (or ``next_season``); the response
+    says what it now is. Refused (400) while fixtures are still unscored
+    unless ``force`` is set.
+    """
+    try:
+        summary = archive_season(db, body.next_season, season_name=body.season_name, force=body.force)
+        db.commit()
+    except SeasonArchiveError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        print("❌ Error archiving season:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to archive season")
+    fixture_bundles.invalidate(db)
+    fixture_locks.invalidate()
+    print(f"✅ Season {summary['archived']} archived by {current_admin.username}; {summary['active']} is active")
+    return summary
+
+
 # ── Simulate ──────────────────────────────────────────────────────────────────
 
+# Canonical names (as in fixtures.csv / team_mapping), so simulated data
+# matches uploaded and synced fixtures.
 _SIM_TEAMS = [
     "Arsenal", "Aston Villa", "Brentford", "Brighton",
     "Chelsea", "Crystal Palace", "Everton", "Fulham",
-    "Ipswich", "Leicester", "Liverpool", "Man City",
-    "Man United", "Newcastle", "Nott'm Forest", "Southampton",
-    "Spurs", "West Ham", "Wolves", "Bournemouth",
+    "Ipswich Town", "Leicester City", "Liverpool", "Manchester City",
+    "Manchester Utd", "Newcastle Utd", "Nottingham Forest", "Southampton",
+    "Tottenham", "West Ham", "Wolves", "Bournemouth",
 ]
 
 _SIM_VENUES = {
@@ -1292,19 +1788,16 @@ _SIM_VENUES = {
     "Brentford": "Gtech Community Stadium", "Brighton": "Amex Stadium",
     "Chelsea": "Stamford Bridge", "Crystal Palace": "Selhurst Park",
     "Everton": "Goodison Park", "Fulham": "Craven Cottage",
-    "Ipswich": "Portman Road", "Leicester": "King Power Stadium",
-    "Liverpool": "Anfield", "Man City": "Etihad Stadium",
-    "Man United": "Old Trafford", "Newcastle": "St. James' Park",
-    "Nott'm Forest": "City Ground", "Southampton": "St. Mary's Stadium",
-    "Spurs": "Tottenham Hotspur Stadium", "West Ham": "London Stadium",
+    "Ipswich Town": "Portman Road", "Leicester City": "King Power Stadium",
+    "Liverpool": "Anfield", "Manchester City": "Etihad Stadium",
+    "Manchester Utd": "Old Trafford", "Newcastle Utd": "St. James' Park",
+    "Nottingham Forest": "City Ground", "Southampton": "St. Mary's Stadium",
+    "Tottenham": "Tottenham Hotspur Stadium", "West Ham": "London Stadium",
     "Wolves": "Molineux", "Bournemouth": "Vitality Stadium",
 }
 
-_GOAL_WEIGHTS = [18, 30, 25, 15, 8, 4]  # prob for 0-5 goals, roughly realistic
-
-
 def _sim_goal() -> int:
-    return random.choices(range(6), weights=_GOAL_WEIGHTS)[0]
+    return random.choices(range(len(GOAL_WEIGHTS)), weights=GOAL_WEIGHTS)[0]
 
 
 def _round_robin_rounds(teams: list, num_rounds: int) -> list:
@@ -1332,7 +1825,8 @@ def simulate(
 ):
     """
     Full reset + simulation.
-    Wipes all fixtures/predictions/results/wildcards then seeds:
+    Archives the active season (see ``archive_before_reset``), so nothing is
+    lost, then seeds:
       - 10 gameweeks x 10 fixtures (round-robin from 20 PL teams)
       - Random predictions for every user (admins included)
       - Random results for every fixture (all GWs scored)
@@ -1343,12 +1837,16 @@ def simulate(
     if os.environ.get("ENVIRONMENT") == "production":
         raise HTTPException(status_code=403, detail="Simulation is disabled in production")
 
-    # 1. Wipe existing data
-    db.query(Wildcard).delete()
-    db.query(Prediction).delete()
-    db.query(Result).delete()
-    db.query(Fixture).delete()
-    db.commit()
+    # 1. Archive existing data, leaving the hot tables empty
+    try:
+        archived = archive_before_reset(db, "sim")
+        clear_sync_diff(db)
+        db.commit()
+    except SeasonArchiveError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    fixture_bundles.invalidate(db)
+    fixture_locks.invalidate()
 
     # 2. Generate fixtures
     rounds = _round_robin_rounds(_SIM_TEAMS, 10)
@@ -1390,6 +1888,8 @@ def simulate(
                 predicted_home=_sim_goal(),
                 predicted_away=_sim_goal(),
             ))
+    db.flush()
+    rebuild_consensus(db)
     db.commit()
 
     # 5. Results — score all 10 GWs
@@ -1401,10 +1901,14 @@ def simulate(
             actual_away=_sim_goal(),
         ))
         fixture.status = "completed"
+    record_scoring_event(db, "reset")
     db.commit()
+    fixture_bundles.invalidate(db)
+    fixture_locks.invalidate()
 
     return {
         "message": "Simulation complete",
+        "archived": archived["archived"] if archived else None,
         "gameweeks": 10,
         "fixtures": len(all_fixtures),
         "users_simulated": len(users),
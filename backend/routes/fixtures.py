@@ -1,18 +1,37 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
 from typing import Optional
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from database import get_db
-from models import Fixture
+from models import Fixture, PredictionConsensus, Team, User
+from auth import get_current_user
+from consensus import consensus_summary
+from responses import FastJSONResponse
+from fixture_bundles import fixture_bundles, fixture_row
+from fixture_locks import fixture_locks
+from teams import resolve_team_id
 
 router = APIRouter(prefix="/fixtures", tags=["Fixtures"])
 
+
+def _team_ids_for(db: Session, name: str) -> list[int]:
+    """Team ids a name filter refers to: the club it resolves to, else any
+    team whose name contains it (the teams table is a few dozen rows)."""
+    team_id = resolve_team_id(db, name)
+    if team_id is not None:
+        return [team_id]
+    return list(db.scalars(select(Team.id).where(Team.name.ilike(f"%{name}%"))))
+
+
 @router.get("/")
 def get_fixtures(
-    gameweek: Optional[int] = Query(None),
+    request: Request,
+    gameweek: Optional[int] = Query(None, ge=1, le=38),
     team: Optional[str] = Query(None),
     away_team: Optional[str] = Query(None),
+    team_id: Optional[int] = Query(None),
     date: Optional[str] = Query(None),  # expected format: YYYY-MM-DD
     db: Session = Depends(get_db)
 ):
@@ -22,18 +41,32 @@ def get_fixtures(
     - **gameweek**: Filter by gameweek number (1-38)
     - **team**: Filter by home team name
     - **away_team**: Filter by away team name
+    - **team_id**: Filter by team id, home or away (see ``/fixtures/teams``)
     - **date**: Filter by match date (YYYY-MM-DD)
+
+    Team names are resolved to team ids first — any known spelling works
+    ("Man United" finds "Manchester Utd"), as does part of a name — so every
+    team filter is an indexed integer comparison.
+
+    With no filter other than ``gameweek`` the response comes from the
+    precomputed bundles in ``fixture_bundles``.
     """
     try:
+        if team is None and away_team is None and team_id is None and date is None:
+            # The common calls: whole season, or one gameweek.
+            return fixture_bundles.get(db, gameweek).to_response(request)
+
         query = db.query(Fixture)
 
         # Apply filters
         if gameweek is not None:
             query = query.filter(Fixture.gameweek == gameweek)
         if team:
-            query = query.filter(Fixture.home_team.ilike(f"%{team}%"))
+            query = query.filter(Fixture.home_team_id.in_(_team_ids_for(db, team)))
         if away_team:
-            query = query.filter(Fixture.away_team.ilike(f"%{away_team}%"))
+            query = query.filter(Fixture.away_team_id.in_(_team_ids_for(db, away_team)))
+        if team_id is not None:
+            query = query.filter(or_(Fixture.home_team_id == team_id, Fixture.away_team_id == team_id))
         if date:
             # Parse date string to date object
             date_obj = datetime.strptime(date, "%Y-%m-%d").date()
@@ -44,27 +77,55 @@ def get_fixtures(
 
         fixtures = query.all()
 
-        # Convert to dict for JSON response
-        fixtures_data = [
-            {
-                "id": f.id,
-                "gameweek": f.gameweek,
-                "date": f.date.isoformat(),
-                "day": f.day,
-                "time": f.time,
-                "home_team": f.home_team,
-                "away_team": f.away_team,
-                "venue": f.venue,
-                "kickoff_time": f.kickoff_time.isoformat() if f.kickoff_time else None,
-                "status": f.status,
-            }
-            for f in fixtures
-        ]
+        # Dates are left as date/datetime objects — the response class
+        # serialises them natively, and returning it directly skips the
+        # jsonable_encoder pass over all 380 rows.
+        fixtures_data = [fixture_row(f) for f in fixtures]
 
-        return {"fixtures": fixtures_data}
+        return FastJSONResponse({"fixtures": fixtures_data})
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
     except Exception as e:
         print("❌ Error fetching fixtures:", str(e))
         raise HTTPException(status_code=500, detail="Failed to fetch fixtures")
+
+
+@router.get("/teams")
+def get_teams(db: Session = Depends(get_db)):
+    """All teams with their ids, for the ``team_id`` fixture filter."""
+    teams = db.query(Team).order_by(Team.name).all()
+    return {
+        "teams": [
+            {"id": t.id, "name": t.name, "short_name": t.short_name, "venue": t.venue}
+            for t in teams
+        ]
+    }
+
+
+@router.get("/{fixture_id}/consensus")
+def get_fixture_consensus(
+    fixture_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    How everyone predicted a fixture: home/draw/away split, the most popular
+    scorelines and average goals.
+
+    Hidden from players until kickoff (or until a result is in, for fixtures
+    without a kickoff time) so nobody can copy the crowd; admins can always
+    see it.
+    """
+    lock = fixture_locks.get(db, fixture_id)
+    if lock is None:
+        raise HTTPException(status_code=404, detail="Fixture not found")
+    locked = lock.kickoff_passed() or lock.has_result
+    if not locked and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Consensus is available once the fixture kicks off")
+    try:
+        summary = consensus_summary(db.get(PredictionConsensus, fixture_id))
+        return FastJSONResponse({"fixture_id": fixture_id, "locked": locked, **summary})
+    except Exception as e:
+        print(f"❌ Error fetching consensus for fixture {fixture_id}:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to fetch consensus")
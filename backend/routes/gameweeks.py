@@ -0,0 +1,154 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Path, Depends
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import User, Prediction, Fixture, Result, Wildcard
+from auth import get_current_user
+from fixture_bundles import fixture_row
+from prediction_queue import prediction_queue
+from responses import FastJSONResponse
+from routes.results import completed_gameweeks
+
+router = APIRouter(prefix="/gameweeks", tags=["Gameweeks"])
+
+
+def _kickoff_passed(fixture: Fixture, now: datetime) -> bool:
+    # Same rule as submit_prediction: naive kickoffs are UTC, null never locks.
+    kickoff = fixture.kickoff_time
+    if kickoff is None:
+        return False
+    if kickoff.tzinfo is None:
+        kickoff = kickoff.replace(tzinfo=timezone.utc)
+    return now >= kickoff
+
+
+def _gameweek_view(db: Session, user: User, gameweek: int) -> dict:
+    """
+    Fixtures for one gameweek with the caller's prediction, the result and
+    lock state embedded, plus the caller's wildcard state.
+
+    Fixtures, predictions and results come back from a single outer-joined
+    query; the caller's wildcard gameweek (one per season) rides along on
+    every row as a scalar subquery.
+    """
+    wildcard_gameweek = (
+        select(Wildcard.gameweek)
+        .where(Wildcard.user_id == user.id)
+        .order_by(Wildcard.gameweek)
+        .limit(1)
+        .scalar_subquery()
+    )
+    rows = (
+        db.query(Fixture, Prediction, Result, wildcard_gameweek.label("wildcard_gameweek"))
+        .outerjoin(
+            Prediction,
+            and_(Prediction.fixture_id == Fixture.id, Prediction.user_id == user.id),
+        )
+        .outerjoin(Result, Result.fixture_id == Fixture.id)
+        .filter(Fixture.gameweek == gameweek)
+        .order_by(Fixture.date, Fixture.time)
+        .all()
+    )
+
+    if rows:
+        used_gameweek = rows[0].wildcard_gameweek
+    else:
+        # No fixtures to carry the subquery — ask for it directly.
+        used_gameweek = db.execute(select(wildcard_gameweek)).scalar()
+
+    # Accepted but not yet flushed predictions (write-behind queue) win over
+    # what the database holds, so a reload straight after saving shows them.
+    queued = {}
+    if prediction_queue.enabled:
+        queued = {e["fixture_id"]: e for e in prediction_queue.pending(user.id, gameweek)}
+
+    now = datetime.now(timezone.utc)
+    fixtures = []
+    for fixture, prediction, result, _ in rows:
+        postponed = fixture.status == "postponed"
+        kickoff_passed = _kickoff_passed(fixture, now)
+        row = fixture_row(fixture)
+        pending = queued.get(fixture.id)
+        if pending is not None:
+            row["prediction"] = {
+                "id": prediction.id if prediction is not None else None,
+                "predicted_home": pending["predicted_home"],
+                "predicted_away": pending["predicted_away"],
+                "updated_at": None,
+                "queued": True,
+            }
+        else:
+            row["prediction"] = None if prediction is None else {
+                "id": prediction.id,
+                "predicted_home": prediction.predicted_home,
+                "predicted_away": prediction.predicted_away,
+                "updated_at": prediction.updated_at,
+            }
+        row["result"] = None if result is None else {
+            "id": result.id,
+            "actual_home": result.actual_home,
+            "actual_away": result.actual_away,
+        }
+        row["lock"] = {
+            "postponed": postponed,
+            "kickoff_passed": kickoff_passed,
+            "result_entered": result is not None,
+            "locked": postponed or kickoff_passed or result is not None,
+        }
+        fixtures.append(row)
+
+    # Wildcard changes freeze once any result is in; a wildcard spent on
+    # another gameweek can't be moved here either.
+    has_results = any(f["result"] is not None for f in fixtures)
+    return {
+        "gameweek": gameweek,
+        "fixtures": fixtures,
+        "wildcard": {
+            "active": used_gameweek == gameweek,
+            "used_gameweek": used_gameweek,
+            "locked": has_results or (used_gameweek is not None and used_gameweek != gameweek),
+        },
+    }
+
+
+@router.get("/current/view")
+def get_current_gameweek_view(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    The view for the first gameweek that isn't completed yet (38 once the
+    season is done). Used on page load so the client doesn't need a separate
+    completed-gameweeks request to decide where to start.
+    """
+    try:
+        completed = completed_gameweeks(db)
+        done = set(completed)
+        gameweek = next((gw for gw in range(1, 39) if gw not in done), 38)
+        view = _gameweek_view(db, current_user, gameweek)
+        view["completed_gameweeks"] = completed
+        return FastJSONResponse(view)
+    except Exception as e:
+        print("❌ Error fetching current gameweek view:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to load gameweek")
+
+
+@router.get("/{gameweek}/view")
+def get_gameweek_view(
+    gameweek: int = Path(..., ge=1, le=38),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Everything the predictions and results pages need for one gameweek in
+    one request: fixtures with the caller's prediction, the result and
+    per-fixture lock state, plus the caller's wildcard state.
+    """
+    try:
+        return FastJSONResponse(_gameweek_view(db, current_user, gameweek))
+    except Exception as e:
+        print(f"❌ Error fetching gameweek {gameweek} view:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to load gameweek")
@@ -1,15 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import Prediction, Result, User, Fixture, Wildcard
-from scoring import compute_gameweek_points, calculate_points
+from models import User
+from auth import get_current_user
+from fixture_locks import fixture_locks
+from limiter import limiter
+from projection import PROJECTION_DEFAULT_SIMULATIONS, PROJECTION_MAX_SIMULATIONS, project_season
+from routes.results import ResultScore
+from standings import standings_cache, what_if_standings
 
 router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
 
 
+class WhatIfScenario(BaseModel):
+    results: list[ResultScore] = Field(min_length=1, max_length=50)
+
+
 @router.get("/")
-def get_leaderboard(db: Session = Depends(get_db)):
+def get_leaderboard(request: Request, db: Session = Depends(get_db)):
     """
     Get the leaderboard with all users' scores across all gameweeks.
 
@@ -19,82 +29,119 @@ def get_leaderboard(db: Session = Depends(get_db)):
     - Score for each gameweek (week_1 through week_38)
     - Total score
 
+    Also returns ``version`` — the scoring version the board reflects. Pass it
+    back to ``/leaderboard/changes`` to fetch only what changed since.
+
+    The serialised body (and its gzip/brotli variants) is cached with the
+    board, so repeat requests neither rebuild nor re-encode it.
+
     Scoring system:
     - Exact score: 5 points
     - Correct result: 2 points
     - Wrong prediction: 0 points
     """
     try:
-        # Fetch all predictions, results, and users
-        predictions = db.query(Prediction).all()
-        results = db.query(Result).all()
-        users = db.query(User).all()
-
-        # Fixtures that are postponed must not contribute to scoring even if a
-        # stale result lingers on them.
-        postponed_fixture_ids = {
-            f.id for f in db.query(Fixture).filter(Fixture.status == "postponed").all()
-        }
-
-        # Create lookup dictionaries
-        result_lookup = {r.fixture_id: r for r in results}
-        user_lookup = {u.id: u.username for u in users}
-
-        # (user_id, gameweek) pairs that have an active wildcard — drives x2.
-        wildcard_lookup = {
-            (w.user_id, w.gameweek) for w in db.query(Wildcard).all()
-        }
-
-        # Shared scoring helper: returns {user_id: {gameweek: doubled_points}},
-        # already applying postponed exclusion and wildcard doubling so the
-        # leaderboard and admin totals can never diverge.
-        leaderboard = compute_gameweek_points(
-            predictions, result_lookup, postponed_fixture_ids, wildcard_lookup
-        )
-
-        # Count exact score predictions per player (raw count, not points).
-        # Postponed fixtures are excluded — a stale result on a postponed fixture
-        # should never contribute.
-        exact_counts = {}
-        for pred in predictions:
-            if pred.fixture_id in postponed_fixture_ids:
-                continue
-            result = result_lookup.get(pred.fixture_id)
-            if result is None:
-                continue
-            if calculate_points(pred.predicted_home, pred.predicted_away,
-                                result.actual_home, result.actual_away) == 5:
-                exact_counts[pred.user_id] = exact_counts.get(pred.user_id, 0) + 1
-
-        # Format leaderboard for response
-        formatted = []
-        for user_id, scores in leaderboard.items():
-            row = {
-                "player": user_lookup.get(user_id, f"Unknown ({user_id[:8]})"),
-                "exact_scores": exact_counts.get(user_id, 0),
-            }
-
-            # Add scores for all 38 gameweeks
-            total = 0
-            for week in range(1, 39):
-                week_score = scores.get(week, 0)
-                row[f"week_{week}"] = week_score
-                total += week_score
-
-            row["total"] = total
-            formatted.append(row)
-
-        # Sort by total score (descending)
-        sorted_leaderboard = sorted(formatted, key=lambda x: x["total"], reverse=True)
-
-        # Add rank
-        for idx, row in enumerate(sorted_leaderboard, start=1):
-            row["rank"] = idx
-
-        print(f"✅ Leaderboard calculated: {len(sorted_leaderboard)} players")
-
-        return {"leaderboard": sorted_leaderboard}
+        return standings_cache.current_body(db).to_response(request)
 
     except Exception as e:
         print("❌ Error generating leaderboard:", str(e))
         raise HTTPException(status_code=500, detail="Failed to calculate leaderboard")
+
+
+@router.get("/changes")
+def get_leaderboard_changes(
+    since: int = Query(..., ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Leaderboard rows that changed since scoring version ``since``.
+
+    - **changed**: full rows for players whose total, rank, exact-score count
+      or any weekly points differ from the board at ``since``
+    - **removed**: players who were on the board at ``since`` but no longer are
+    - **full_reload**: true when the server can't produce a delta (version too
+      old, unknown to this server, or in the future) — re-fetch ``/leaderboard``
+
+    Always returns the current ``version`` for the next call.
+    """
+    try:
+        return standings_cache.changes_since(db, since)
+    except Exception as e:
+        print("❌ Error generating leaderboard changes:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to calculate leaderboard changes")
+
+
+@router.get("/projection")
+@limiter.limit("20/minute")
+def get_leaderboard_projection(
+    request: Request,
+    simulations: int = Query(PROJECTION_DEFAULT_SIMULATIONS, ge=100, le=PROJECTION_MAX_SIMULATIONS),
+    seed: int | None = Query(None, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Monte Carlo projection of the final standings.
+
+    Simulates the remaining fixtures ``simulations`` times and returns each
+    player's probability of finishing first (``p_first``) and in the top
+    three (``p_top3``), plus their expected final points. Pass ``seed`` to
+    get a reproducible run; the seed used is always returned (without one,
+    it is derived from the scoring version).
+
+    Players' projections only count predictions on fixtures that have kicked
+    off — earlier, repeated runs would show how rivals change their picks.
+    Admins get every prediction. ``predictions_counted`` says which. Runs
+    are cached until scoring or the counted predictions change.
+    """
+    try:
+        return project_season(
+            db, simulations=simulations, seed=seed, locked_only=current_user.role != "admin",
+        )
+    except Exception as e:
+        print("❌ Error projecting standings:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to project standings")
+
+
+@router.post("/what-if")
+def get_what_if_standings(
+    scenario: WhatIfScenario,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    The leaderboard as it would look with hypothetical results. Nothing is
+    saved.
+
+    Each row is a normal leaderboard row plus ``points_change``,
+    ``previous_rank`` and ``rank_change`` (positive = climbing; null for a
+    player not on the current board). A hypothetical score replaces a real
+    result if one is already in.
+
+    Players can only use fixtures that have kicked off (or have a result) —
+    earlier, the point swings would reveal everyone's predictions. Admins
+    can use any fixture. Postponed fixtures don't score, so they're rejected.
+    """
+    errors = []
+    seen = set()
+    for r in scenario.results:
+        if r.fixture_id in seen:
+            errors.append(f"Fixture {r.fixture_id} appears more than once")
+        seen.add(r.fixture_id)
+        lock = fixture_locks.get(db, r.fixture_id)
+        if lock is None:
+            errors.append(f"Fixture {r.fixture_id} not found")
+        elif lock.status == "postponed":
+            errors.append(f"Fixture {r.fixture_id} is postponed")
+        elif current_user.role != "admin" and not (lock.kickoff_passed() or lock.has_result):
+            raise HTTPException(status_code=403, detail=f"Fixture {r.fixture_id} hasn't kicked off yet")
+    if errors:
+        raise HTTPException(status_code=400, detail={"message": "Invalid scenario", "errors": errors})
+
+    try:
+        return what_if_standings(
+            db, {r.fixture_id: (r.actual_home, r.actual_away) for r in scenario.results}
+        )
+    except Exception as e:
+        print("❌ Error calculating what-if standings:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to calculate what-if standings")
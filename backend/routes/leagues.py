@@ -0,0 +1,178 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel, Field
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import League, LeagueMember, User, generate_uuid
+from auth import get_current_user
+from standings import group_standings
+
+router = APIRouter(prefix="/leagues", tags=["Leagues"])
+
+
+class LeagueCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=60)
+
+
+class LeagueJoin(BaseModel):
+    token: str = Field(min_length=1, max_length=36)
+
+
+def _league_dict(league: League, member_count: int) -> dict:
+    # Only ever returned to members, so the invite link is included.
+    return {
+        "id": league.id,
+        "name": league.name,
+        "member_count": member_count,
+        "created_at": league.created_at,
+        "invite_token": league.invite_token,
+        "invite_url": f"/leagues?join={league.invite_token}",
+    }
+
+
+def _is_member(db: Session, league_id: str, user_id: str) -> bool:
+    return db.query(LeagueMember.id).filter(
+        LeagueMember.league_id == league_id, LeagueMember.user_id == user_id
+    ).first() is not None
+
+
+def _member_count(db: Session, league_id: str) -> int:
+    return db.query(func.count(LeagueMember.id)).filter(LeagueMember.league_id == league_id).scalar()
+
+
+def _get_member_league(db: Session, league_id: str, user: User) -> League:
+    """The league, if the caller may see it (members and admins)."""
+    league = db.get(League, league_id)
+    if league is None:
+        raise HTTPException(status_code=404, detail="League not found")
+    if user.role != "admin" and not _is_member(db, league_id, user.id):
+        raise HTTPException(status_code=403, detail="You are not a member of this league")
+    return league
+
+
+@router.post("/")
+def create_league(
+    body: LeagueCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Create a mini-league; the creator is its first member."""
+    name = body.name.strip()
+    if not name:
+        raise HTTPException(status_code=400, detail="League name is required")
+    league = League(name=name, created_by=current_user.id)
+    league.members.append(LeagueMember(user_id=current_user.id))
+    db.add(league)
+    db.commit()
+    db.refresh(league)
+    print(f"✅ League created: {league.name} ({league.id})")
+    return _league_dict(league, 1)
+
+
+@router.get("/mine")
+def get_my_leagues(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """The caller's leagues with member counts, in one query."""
+    counts = (
+        db.query(LeagueMember.league_id, func.count(LeagueMember.id).label("members"))
+        .group_by(LeagueMember.league_id)
+        .subquery()
+    )
+    rows = (
+        db.query(League, counts.c.members)
+        .join(LeagueMember, LeagueMember.league_id == League.id)
+        .join(counts, counts.c.league_id == League.id)
+        .filter(LeagueMember.user_id == current_user.id)
+        .order_by(League.name)
+        .all()
+    )
+    return {"leagues": [_league_dict(league, members) for league, members in rows]}
+
+
+@router.post("/join")
+def join_league(
+    body: LeagueJoin,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Join the league an invite token belongs to. Joining twice is a no-op."""
+    league = db.query(League).filter(League.invite_token == body.token).first()
+    if league is None:
+        raise HTTPException(status_code=404, detail="Invalid or expired league invite")
+
+    joined = False
+    if not _is_member(db, league.id, current_user.id):
+        db.add(LeagueMember(league_id=league.id, user_id=current_user.id))
+        try:
+            db.commit()
+            joined = True
+        except IntegrityError:
+            # A concurrent join from the same user won the unique constraint.
+            db.rollback()
+    return {**_league_dict(league, _member_count(db, league.id)), "joined": joined}
+
+
+@router.get("/{league_id}/leaderboard")
+def get_league_leaderboard(
+    league_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    The league's leaderboard: the overall board's rows for its members,
+    re-ranked among themselves (``overall_rank`` keeps the league-wide
+    position). Members and admins only.
+    """
+    league = _get_member_league(db, league_id, current_user)
+    try:
+        members = [
+            username for (username,) in
+            db.query(User.username)
+            .join(LeagueMember, LeagueMember.user_id == User.id)
+            .filter(LeagueMember.league_id == league_id)
+        ]
+        board = group_standings(db, members)
+        return {"league": _league_dict(league, len(members)), **board}
+    except Exception as e:
+        print(f"❌ Error generating leaderboard for league {league_id}:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to calculate league leaderboard")
+
+
+@router.post("/{league_id}/invite/rotate")
+def rotate_league_invite(
+    league_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Issue a new invite token; the old one stops working. Creator or admin only."""
+    league = _get_member_league(db, league_id, current_user)
+    if current_user.role != "admin" and league.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Only the league's creator can reset its invite")
+    league.invite_token = generate_uuid()
+    db.commit()
+    db.refresh(league)
+    return _league_dict(league, _member_count(db, league_id))
+
+
+@router.delete("/{league_id}/members/me")
+def leave_league(
+    league_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Leave a league. The last member out deletes it."""
+    membership = db.query(LeagueMember).filter(
+        LeagueMember.league_id == league_id, LeagueMember.user_id == current_user.id
+    ).first()
+    if membership is None:
+        raise HTTPException(status_code=404, detail="You are not a member of this league")
+    db.delete(membership)
+    db.flush()
+    if _member_count(db, league_id) == 0:
+        db.delete(db.get(League, league_id))
+    db.commit()
+    return {"message": "Left league"}
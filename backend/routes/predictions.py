@@ -1,14 +1,18 @@
-from datetime import datetime, timezone
-
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Header, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import Optional
 
 from database import get_db
-from models import User, Prediction, Fixture, Result, Wildcard
+from models import User, Prediction, Result, Wildcard
 from auth import get_current_user, get_current_admin
+from scoring_log import record_scoring_event
+from fixture_locks import fixture_locks
+from prediction_queue import prediction_queue
+from idempotency import idempotency_store
+from consensus import apply_prediction_changes
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/predictions", tags=["Predictions"])
 
@@ -23,6 +27,8 @@ class PredictionSubmit(BaseModel):
 @router.post("/")
 def submit_prediction(
     prediction: PredictionSubmit,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -30,46 +36,76 @@ def submit_prediction(
     Submit or update a prediction for a fixture.
     Requires authentication. Uses current user's ID from JWT token.
 
+    With the write-behind queue enabled (see prediction_queue.py) an accepted
+    prediction is journalled and acknowledged with 202 instead of being
+    written here; lock checks still happen now, before acceptance.
+
+    A repeat carrying the same ``Idempotency-Key`` header gets the first
+    response back without being processed again (see idempotency.py).
+
     - **fixture_id**: ID of the fixture to predict
     - **gameweek**: Gameweek number
     - **predicted_home**: Predicted home team score
     - **predicted_away**: Predicted away team score
     """
+    call = idempotency_store.begin(
+        idempotency_key, f"{current_user.id}:POST /predictions", prediction.model_dump()
+    )
+    if call.replayed:
+        return call.replay(response)
+    try:
+        body = _save_prediction(prediction, response, current_user, db)
+    except Exception:
+        call.abort()
+        raise
+    return call.complete(response, body)
+
+
+def _save_prediction(prediction: PredictionSubmit, response: Response, current_user: User, db: Session) -> dict:
     try:
         print(f"📝 Incoming prediction from user {current_user.id}:", prediction.model_dump())
 
-        # Verify fixture exists
-        fixture = db.query(Fixture).filter(Fixture.id == prediction.fixture_id).first()
-        if not fixture:
+        # Lock state comes from the in-memory index (see fixture_locks.py):
+        # a dict lookup and an epoch comparison instead of Fixture and Result
+        # queries. Fixtures without a kickoff_time are never kickoff-locked.
+        lock = fixture_locks.get(db, prediction.fixture_id)
+        if lock is None:
             raise HTTPException(status_code=404, detail="Fixture not found")
 
-        # Lock predictions once kickoff has passed.
-        # kickoff_time is stored as UTC-aware by _parse_kickoff. Rows that
-        # pre-date this fix may still carry a naive value (SQLite migration path),
-        # so we handle both: if the stored value lacks tzinfo, treat it as UTC
-        # by attaching it rather than stripping timezone from `now`.
-        # When kickoff_time is null the fixture is never locked (backwards compat).
-        if fixture.kickoff_time is not None:
-            now = datetime.now(timezone.utc)
-            kickoff = fixture.kickoff_time
-            if kickoff.tzinfo is None:
-                kickoff = kickoff.replace(tzinfo=timezone.utc)
-            if now >= kickoff:
-                raise HTTPException(status_code=403, detail="Predictions locked")
+        if lock.kickoff_passed():
+            raise HTTPException(status_code=403, detail="Predictions locked")
 
         # Block predictions after result has been entered
-        existing_result = db.query(Result).filter(Result.fixture_id == prediction.fixture_id).first()
-        if existing_result:
+        if lock.has_result:
             raise HTTPException(status_code=400, detail="Predictions cannot be changed after the result has been entered")
 
-        # Check if prediction already exists for this user and fixture
+        if prediction_queue.enabled:
+            seq = prediction_queue.append(
+                user_id=current_user.id,
+                fixture_id=prediction.fixture_id,
+                gameweek=prediction.gameweek,
+                predicted_home=prediction.predicted_home,
+                predicted_away=prediction.predicted_away,
+            )
+            response.status_code = 202
+            print(f"✅ Prediction queued: #{seq}")
+            return {"message": "Prediction accepted", "queued": True}
+
+        # Check if prediction already exists for this user and fixture. The
+        # row is locked and re-read (not taken from the identity map) so an
+        # overlapping update by the same user can't move the same old
+        # scoreline out of the consensus twice.
         existing = db.query(Prediction).filter(
             Prediction.user_id == current_user.id,
             Prediction.fixture_id == prediction.fixture_id
-        ).first()
+        ).with_for_update().populate_existing().first()
 
+        new_score = (prediction.predicted_home, prediction.predicted_away)
         if existing:
-            # Update existing prediction
+            # Update existing prediction (and move its consensus vote)
+            apply_prediction_changes(db, [(
+                prediction.fixture_id, (existing.predicted_home, existing.predicted_away), new_score,
+            )])
             existing.predicted_home = prediction.predicted_home
             existing.predicted_away = prediction.predicted_away
             existing.gameweek = prediction.gameweek
@@ -87,6 +123,7 @@ def submit_prediction(
                 predicted_away=prediction.predicted_away
             )
             db.add(new_prediction)
+            apply_prediction_changes(db, [(prediction.fixture_id, None, new_score)])
             db.commit()
             db.refresh(new_prediction)
             print(f"✅ Prediction created: {new_prediction.id}")
@@ -118,7 +155,8 @@ def get_predictions(
     """
     Get predictions with optional filters.
     Regular users can only see their own predictions.
-    Admins can see any user's predictions by providing user_id.
+    Admins can see any user's predictions by providing user_id. Predictions
+    still in the write-behind queue are included and marked ``queued``.
 
     - **user_id**: Filter by user ID (admin only)
     - **gameweek**: Filter by gameweek number
@@ -129,10 +167,8 @@ def get_predictions(
 
         # If user is admin and user_id is provided, filter by that user
         # Otherwise, filter by current user
-        if current_user.role == "admin" and user_id:
-            query = query.filter(Prediction.user_id == user_id)
-        else:
-            query = query.filter(Prediction.user_id == current_user.id)
+        owner_id = user_id if current_user.role == "admin" and user_id else current_user.id
+        query = query.filter(Prediction.user_id == owner_id)
 
         # Apply additional filters
         if gameweek is not None:
@@ -142,7 +178,7 @@ def get_predictions(
 
         predictions = query.all()
 
-        # Convert to dict for JSON response
+        # Timestamps stay as datetimes; the response class serialises them.
         predictions_data = [
             {
                 "id": p.id,
@@ -151,14 +187,31 @@ def get_predictions(
                 "gameweek": p.gameweek,
                 "predicted_home": p.predicted_home,
                 "predicted_away": p.predicted_away,
-                "created_at": p.created_at.isoformat(),
-                "updated_at": p.updated_at.isoformat()
+                "created_at": p.created_at,
+                "updated_at": p.updated_at
             }
             for p in predictions
         ]
 
+        # Accepted but not yet flushed predictions (write-behind queue) win
+        # over what the database holds, as in the gameweek view.
+        if prediction_queue.enabled:
+            queued = {
+                e["fixture_id"]: e for e in prediction_queue.pending(owner_id, gameweek)
+                if fixture_id is None or e["fixture_id"] == fixture_id
+            }
+            for row in predictions_data:
+                entry = queued.pop(row["fixture_id"], None)
+                if entry is not None:
+                    row.update(entry, updated_at=None, queued=True)
+            predictions_data.extend(
+                {"id": None, "user_id": owner_id, **entry,
+                 "created_at": None, "updated_at": None, "queued": True}
+                for entry in queued.values()
+            )
+
         print(f"✅ Predictions fetched: {len(predictions_data)} results")
-        return {"predictions": predictions_data}
+        return FastJSONResponse({"predictions": predictions_data})
 
     except Exception as e:
         print("❌ Error fetching predictions:", str(e))
@@ -253,6 +306,7 @@ def activate_wildcard(
 
         wildcard = Wildcard(user_id=current_user.id, gameweek=body.gameweek)
         db.add(wildcard)
+        record_scoring_event(db, "wildcard", gameweek=body.gameweek, user_id=current_user.id)
         db.commit()
         print(f"✅ Wildcard activated: GW{body.gameweek}")
         return {"message": "Wildcard activated", "gameweek": body.gameweek, "active": True}
@@ -311,6 +365,7 @@ def deactivate_wildcard(
             return {"message": "Wildcard already inactive", "gameweek": gameweek, "active": False}
 
         db.delete(existing)
+        record_scoring_event(db, "wildcard", gameweek=gameweek, user_id=target_id)
         db.commit()
         print(f"✅ Wildcard deactivated: GW{gameweek}")
         return {"message": "Wildcard deactivated", "gameweek": gameweek, "active": False}
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Header, Response
 from pydantic import BaseModel, Field
 from typing import Optional
+import time
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, update
 
 from database import get_db
 from models import Result, Fixture, User
 from auth import get_current_admin
+from responses import FastJSONResponse
+from scoring_log import record_scoring_event
+from fixture_locks import fixture_locks, kickoff_epoch
+from idempotency import idempotency_store
+from standings import standings_cache
 
 router = APIRouter(prefix="/results", tags=["Results"])
 
@@ -18,9 +24,33 @@ class ResultSubmit(BaseModel):
     actual_away: int = Field(ge=0, le=20)
 
 
+class ResultScore(BaseModel):
+    fixture_id: int
+    actual_home: int = Field(ge=0, le=20)
+    actual_away: int = Field(ge=0, le=20)
+
+
+class ResultBatch(BaseModel):
+    gameweek: int = Field(ge=1, le=38)
+    results: list[ResultScore] = Field(min_length=1, max_length=50)
+
+
+def _kicked_off(kickoff_time) -> bool:
+    """
+    A result can only be entered once the fixture has kicked off; fixtures
+    without a kickoff_time are exempt. fixture_locks relies on this: a scored
+    fixture is already locked by its kickoff, so other workers don't need to
+    see the result row before they stop accepting predictions.
+    """
+    kickoff = kickoff_epoch(kickoff_time)
+    return kickoff is None or int(time.time()) >= kickoff
+
+
 @router.post("/")
 def submit_result(
     result: ResultSubmit,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -28,11 +58,29 @@ def submit_result(
     Submit or update the actual result for a fixture.
     **Admin only** - requires admin authentication.
 
+    A repeat carrying the same ``Idempotency-Key`` header gets the first
+    response back without touching results, the scoring log or caches.
+    Fixtures that haven't kicked off yet are rejected (400).
+
     - **gameweek**: Gameweek number
     - **fixture_id**: ID of the fixture
     - **actual_home**: Actual home team score
     - **actual_away**: Actual away team score
     """
+    call = idempotency_store.begin(
+        idempotency_key, f"{current_admin.id}:POST /results", result.model_dump()
+    )
+    if call.replayed:
+        return call.replay(response)
+    try:
+        body = _save_result(result, current_admin, db)
+    except Exception:
+        call.abort()
+        raise
+    return call.complete(response, body)
+
+
+def _save_result(result: ResultSubmit, current_admin: User, db: Session) -> dict:
     try:
         print(f"📝 Incoming result from admin {current_admin.id}:", result.model_dump())
 
@@ -40,6 +88,8 @@ def submit_result(
         fixture = db.query(Fixture).filter(Fixture.id == result.fixture_id).first()
         if not fixture:
             raise HTTPException(status_code=404, detail="Fixture not found")
+        if not _kicked_off(fixture.kickoff_time):
+            raise HTTPException(status_code=400, detail="Fixture hasn't kicked off yet")
 
         # Check if result already exists for this fixture
         existing = db.query(Result).filter(Result.fixture_id == result.fixture_id).first()
@@ -49,6 +99,7 @@ def submit_result(
             existing.actual_home = result.actual_home
             existing.actual_away = result.actual_away
             existing.gameweek = result.gameweek
+            record_scoring_event(db, "result", fixture_id=fixture.id, gameweek=fixture.gameweek)
             db.commit()
             db.refresh(existing)
             print(f"✅ Result updated: {existing.id}")
@@ -62,17 +113,134 @@ def submit_result(
                 actual_away=result.actual_away
             )
             db.add(new_result)
+            record_scoring_event(db, "result", fixture_id=fixture.id, gameweek=fixture.gameweek)
             db.commit()
             db.refresh(new_result)
+            fixture_locks.invalidate([fixture.id])
             print(f"✅ Result created: {new_result.id}")
             return {"message": "Result submitted successfully", "result_id": new_result.id}
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         print("❌ Error submitting result:", str(e))
         raise HTTPException(status_code=500, detail="Failed to save result")
 
 
+@router.post("/batch")
+def submit_results_batch(
+    batch: ResultBatch,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Submit or update a whole gameweek's results in one transaction.
+    **Admin only** - requires admin authentication.
+
+    Fixtures are validated in one query: every fixture_id must exist, belong
+    to the gameweek, have kicked off and appear only once, otherwise nothing
+    is written (400).
+    Results whose score didn't change are left alone. The batch logs a single
+    scoring event, so the standings are rebuilt once for the whole gameweek
+    (warmed here, before the players come looking) instead of once per match.
+
+    Honours ``Idempotency-Key`` like ``POST /results``.
+    """
+    call = idempotency_store.begin(
+        idempotency_key, f"{current_admin.id}:POST /results/batch", batch.model_dump()
+    )
+    if call.replayed:
+        return call.replay(response)
+    try:
+        body = _save_results_batch(batch, current_admin, db)
+    except Exception:
+        call.abort()
+        raise
+    return call.complete(response, body)
+
+
+def _save_results_batch(batch: ResultBatch, current_admin: User, db: Session) -> dict:
+    try:
+        print(f"📝 Incoming result batch from admin {current_admin.id}: "
+              f"GW{batch.gameweek}, {len(batch.results)} results")
+
+        fixture_ids = [r.fixture_id for r in batch.results]
+        rows = (
+            db.query(Fixture.id, Fixture.gameweek, Result.id, Result.actual_home, Result.actual_away,
+                     Fixture.kickoff_time)
+            .outerjoin(Result, Result.fixture_id == Fixture.id)
+            .filter(Fixture.id.in_(fixture_ids))
+            .all()
+        )
+        known = {row[0]: row for row in rows}
+
+        errors = []
+        seen = set()
+        for r in batch.results:
+            if r.fixture_id in seen:
+                errors.append(f"Fixture {r.fixture_id} appears more than once")
+            seen.add(r.fixture_id)
+            row = known.get(r.fixture_id)
+            if row is None:
+                errors.append(f"Fixture {r.fixture_id} not found")
+            elif row[1] != batch.gameweek:
+                errors.append(f"Fixture {r.fixture_id} is in gameweek {row[1]}, not {batch.gameweek}")
+            elif not _kicked_off(row[5]):
+                errors.append(f"Fixture {r.fixture_id} hasn't kicked off yet")
+        if errors:
+            raise HTTPException(status_code=400, detail={"message": "Invalid result batch", "errors": errors})
+
+        updates, inserts, unchanged = [], [], 0
+        for r in batch.results:
+            _, _, result_id, home, away, _ = known[r.fixture_id]
+            if result_id is None:
+                inserts.append({
+                    "fixture_id": r.fixture_id, "gameweek": batch.gameweek,
+                    "actual_home": r.actual_home, "actual_away": r.actual_away,
+                })
+            elif (home, away) != (r.actual_home, r.actual_away):
+                updates.append({
+                    "id": result_id, "gameweek": batch.gameweek,
+                    "actual_home": r.actual_home, "actual_away": r.actual_away,
+                })
+            else:
+                unchanged += 1
+
+        if updates:
+            db.execute(update(Result), updates)
+        if inserts:
+            db.execute(insert(Result), inserts)
+        if updates or inserts:
+            record_scoring_event(db, "result", gameweek=batch.gameweek)
+        db.commit()
+
+        if inserts:
+            fixture_locks.invalidate([r["fixture_id"] for r in inserts])
+        version, _ = standings_cache.current(db)
+        print(f"✅ Result batch saved: GW{batch.gameweek}, {len(inserts)} created, "
+              f"{len(updates)} updated, {unchanged} unchanged")
+        return {
+            "message": "Results saved successfully",
+            "gameweek": batch.gameweek,
+            "created": len(inserts),
+            "updated": len(updates),
+            "unchanged": unchanged,
+            "scoring_version": version,
+        }
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        print("❌ Error submitting result batch:", str(e))
+        raise HTTPException(status_code=500, detail="Failed to save results")
+
+
 @router.get("/")
 def get_results(
     gameweek: Optional[int] = Query(None),
@@ -97,7 +265,7 @@ def get_results(
 
         results = query.all()
 
-        # Convert to dict for JSON response
+        # Timestamps stay as datetimes; the response class serialises them.
         results_data = [
             {
                 "id": r.id,
@@ -105,19 +273,38 @@ def get_results(
                 "gameweek": r.gameweek,
                 "actual_home": r.actual_home,
                 "actual_away": r.actual_away,
-                "created_at": r.created_at.isoformat(),
-                "updated_at": r.updated_at.isoformat()
+                "created_at": r.created_at,
+                "updated_at": r.updated_at
             }
             for r in results
         ]
 
-        return {"results": results_data}
+        return FastJSONResponse({"results": results_data})
 
     except Exception as e:
         print("❌ Error fetching results:", str(e))
         raise HTTPException(status_code=500, detail="Failed to fetch results")
 
 
+def completed_gameweeks(db: Session) -> list[int]:
+    """Sorted gameweeks where every fixture has a result (see below)."""
+    rows = (
+        db.query(
+            Fixture.gameweek,
+            func.count(Fixture.id).label("total"),
+            func.count(Result.id).label("with_result"),
+        )
+        .outerjoin(Result, Result.fixture_id == Fixture.id)
+        .group_by(Fixture.gameweek)
+        .all()
+    )
+    return sorted(
+        row.gameweek
+        for row in rows
+        if row.total > 0 and row.total == row.with_result
+    )
+
+
 @router.get("/completed-gameweeks")
 def get_completed_gameweeks(db: Session = Depends(get_db)):
     """
@@ -134,24 +321,7 @@ def get_completed_gameweeks(db: Session = Depends(get_db)):
     every fixture is matched. This replaces the client-side 38x2 request scan.
     """
     try:
-        rows = (
-            db.query(
-                Fixture.gameweek,
-                func.count(Fixture.id).label("total"),
-                func.count(Result.id).label("with_result"),
-            )
-            .outerjoin(Result, Result.fixture_id == Fixture.id)
-            .group_by(Fixture.gameweek)
-            .all()
-        )
-
-        completed = [
-            row.gameweek
-            for row in rows
-            if row.total > 0 and row.total == row.with_result
-        ]
-
-        return {"completed_gameweeks": sorted(completed)}
+        return {"completed_gameweeks": completed_gameweeks(db)}
 
     except Exception as e:
         print("❌ Error fetching completed gameweeks:", str(e))
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import SeasonArchive
+from seasons import active_season, archive_summary
+
+router = APIRouter(prefix="/seasons", tags=["Seasons"])
+
+
+@router.get("")
+def get_seasons(db: Session = Depends(get_db)):
+    """The active season and every archived one, newest first (public)."""
+    archives = db.query(SeasonArchive).order_by(SeasonArchive.archived_at.desc()).all()
+    return {
+        "active": active_season(db),
+        "archived": [archive_summary(a) for a in archives],
+    }
+
+
+@router.get("/{season:path}/standings")
+def get_archived_standings(season: str, db: Session = Depends(get_db)):
+    """The final leaderboard of an archived season, as it stood when archived."""
+    archive = db.get(SeasonArchive, season)
+    if archive is None:
+        raise HTTPException(status_code=404, detail="Season not found in the archive")
+    return {**archive_summary(archive), "leaderboard": archive.standings}
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from database import get_db
 from models import SiteSetting
 from auth import get_current_admin
+from seasons import ACTIVE_SEASON_KEY
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
@@ -28,6 +29,10 @@ def update_setting(
     _admin=Depends(get_current_admin),
 ):
     """Update a site setting (admin only). Creates it if it doesn't exist."""
+    if key == ACTIVE_SEASON_KEY:
+        # New rows are stamped with it; changing it by hand would strand the
+        # current season's rows. It moves only when a season is archived.
+        raise HTTPException(status_code=400, detail="The active season changes only by archiving a season")
     setting = db.query(SiteSetting).filter(SiteSetting.key == key).first()
     if setting:
         setting.value = body.value
@@ -1,5 +1,7 @@
 from collections import defaultdict
 
+from sqlalchemy import and_, case, or_
+
 
 def calculate_points(pred_home: int, pred_away: int, act_home: int, act_away: int) -> int:
     if pred_home == act_home and pred_away == act_away:
@@ -13,11 +15,42 @@ def calculate_points(pred_home: int, pred_away: int, act_home: int, act_away: in
     return 0
 
 
+def points_expression(pred_home, pred_away, act_home, act_away):
+    """
+    SQL twin of ``calculate_points`` for computing points inside a query.
+
+    Takes column expressions and returns a CASE yielding 5 / 2 / 0 under the
+    same rules, so set-based paths (e.g. the admin predictions matrix) can
+    score in the database without drifting from the Python scorer. Keep the
+    two in step — test_main.py checks them against each other.
+    """
+    return case(
+        (and_(pred_home == act_home, pred_away == act_away), 5),
+        (
+            or_(
+                and_(pred_home > pred_away, act_home > act_away),
+                and_(pred_home < pred_away, act_home < act_away),
+                and_(pred_home == pred_away, act_home == act_away),
+            ),
+            2,
+        ),
+        else_=0,
+    )
+
+
 def wildcard_multiplier(has_wildcard: bool) -> int:
     """Points multiplier applied to a wildcarded gameweek. Single source of truth."""
     return 2 if has_wildcard else 1
 
 
+def wildcard_multiplier_expression(has_wildcard):
+    """SQL twin of ``wildcard_multiplier`` for a boolean column expression."""
+    return case(
+        (has_wildcard, wildcard_multiplier(True)),
+        else_=wildcard_multiplier(False),
+    )
+
+
 def compute_gameweek_points(
     predictions,
     result_lookup,
@@ -0,0 +1,128 @@
+"""
+Scoring change log.
+
+Every route that can change a player's points (result entry, fixture status
+changes, fixture moves, wildcard toggles, fixture deletes, simulation resets)
+records a ``ScoringEvent`` in the same session before committing. The highest
+event id is the current scoring version, which the leaderboard hands to
+clients so they can later ask for only what changed.
+
+Event kinds: ``result`` (``fixture_id`` is None for a whole-gameweek batch),
+``status``, ``fixture_moved`` (one event for the gameweek left and one for the
+gameweek joined), ``fixture_deleted``, ``wildcard``, ``user_deleted`` and
+``reset`` (everything may have changed).
+
+Consumers read the log instead of recomputing from scratch: ``events_after``
+pages it (``GET /admin/scoring-events`` exposes it to external consumers),
+and each consumer keeps the last version it handled.
+
+Event ids are allocated when a transaction inserts its event but become
+visible when it commits, and on Postgres those orders can differ: id 11 can
+be visible while id 10 is still in flight. ``events_after`` therefore stops
+at a gap in the ids until the event after it is ``SCORING_EVENT_SETTLE_SECONDS``
+old. By then the writer of the missing id has had that long to commit, so
+the id is taken to be rolled back (sequences burn ids on rollback). A
+consumer that moves its checkpoint to the last event it was given never
+skips an event, provided no scoring transaction stays open that long after
+logging its event.
+"""
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from models import ScoringEvent
+
+EVENT_BATCH_LIMIT = 500
+SCORING_EVENT_SETTLE_SECONDS = float(os.getenv("SCORING_EVENT_SETTLE_SECONDS", "30"))
+
+
+def record_scoring_event(
+    db: Session,
+    kind: str,
+    *,
+    fixture_id: Optional[int] = None,
+    gameweek: Optional[int] = None,
+    user_id: Optional[str] = None,
+) -> None:
+    """
+    Stage a scoring event on the caller's session.
+
+    Does NOT commit — the caller's own ``db.commit()`` persists the event
+    together with the mutation, so the log can never claim a change that was
+    rolled back.
+    """
+    db.add(ScoringEvent(kind=kind, fixture_id=fixture_id, gameweek=gameweek, user_id=user_id))
+
+
+def record_scoring_events(db: Session, events: list[dict]) -> None:
+    """
+    Write several events (dicts of ``record_scoring_event``'s keyword
+    arguments plus ``kind``) as one bulk insert in the caller's transaction.
+    Like ``record_scoring_event``, it does NOT commit.
+    """
+    if events:
+        db.execute(insert(ScoringEvent), [
+            {"fixture_id": None, "gameweek": None, "user_id": None, **e} for e in events
+        ])
+
+
+def current_scoring_version(db: Session) -> int:
+    """Highest committed event id, or 0 if nothing has been logged yet."""
+    return db.query(func.max(ScoringEvent.id)).scalar() or 0
+
+
+def events_since(db: Session, version: int) -> int:
+    """Number of events logged after ``version``."""
+    return (
+        db.query(func.count(ScoringEvent.id))
+        .filter(ScoringEvent.id > version)
+        .scalar()
+        or 0
+    )
+
+
+def events_after(db: Session, version: int, limit: int = EVENT_BATCH_LIMIT) -> list[ScoringEvent]:
+    """
+    Up to ``limit`` events logged after ``version``, oldest first, stopping
+    short of any gap in the ids that may still be filled by a transaction
+    in flight (see the module docstring). Pass the last returned id as the
+    next ``version``.
+    """
+    events = (
+        db.query(ScoringEvent)
+        .filter(ScoringEvent.id > version)
+        .order_by(ScoringEvent.id)
+        .limit(limit)
+        .all()
+    )
+    now = datetime.now(timezone.utc)
+    settled = []
+    expected = version + 1
+    for event in events:
+        if event.id != expected and _age_seconds(event, now) < SCORING_EVENT_SETTLE_SECONDS:
+            break
+        settled.append(event)
+        expected = event.id + 1
+    return settled
+
+
+def _age_seconds(event: ScoringEvent, now: datetime) -> float:
+    created_at = event.created_at
+    if created_at.tzinfo is None:
+        # SQLite hands back naive datetimes; they were written as UTC.
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return (now - created_at).total_seconds()
+
+
+def event_dict(event: ScoringEvent) -> dict:
+    return {
+        "version": event.id,
+        "kind": event.kind,
+        "fixture_id": event.fixture_id,
+        "gameweek": event.gameweek,
+        "user_id": event.user_id,
+        "created_at": event.created_at,
+    }
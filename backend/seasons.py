@@ -0,0 +1,219 @@
+"""
+Seasons: the active season and archiving finished ones.
+
+Every fixture, prediction, result and wildcard is stamped with the season it
+was written in (``active_season_default`` in models.py reads the
+``active_season`` site setting inside the INSERT). The hot tables only ever
+hold the active season: ``archive_season`` moves a finished season out and
+advances ``active_season`` in one transaction, so scoring queries never see
+another season's rows and their cost stays bounded by one season however
+many have been played.
+
+An archive is one ``season_archives`` row per season:
+
+* ``standings`` — the final leaderboard, frozen;
+* ``data`` — fixtures, results, predictions and wildcards as gzip-compressed,
+  column-oriented JSON (``{"columns": [...], "rows": [[...], ...]}`` per
+  table), plus the usernames of everyone in it, so the season can be
+  reconstructed even after players leave. ``archive_data`` reads it back.
+
+The development resets (``/admin/simulate``, simulate.py, reset_data.py) wipe
+the hot tables too, so they call ``archive_before_reset`` first: whatever the
+active season holds is archived under a generated label instead of lost.
+
+``active_season`` is not editable through ``/settings``; it only moves when a
+season is archived, and is at most ``SEASON_LABEL_MAX`` characters to fit the
+``season`` columns. Archiving also replaces the display ``season_name`` (free
+text, editable by admins) with the new season's label, or with the label the
+admin gives for it; the response reports which.
+"""
+import gzip
+import json
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, exists, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from models import (
+    Fixture, Prediction, PredictionConsensus, Result, SeasonArchive, SiteSetting, User, Wildcard,
+)
+from fixture_sync import clear_sync_diff
+from responses import dumps
+from scoring_log import record_scoring_event
+from standings import build_standings
+
+ACTIVE_SEASON_KEY = "active_season"
+SEASON_NAME_KEY = "season_name"
+SEASON_LABEL_MAX = 20  # width of the season columns
+
+_ARCHIVED_COLUMNS = {
+    "fixtures": (Fixture, ("id", "gameweek", "date", "time", "home_team", "away_team", "venue",
+                           "kickoff_time", "status")),
+    "results": (Result, ("fixture_id", "gameweek", "actual_home", "actual_away")),
+    "predictions": (Prediction, ("user_id", "fixture_id", "gameweek", "predicted_home", "predicted_away")),
+    "wildcards": (Wildcard, ("user_id", "gameweek")),
+}
+
+
+class SeasonArchiveError(Exception):
+    """The season can't be archived as asked (unfinished, bad next season)."""
+
+
+def default_season_label(today: Optional[date] = None) -> str:
+    """'2025/26' style label for the season ``today`` falls in (Aug–May)."""
+    today = today or date.today()
+    start = today.year if today.month >= 7 else today.year - 1
+    return f"{start}/{(start + 1) % 100:02d}"
+
+
+def active_season(db: Session) -> Optional[str]:
+    return db.scalar(select(SiteSetting.value).where(SiteSetting.key == ACTIVE_SEASON_KEY))
+
+
+def ensure_active_season(db: Session) -> str:
+    """
+    Make sure ``active_season`` is set — from the display ``season_name`` if
+    it is short enough to be a season label, else from today's date — and
+    return it. Does NOT commit.
+    """
+    season = active_season(db)
+    if season is None:
+        name = (db.scalar(select(SiteSetting.value).where(SiteSetting.key == SEASON_NAME_KEY)) or "").strip()
+        season = name if 0 < len(name) <= SEASON_LABEL_MAX else default_season_label()
+        db.add(SiteSetting(key=ACTIVE_SEASON_KEY, value=season))
+        db.flush()
+    return season
+
+
+def _in_season(model, season: str):
+    # Rows written around the ORM default (raw SQL) may be unstamped; they
+    # belong to whatever season was active.
+    return or_(model.season == season, model.season.is_(None))
+
+
+def unscored_fixtures(db: Session, season: str) -> int:
+    """Non-postponed fixtures in ``season`` still waiting for a result."""
+    return db.scalar(
+        select(func.count(Fixture.id))
+        .outerjoin(Result, Result.fixture_id == Fixture.id)
+        .where(_in_season(Fixture, season), Fixture.status != "postponed", Result.id.is_(None))
+    )
+
+
+def archive_season(
+    db: Session,
+    next_season: str,
+    *,
+    season_name: Optional[str] = None,
+    force: bool = False,
+    keep_fixtures: bool = False,
+) -> dict:
+    """
+    Freeze the active season's standings, move its rows into
+    ``season_archives`` and make ``next_season`` active. The display
+    ``season_name`` becomes ``season_name`` if given, else ``next_season``.
+    With ``keep_fixtures`` the fixtures are archived but also carried over
+    into ``next_season`` (predictions, results and wildcards still go).
+    Refuses while fixtures are still unscored unless ``force``. Drops the
+    stored fixture-sync diff, which names fixtures that may be gone. Does NOT
+    commit — the caller commits and then drops its caches.
+    """
+    season = ensure_active_season(db)
+    next_season = next_season.strip()
+    if not next_season or len(next_season) > SEASON_LABEL_MAX:
+        raise SeasonArchiveError(f"Next season must be 1-{SEASON_LABEL_MAX} characters")
+    next_name = (season_name or "").strip() or next_season
+    if len(next_name) > 255:
+        raise SeasonArchiveError("Season name must be at most 255 characters")
+    if next_season == season:
+        raise SeasonArchiveError(f"{season} is already the active season")
+    if db.get(SeasonArchive, next_season) is not None or db.get(SeasonArchive, season) is not None:
+        raise SeasonArchiveError("That season has already been archived")
+    if not force:
+        remaining = unscored_fixtures(db, season)
+        if remaining:
+            raise SeasonArchiveError(f"{remaining} fixtures in {season} still have no result")
+
+    standings = build_standings(db)
+    tables = {}
+    user_ids = set()
+    for name, (model, columns) in _ARCHIVED_COLUMNS.items():
+        rows = db.execute(
+            select(*(getattr(model, c) for c in columns))
+            .where(_in_season(model, season))
+            .order_by(*(getattr(model, c) for c in columns[:2]))
+        ).all()
+        tables[name] = {"columns": list(columns), "rows": [list(r) for r in rows]}
+        if "user_id" in columns:
+            user_ids.update(r[0] for r in rows)
+    tables["users"] = dict(db.execute(select(User.id, User.username).where(User.id.in_(user_ids))).all())
+
+    current_name = db.scalar(select(SiteSetting.value).where(SiteSetting.key == SEASON_NAME_KEY))
+    db.add(SeasonArchive(
+        season=season,
+        season_name=current_name,
+        fixtures=len(tables["fixtures"]["rows"]),
+        predictions=len(tables["predictions"]["rows"]),
+        standings=standings,
+        data=gzip.compress(dumps({"season": season, **tables}), compresslevel=9),
+    ))
+
+    # Children first; the fixtures' cascades would get there too, but
+    # explicit deletes don't depend on the database enforcing them.
+    fixture_ids = select(Fixture.id).where(_in_season(Fixture, season))
+    db.execute(delete(PredictionConsensus).where(PredictionConsensus.fixture_id.in_(fixture_ids)))
+    for model in (Wildcard, Prediction, Result):
+        db.execute(delete(model).where(_in_season(model, season)))
+    if keep_fixtures:
+        db.execute(update(Fixture).where(_in_season(Fixture, season)).values(season=next_season))
+    else:
+        db.execute(delete(Fixture).where(_in_season(Fixture, season)))
+    clear_sync_diff(db)
+
+    db.query(SiteSetting).filter(SiteSetting.key == ACTIVE_SEASON_KEY).update({"value": next_season})
+    if current_name is None:
+        db.add(SiteSetting(key=SEASON_NAME_KEY, value=next_name))
+    else:
+        db.query(SiteSetting).filter(SiteSetting.key == SEASON_NAME_KEY).update({"value": next_name})
+    record_scoring_event(db, "reset")
+
+    return {
+        "archived": season,
+        "active": next_season,
+        "season_name": next_name,
+        "fixtures": len(tables["fixtures"]["rows"]),
+        "predictions": len(tables["predictions"]["rows"]),
+        "champion": standings[0]["player"] if standings else None,
+    }
+
+
+def archive_before_reset(db: Session, prefix: str, *, keep_fixtures: bool = False) -> Optional[dict]:
+    """
+    Archive whatever the active season holds before a development reset
+    wipes it, under a generated ``<prefix>-yymmdd-hhmmss`` label that becomes
+    the active season; the display name is kept. Returns the archive summary,
+    or None when there was nothing to keep. Does NOT commit.
+    """
+    if not any(db.scalar(select(exists().select_from(m))) for m in (Fixture, Prediction, Result, Wildcard)):
+        return None
+    label = f"{prefix}-{datetime.now(timezone.utc):%y%m%d-%H%M%S}"
+    current_name = db.scalar(select(SiteSetting.value).where(SiteSetting.key == SEASON_NAME_KEY))
+    return archive_season(db, label, season_name=current_name, force=True, keep_fixtures=keep_fixtures)
+
+
+def archive_summary(archive: SeasonArchive) -> dict:
+    return {
+        "season": archive.season,
+        "season_name": archive.season_name,
+        "archived_at": archive.archived_at,
+        "fixtures": archive.fixtures,
+        "predictions": archive.predictions,
+        "players": len(archive.standings),
+        "champion": archive.standings[0]["player"] if archive.standings else None,
+    }
+
+
+def archive_data(archive: SeasonArchive) -> dict:
+    """The archived tables, decompressed."""
+    return json.loads(gzip.decompress(archive.data))
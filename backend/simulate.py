@@ -1,7 +1,8 @@
 """
 Full reset + simulation script.
 
-Clears all fixtures, predictions, results, and wildcards then seeds:
+Archives the active season's fixtures, predictions, results and wildcards
+(see seasons.archive_before_reset) so the tables are empty, then seeds:
   - 10 gameweeks x 10 fixtures (real PL teams, round-robin schedule)
   - Random predictions for every user (admins included, 0-4 goals each side)
   - Random results for every fixture
@@ -19,14 +20,19 @@ from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
 from database import SessionLocal
-from models import User, Fixture, Prediction, Result, Wildcard
+from models import User, Fixture, Prediction, Result
+from consensus import rebuild_consensus
+from fixture_sync import clear_sync_diff
+from seasons import archive_before_reset
+from scoring_log import record_scoring_event
 
+# Canonical names (as in fixtures.csv / team_mapping).
 TEAMS = [
     "Arsenal", "Aston Villa", "Brentford", "Brighton",
     "Chelsea", "Crystal Palace", "Everton", "Fulham",
-    "Ipswich", "Leicester", "Liverpool", "Man City",
-    "Man United", "Newcastle", "Nott'm Forest", "Southampton",
-    "Spurs", "West Ham", "Wolves", "Bournemouth",
+    "Ipswich Town", "Leicester City", "Liverpool", "Manchester City",
+    "Manchester Utd", "Newcastle Utd", "Nottingham Forest", "Southampton",
+    "Tottenham", "West Ham", "Wolves", "Bournemouth",
 ]
 
 VENUES = {
@@ -38,15 +44,15 @@ VENUES = {
     "Crystal Palace": "Selhurst Park",
     "Everton": "Goodison Park",
     "Fulham": "Craven Cottage",
-    "Ipswich": "Portman Road",
-    "Leicester": "King Power Stadium",
+    "Ipswich Town": "Portman Road",
+    "Leicester City": "King Power Stadium",
     "Liverpool": "Anfield",
-    "Man City": "Etihad Stadium",
-    "Man United": "Old Trafford",
-    "Newcastle": "St. James' Park",
-    "Nott'm Forest": "City Ground",
+    "Manchester City": "Etihad Stadium",
+    "Manchester Utd": "Old Trafford",
+    "Newcastle Utd": "St. James' Park",
+    "Nottingham Forest": "City Ground",
     "Southampton": "St. Mary's Stadium",
-    "Spurs": "Tottenham Hotspur Stadium",
+    "Tottenham": "Tottenham Hotspur Stadium",
     "West Ham": "London Stadium",
     "Wolves": "Molineux",
     "Bournemouth": "Vitality Stadium",
@@ -81,14 +87,15 @@ def goal(bias: float = 0.0) -> int:
 def main() -> None:
     db = SessionLocal()
     try:
-        # ── 1. Full wipe ────────────────────────────────────────────────────────
-        print("⚠️  Clearing wildcards, predictions, results, fixtures …")
-        db.query(Wildcard).delete()
-        db.query(Prediction).delete()
-        db.query(Result).delete()
-        db.query(Fixture).delete()
+        # ── 1. Archive, leaving the tables empty ────────────────────────────────
+        print("⚠️  Archiving wildcards, predictions, results, fixtures …")
+        archived = archive_before_reset(db, "sim")
+        clear_sync_diff(db)
         db.commit()
-        print("✅  Tables cleared.")
+        if archived:
+            print(f"✅  Archived as {archived['archived']}; tables cleared.")
+        else:
+            print("✅  Nothing to archive; tables already empty.")
 
         # ── 2. Generate 10 GWs × 10 fixtures ───────────────────────────────────
         print("📅  Generating fixtures …")
@@ -139,6 +146,8 @@ def main() -> None:
                     predicted_away=goal(),
                 ))
                 pred_count += 1
+        db.flush()
+        rebuild_consensus(db)
         db.commit()
         print(f"✅  {pred_count} predictions inserted.")
 
@@ -154,6 +163,7 @@ def main() -> None:
             ))
             fixture.status = "completed"
             result_count += 1
+        record_scoring_event(db, "reset")
         db.commit()
         print(f"✅  {result_count} results inserted, all fixtures marked completed.")
 
@@ -0,0 +1,336 @@
+"""
+Leaderboard standings: computation, per-version caching and deltas.
+
+The full board is expensive to build (every prediction, result and wildcard is
+loaded), yet it only changes when a scoring mutation happens. Standings are
+therefore cached per process and keyed by a cheap "stamp": the current scoring
+version from ``scoring_log`` plus a few aggregates over results, wildcards,
+postponed fixtures and users. The aggregates catch out-of-band writers that
+bypass the event log (``simulate.py``, ``reset_data.py``, manual SQL), so the
+cache can never serve a board the database no longer agrees with.
+
+The serialised response body is cached with the board as a
+``PrecompressedBody``, so its gzip/brotli variants are built once per board
+rather than once per request.
+
+A bounded history of recent boards, keyed by scoring version, lets
+``/leaderboard/changes`` return only the rows that differ from what a client
+already holds.
+
+``what_if_standings`` answers "what if this match ends 2-0?" from the cached
+board by re-scoring only the predictions on the hypothetical fixtures, and
+``group_standings`` cuts mini-league boards out of it by player.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from compression import PrecompressedBody
+from models import Prediction, Result, User, Fixture, Wildcard, ScoringEvent
+from responses import dumps
+from scoring import compute_gameweek_points, calculate_points, wildcard_multiplier
+from scoring_log import events_since
+
+# How many past boards to keep for delta requests, and how many events a client
+# may be behind before a full reload is cheaper than a delta.
+HISTORY_SIZE = int(os.getenv("LEADERBOARD_HISTORY_SIZE", "50"))
+MAX_DELTA_EVENTS = int(os.getenv("LEADERBOARD_MAX_DELTA_EVENTS", "200"))
+
+
+def build_standings(db: Session) -> list[dict]:
+    """
+    Compute the full leaderboard, sorted by total (descending) with ranks.
+
+    Each row carries player, exact_scores, week_1..week_38, total and rank.
+    Scoring goes through the shared ``compute_gameweek_points`` helper so the
+    board matches the admin users list and personal stats exactly.
+    """
+    predictions = db.query(Prediction).all()
+    results = db.query(Result).all()
+    users = db.query(User).all()
+
+    # Fixtures that are postponed must not contribute to scoring even if a
+    # stale result lingers on them.
+    postponed_fixture_ids = {
+        f.id for f in db.query(Fixture).filter(Fixture.status == "postponed").all()
+    }
+
+    result_lookup = {r.fixture_id: r for r in results}
+    user_lookup = {u.id: u.username for u in users}
+
+    # (user_id, gameweek) pairs that have an active wildcard — drives x2.
+    wildcard_lookup = {
+        (w.user_id, w.gameweek) for w in db.query(Wildcard).all()
+    }
+
+    leaderboard = compute_gameweek_points(
+        predictions, result_lookup, postponed_fixture_ids, wildcard_lookup
+    )
+
+    # Count exact score predictions per player (raw count, not points).
+    # Postponed fixtures are excluded — a stale result on a postponed fixture
+    # should never contribute.
+    exact_counts = {}
+    for pred in predictions:
+        if pred.fixture_id in postponed_fixture_ids:
+            continue
+        result = result_lookup.get(pred.fixture_id)
+        if result is None:
+            continue
+        if calculate_points(pred.predicted_home, pred.predicted_away,
+                            result.actual_home, result.actual_away) == 5:
+            exact_counts[pred.user_id] = exact_counts.get(pred.user_id, 0) + 1
+
+    formatted = []
+    for user_id, scores in leaderboard.items():
+        row = {
+            "player": user_lookup.get(user_id, f"Unknown ({user_id[:8]})"),
+            "exact_scores": exact_counts.get(user_id, 0),
+        }
+
+        # Add scores for all 38 gameweeks
+        total = 0
+        for week in range(1, 39):
+            week_score = scores.get(week, 0)
+            row[f"week_{week}"] = week_score
+            total += week_score
+
+        row["total"] = total
+        formatted.append(row)
+
+    sorted_leaderboard = sorted(formatted, key=lambda x: x["total"], reverse=True)
+    for idx, row in enumerate(sorted_leaderboard, start=1):
+        row["rank"] = idx
+
+    return sorted_leaderboard
+
+
+def _blank_row(player: str) -> dict:
+    """A board row for a player with nothing scored yet."""
+    return {"player": player, "exact_scores": 0, **{f"week_{week}": 0 for week in range(1, 39)}, "total": 0}
+
+
+def what_if_standings(db: Session, scenario: dict[int, tuple[int, int]]) -> dict:
+    """
+    The board as it would stand if each fixture in ``scenario``
+    (``{fixture_id: (home, away)}``) finished with that score.
+
+    Starts from the cached current board and applies deltas from only the
+    predictions on the scenario fixtures, so the cost tracks the size of the
+    scenario rather than the league. A scenario score replaces any real
+    result already entered. The caller validates the fixtures (existing, not
+    postponed).
+    """
+    version, rows = standings_cache.current(db)
+
+    predictions = (
+        db.query(
+            Prediction.user_id, Prediction.gameweek, Prediction.fixture_id,
+            Prediction.predicted_home, Prediction.predicted_away,
+            User.username, Result.actual_home, Result.actual_away,
+        )
+        .join(User, User.id == Prediction.user_id)
+        .outerjoin(Result, Result.fixture_id == Prediction.fixture_id)
+        .filter(Prediction.fixture_id.in_(scenario))
+        .all()
+    )
+    wildcards = set(
+        db.query(Wildcard.user_id, Wildcard.gameweek)
+        .filter(Wildcard.user_id.in_({p.user_id for p in predictions}))
+        .all()
+    ) if predictions else set()
+
+    # {username: {gameweek: points delta}} and {username: exact-score delta}
+    week_deltas: dict[str, dict[int, int]] = {}
+    exact_deltas: dict[str, int] = {}
+    for p in predictions:
+        home, away = scenario[p.fixture_id]
+        new = calculate_points(p.predicted_home, p.predicted_away, home, away)
+        old = 0 if p.actual_home is None else calculate_points(
+            p.predicted_home, p.predicted_away, p.actual_home, p.actual_away
+        )
+        if new == old:
+            continue
+        multiplier = wildcard_multiplier((p.user_id, p.gameweek) in wildcards)
+        weeks = week_deltas.setdefault(p.username, {})
+        weeks[p.gameweek] = weeks.get(p.gameweek, 0) + (new - old) * multiplier
+        exact_deltas[p.username] = exact_deltas.get(p.username, 0) + (new == 5) - (old == 5)
+
+    previous_rank = {row["player"]: row["rank"] for row in rows}
+    projected = [dict(row) for row in rows] + [
+        _blank_row(player) for player in week_deltas if player not in previous_rank
+    ]
+    for row in projected:
+        weeks = week_deltas.get(row["player"])
+        if weeks is None:
+            row["points_change"] = 0
+            continue
+        for week, delta in weeks.items():
+            row[f"week_{week}"] += delta
+        row["points_change"] = sum(weeks.values())
+        row["total"] += row["points_change"]
+        row["exact_scores"] += exact_deltas.get(row["player"], 0)
+
+    # Stable sort: players whose totals don't move keep their current order.
+    projected.sort(key=lambda r: r["total"], reverse=True)
+    for idx, row in enumerate(projected, start=1):
+        row["rank"] = idx
+        row["previous_rank"] = previous_rank.get(row["player"])
+        row["rank_change"] = None if row["previous_rank"] is None else row["previous_rank"] - idx
+
+    return {"version": version, "leaderboard": projected}
+
+
+def group_standings(db: Session, players: Iterable[str]) -> dict:
+    """
+    The board restricted to ``players`` (usernames) and re-ranked among them.
+
+    Rows are looked up in the cached board by player, so a group costs
+    O(members log members) however large the league is, and a player in many
+    groups adds no scoring work. Each row keeps its league-wide rank as
+    ``overall_rank`` (null for a player with nothing scored yet).
+    """
+    version, by_player = standings_cache.current_by_player(db)
+    rows = [by_player.get(player) or _blank_row(player) for player in players]
+    # Ties keep the overall board's order; unscored players go last.
+    rows.sort(key=lambda r: (-r["total"], r.get("rank") or float("inf"), r["player"]))
+    return {
+        "version": version,
+        "leaderboard": [
+            {**row, "rank": idx, "overall_rank": row.get("rank")}
+            for idx, row in enumerate(rows, start=1)
+        ],
+    }
+
+
+def _read_stamp(db: Session) -> tuple:
+    """
+    One round trip returning (scoring_version, *aggregates).
+
+    Prediction counts are intentionally left out: predictions on unscored
+    fixtures don't move the board, and including them would invalidate the
+    cache on every submission during the pre-deadline rush.
+    """
+    return tuple(db.execute(select(
+        select(func.max(ScoringEvent.id)).scalar_subquery(),
+        select(func.count(Result.id)).scalar_subquery(),
+        select(func.max(Result.updated_at)).scalar_subquery(),
+        select(func.count(Wildcard.id)).scalar_subquery(),
+        select(func.count(Fixture.id)).where(Fixture.status == "postponed").scalar_subquery(),
+        select(func.count(User.id)).scalar_subquery(),
+    )).one())
+
+
+class StandingsCache:
+    """
+    Process-local cache of the current board plus a short history of past
+    boards keyed by scoring version.
+
+    Thread-safe: sync FastAPI routes run in a threadpool, so concurrent
+    leaderboard requests may race to rebuild; the lock makes sure only one
+    does and the rest reuse its result.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._version = 0
+        self._rows: list[dict] = []
+        self._by_player: dict[str, dict] = {}
+        self._body: PrecompressedBody | None = None
+        self._history: "OrderedDict[int, tuple[tuple, dict]]" = OrderedDict()
+        self._history_size = history_size
+        # Versions whose data changed out-of-band; a client holding one of
+        # these can't tell which board it has, so it must fully reload.
+        self._tainted: set[int] = set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stamp = None
+            self._rows = []
+            self._by_player = {}
+            self._body = None
+            self._history.clear()
+            self._tainted.clear()
+
+    def current(self, db: Session) -> tuple[int, list[dict]]:
+        """Return (scoring_version, rows), rebuilding only if the stamp moved."""
+        version, rows, _ = self._refresh(db)
+        return version, rows
+
+    def current_by_player(self, db: Session) -> tuple[int, dict[str, dict]]:
+        """Return (scoring_version, {player: row}) for the current board."""
+        self._refresh(db)
+        with self._lock:
+            return self._version, self._by_player
+
+    def current_body(self, db: Session) -> PrecompressedBody:
+        """The ``/leaderboard`` response body for the current board."""
+        return self._refresh(db)[2]
+
+    def _refresh(self, db: Session) -> tuple[int, list[dict], PrecompressedBody]:
+        stamp = _read_stamp(db)
+        with self._lock:
+            if stamp == self._stamp:
+                return self._version, self._rows, self._body
+
+            rows = build_standings(db)
+            print(f"✅ Leaderboard calculated: {len(rows)} players")
+            version = stamp[0] or 0
+            previous = self._history.get(version)
+            if previous is not None and previous[0] != stamp:
+                # Same version but different data: something wrote around the
+                # event log. Older snapshots can no longer be trusted as a
+                # baseline, so drop them and let clients fully reload.
+                self._history.clear()
+                self._tainted.add(version)
+
+            self._stamp = stamp
+            self._version = version
+            self._rows = rows
+            self._body = PrecompressedBody(dumps({"leaderboard": rows, "version": version}))
+            self._by_player = {r["player"]: r for r in rows}
+            self._history[version] = (stamp, self._by_player)
+            self._history.move_to_end(version)
+            while len(self._history) > self._history_size:
+                self._history.popitem(last=False)
+            return version, rows, self._body
+
+    def changes_since(self, db: Session, since: int) -> dict:
+        """
+        Rows that differ between the board at ``since`` and the current board.
+
+        A full-reload signal is returned when ``since`` is unknown to this
+        process (evicted, never served, or from another worker), lies in the
+        future, or is so far behind that the delta would rival the full board.
+        """
+        version, rows = self.current(db)
+        with self._lock:
+            baseline = self._history.get(since)
+            tainted = since in self._tainted
+        if since == version and not tainted:
+            return {"version": version, "since": since, "full_reload": False,
+                    "changed": [], "removed": []}
+
+        if (
+            since > version
+            or tainted
+            or baseline is None
+            or events_since(db, since) > MAX_DELTA_EVENTS
+        ):
+            return {"version": version, "since": since, "full_reload": True,
+                    "changed": [], "removed": []}
+
+        old_rows = baseline[1]
+        changed = [r for r in rows if old_rows.get(r["player"]) != r]
+        current_players = {r["player"] for r in rows}
+        removed = [p for p in old_rows if p not in current_players]
+        return {"version": version, "since": since, "full_reload": False,
+                "changed": changed, "removed": removed}
+
+
+standings_cache = StandingsCache()
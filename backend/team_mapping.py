@@ -6,7 +6,20 @@ HOW TO MAINTAIN:
 - If the API's shortName already matches your DB name exactly, no entry needed.
 - Run GET /admin/fixtures/sync/preview to see any "unmapped" teams in the console log.
 - Keys are lowercased during lookup so casing doesn't matter.
+
+Variants that aren't listed (a new sponsor suffix, "Nottm Forest" vs
+"Nott'm Forest", a typo in a CSV) are resolved by ``resolve_team``: names are
+normalised (accents, punctuation, "FC"/"AFC" dropped) and matched against a
+trigram + token index over every alias and canonical name, built once at
+import. Each answer carries a confidence score and is memoized.
 """
+import os
+import re
+import string
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import NamedTuple, Optional
 
 # Map from football-data.org name/shortName variants → local DB team name.
 # Covers the 2025/26 Premier League season.
@@ -126,10 +139,148 @@ TEAM_NAME_MAP: dict[str, str] = {
 }
 
 
+# Below this score a fuzzy match is treated as unmapped.
+TEAM_MATCH_MIN_CONFIDENCE = float(os.getenv("TEAM_MATCH_MIN_CONFIDENCE", "0.75"))
+# If the runner-up team scores within this margin of the best, the name is
+# ambiguous ("Manchester") and is left unmapped rather than guessed.
+TEAM_MATCH_AMBIGUITY_MARGIN = 0.05
+
+_STOPWORDS = {"fc", "afc", "the", "football", "club"}
+
+
+class TeamMatch(NamedTuple):
+    name: Optional[str]   # canonical DB team name, or None if unmapped
+    confidence: float     # 1.0 for a known alias, else the fuzzy score
+
+
+def normalise_team_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, drop club suffixes."""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    text = text.replace("&", " and ")
+    text = re.sub(r"[^a-z0-9 ]+", "", text)
+    return " ".join(t for t in text.split() if t not in _STOPWORDS)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _token_score(query: list[str], candidate: list[str]) -> float:
+    """Share of query tokens found in the candidate (prefixes count 0.9),
+    discounted by how much of the candidate went unmatched."""
+    if not query or not candidate:
+        return 0.0
+    matched = set()
+    total = 0.0
+    for q in query:
+        best, best_idx = 0.0, None
+        for idx, c in enumerate(candidate):
+            if q == c:
+                score = 1.0
+            elif min(len(q), len(c)) >= 3 and (c.startswith(q) or q.startswith(c)):
+                score = 0.9
+            else:
+                continue
+            if score > best:
+                best, best_idx = score, idx
+        total += best
+        if best_idx is not None:
+            matched.add(best_idx)
+    coverage = len(matched) / len(candidate)
+    return (total / len(query)) * (0.5 + 0.5 * coverage)
+
+
+class TeamResolver:
+    """Exact + fuzzy lookup over canonical team names and their aliases."""
+
+    def __init__(self, aliases: dict[str, str]):
+        self._exact: dict[str, str] = {}
+        self._variants: dict[str, set[str]] = {}
+        self._entries: list[tuple[str, list[str], set[str]]] = []  # (canonical, tokens, trigrams)
+        self._postings: dict[str, list[int]] = {}
+
+        pairs = list(aliases.items()) + [(c, c) for c in set(aliases.values())]
+        for alias, canonical in pairs:
+            self._variants.setdefault(canonical, set()).add(alias.lower())
+            norm = normalise_team_name(alias)
+            if not norm or norm in self._exact:
+                continue
+            self._exact[norm] = canonical
+            grams = _trigrams(norm)
+            idx = len(self._entries)
+            self._entries.append((canonical, norm.split(), grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+
+    def resolve(self, name: str) -> TeamMatch:
+        norm = normalise_team_name(name or "")
+        if not norm:
+            return TeamMatch(None, 0.0)
+        canonical = self._exact.get(norm)
+        if canonical is not None:
+            return TeamMatch(canonical, 1.0)
+
+        grams = _trigrams(norm)
+        shared = Counter(idx for gram in grams for idx in self._postings.get(gram, ()))
+        tokens = norm.split()
+        best_by_team: dict[str, float] = {}
+        for idx, overlap in shared.items():
+            team, entry_tokens, entry_grams = self._entries[idx]
+            dice = 2 * overlap / (len(grams) + len(entry_grams))
+            score = max(dice, _token_score(tokens, entry_tokens))
+            if score > best_by_team.get(team, 0.0):
+                best_by_team[team] = score
+        if not best_by_team:
+            return TeamMatch(None, 0.0)
+
+        ranked = sorted(best_by_team.items(), key=lambda kv: kv[1], reverse=True)
+        team, score = ranked[0]
+        score = round(score, 3)
+        if score < TEAM_MATCH_MIN_CONFIDENCE:
+            return TeamMatch(None, score)
+        if len(ranked) > 1 and score - ranked[1][1] < TEAM_MATCH_AMBIGUITY_MARGIN:
+            return TeamMatch(None, score)
+        return TeamMatch(team, score)
+
+    def variants(self, canonical: str) -> set[str]:
+        """Every lowercased spelling known for a canonical team."""
+        return self._variants.get(canonical, {canonical.lower()})
+
+
+_resolver = TeamResolver(TEAM_NAME_MAP)
+
+
+@lru_cache(maxsize=4096)
+def resolve_team(name: str) -> TeamMatch:
+    """Resolve any team-name variant to its canonical DB name (memoized)."""
+    return _resolver.resolve(name)
+
+
 def map_team_name(api_name: str) -> str | None:
     """
     Return the local DB team name for a football-data.org team name.
-    Returns None if the name is not in the map (log this for manual review).
-    Falls back to direct match if the api_name lowercased is in our map.
+    Returns None if the name can't be resolved confidently (log this for
+    manual review). Known aliases match exactly; anything else goes through
+    the fuzzy resolver.
     """
-    return TEAM_NAME_MAP.get(api_name.lower().strip())
+    return resolve_team(api_name).name
+
+
+def canonical_team_name(name: str) -> str:
+    """The canonical spelling of ``name`` if it resolves, else ``name`` as given
+    (a newly promoted club must still import under its own name)."""
+    return resolve_team(name).name or name.strip()
+
+
+def team_aliases(canonical: str) -> set[str]:
+    """Every lowercased spelling known for a canonical team name."""
+    return _resolver.variants(canonical)
+
+
+def short_team_name(canonical: str) -> str:
+    """Shortest known spelling, e.g. "Man Utd" for "Manchester Utd"."""
+    shortest = min(team_aliases(canonical), key=lambda a: (len(a), a))
+    if shortest == canonical.lower():
+        return canonical
+    return string.capwords(shortest)
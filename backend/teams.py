@@ -0,0 +1,111 @@
+"""
+Team rows for fixtures.
+
+Fixtures keep their team names as display strings, but also reference a
+``Team`` row by id so filtering is an indexed integer comparison instead of
+an ``ILIKE`` scan. ``ensure_team_ids`` maps fixture team strings to ids,
+resolving spellings through ``team_mapping`` and creating any club it hasn't
+seen yet. It works on a Session or a Connection, so the ORM listeners in
+``models.py``, the bulk write paths and the startup backfill share it.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from models import Fixture, Team
+from team_mapping import canonical_team_name, team_aliases, short_team_name
+
+
+def ensure_team_ids(executor, names: Iterable[str], venues: Optional[dict[str, str]] = None) -> dict[str, int]:
+    """
+    Return {name: team_id} for fixture team strings, creating missing teams.
+
+    ``venues`` optionally maps a name to its home ground, used only when the
+    team is created. Does not commit.
+    """
+    canonical = {n: canonical_team_name(n) for n in set(names) if n}
+    if not canonical:
+        return {}
+    wanted = set(canonical.values())
+    ids = dict(executor.execute(select(Team.name, Team.id).where(Team.name.in_(wanted))).all())
+
+    missing = sorted(wanted - ids.keys())
+    if missing:
+        grounds = {canonical_team_name(n): v for n, v in (venues or {}).items() if v}
+        executor.execute(insert(Team), [
+            {
+                "name": name,
+                "short_name": short_team_name(name),
+                "aliases": sorted(team_aliases(name)),
+                "venue": grounds.get(name),
+            }
+            for name in missing
+        ])
+        ids.update(executor.execute(select(Team.name, Team.id).where(Team.name.in_(missing))).all())
+    return {raw: ids[name] for raw, name in canonical.items()}
+
+
+def resolve_team_id(db: Session, name: str) -> Optional[int]:
+    """Team id for any spelling of a club, via the unique index on teams.name."""
+    return db.execute(
+        select(Team.id).where(Team.name == canonical_team_name(name))
+    ).scalar_one_or_none()
+
+
+def canonicalise_team_names(connection) -> int:
+    """Rewrite fixture team strings that aren't the canonical spelling.
+
+    Fixtures added before every write path canonicalised their names may
+    carry an alias, which the CSV upsert (keyed on the strings) would then
+    duplicate. Team ids already resolve through the canonical name, so they
+    don't change. Returns the number of columns rewritten. Used by
+    ``migrate.run_migrations``.
+    """
+    names = connection.execute(
+        select(Fixture.home_team).union(select(Fixture.away_team))
+    ).scalars().all()
+    rewritten = 0
+    for name in names:
+        canonical = canonical_team_name(name)
+        if canonical == name:
+            continue
+        for column in (Fixture.home_team, Fixture.away_team):
+            rewritten += connection.execute(
+                update(Fixture).where(column == name).values({column: canonical})
+            ).rowcount
+    return rewritten
+
+
+def backfill_team_ids(connection) -> int:
+    """Create teams for, and link, fixtures whose team ids are still NULL.
+
+    Returns the number of fixtures updated. Used by ``migrate.run_migrations``.
+    """
+    rows = connection.execute(
+        select(Fixture.home_team, Fixture.away_team, Fixture.venue).where(
+            (Fixture.home_team_id.is_(None)) | (Fixture.away_team_id.is_(None))
+        )
+    ).all()
+    if not rows:
+        return 0
+
+    # Most common home venue per club becomes the team's ground.
+    venue_counts = connection.execute(
+        select(Fixture.home_team, Fixture.venue, func.count())
+        .where(Fixture.venue.is_not(None), Fixture.venue != "")
+        .group_by(Fixture.home_team, Fixture.venue)
+        .order_by(func.count())
+    ).all()
+    venues = {home: venue for home, venue, _ in venue_counts}
+
+    names = {r.home_team for r in rows} | {r.away_team for r in rows}
+    ids = ensure_team_ids(connection, names, venues)
+    for column, id_column in ((Fixture.home_team, Fixture.home_team_id), (Fixture.away_team, Fixture.away_team_id)):
+        for name, team_id in ids.items():
+            connection.execute(
+                update(Fixture)
+                .where(column == name, id_column.is_(None))
+                .values({id_column: team_id})
+            )
+    return len(rows)
@@ -1231,3 +1231,1783 @@ def test_invite_single_use_second_registration_rejected(client, monkeypatch):
         assert db.query(User).filter(User.username == "race_loser").first() is None
     finally:
         db.close()
+
+
+# ── Leaderboard deltas (/leaderboard/changes) ─────────────────────────────────
+#
+# Results are entered through the API (not inserted directly) so the scoring
+# event log is written exactly as in production.
+
+def test_leaderboard_reports_scoring_version(client):
+    """GET /leaderboard carries a version that moves when a result is entered."""
+    db = SessionLocal()
+    try:
+        admin, header = _make_admin_and_header(db, "lb_version")
+        fid = _make_fixture(db, gameweek=20, home="DeltaHome0", away="DeltaAway0")
+    finally:
+        db.close()
+
+    before = client.get("/leaderboard/").json()["version"]
+    resp = client.post(
+        "/results/",
+        json={"gameweek": 20, "fixture_id": fid, "actual_home": 1, "actual_away": 0},
+        headers=header,
+    )
+    assert resp.status_code == 200
+    after = client.get("/leaderboard/").json()["version"]
+    assert after > before
+
+
+def test_leaderboard_changes_returns_only_changed_players(client):
+    """Only players whose row moved appear in the delta; same version is empty."""
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "lb_delta")
+        scorer = _make_user(db, username="delta_scorer", email="delta_scorer@test.com")
+        bystander = _make_user(db, username="delta_bystander", email="delta_bystander@test.com")
+        fid_a = _make_fixture(db, gameweek=21, home="DeltaHome1", away="DeltaAway1")
+        fid_b = _make_fixture(db, gameweek=21, home="DeltaHome2", away="DeltaAway2")
+        _add_prediction(db, user_id=scorer.id, fixture_id=fid_a, gameweek=21, home=2, away=1)
+        _add_prediction(db, user_id=bystander.id, fixture_id=fid_b, gameweek=21, home=0, away=0)
+    finally:
+        db.close()
+
+    # Put the bystander on the board first, then snapshot the version.
+    client.post(
+        "/results/",
+        json={"gameweek": 21, "fixture_id": fid_b, "actual_home": 3, "actual_away": 3},
+        headers=header,
+    )
+    board = client.get("/leaderboard/").json()
+    version = board["version"]
+
+    unchanged = client.get("/leaderboard/changes", params={"since": version}).json()
+    assert unchanged == {
+        "version": version, "since": version, "full_reload": False,
+        "changed": [], "removed": [],
+    }
+
+    client.post(
+        "/results/",
+        json={"gameweek": 21, "fixture_id": fid_a, "actual_home": 2, "actual_away": 1},
+        headers=header,
+    )
+    delta = client.get("/leaderboard/changes", params={"since": version}).json()
+    assert delta["full_reload"] is False
+    assert delta["version"] > version
+    changed = {r["player"]: r for r in delta["changed"]}
+    assert changed["delta_scorer"]["week_21"] == 5
+    assert changed["delta_scorer"]["total"] == 5
+    # The bystander's points didn't move; they only appear if their rank did.
+    old_rows = {r["player"]: r for r in board["leaderboard"]}
+    if "delta_bystander" in changed:
+        assert changed["delta_bystander"]["rank"] != old_rows["delta_bystander"]["rank"]
+
+
+def test_leaderboard_changes_unknown_version_requests_full_reload(client):
+    """A version the server never served (or one from the future) forces a reload."""
+    current = client.get("/leaderboard/").json()["version"]
+    future = client.get("/leaderboard/changes", params={"since": current + 1000}).json()
+    assert future["full_reload"] is True
+    assert future["version"] == current
+
+
+# ── Fast JSON responses ───────────────────────────────────────────────────────
+
+def test_fast_json_dates_match_isoformat():
+    """Both JSON backends render date/datetime exactly as .isoformat() did."""
+    import json
+    import responses
+
+    d = datetime(2025, 8, 16).date()
+    naive = datetime(2025, 8, 16, 15, 0, 0, 123456)
+    aware = datetime(2025, 8, 16, 15, 0, tzinfo=timezone.utc)
+    payload = {"d": d, "naive": naive, "aware": aware, "none": None}
+    expected = {"d": d.isoformat(), "naive": naive.isoformat(), "aware": aware.isoformat(), "none": None}
+
+    assert json.loads(responses.dumps(payload)) == expected
+    original = responses.JSON_BACKEND
+    try:
+        responses.JSON_BACKEND = "stdlib"
+        assert json.loads(responses.dumps(payload)) == expected
+    finally:
+        responses.JSON_BACKEND = original
+
+
+def test_fixtures_endpoint_serialises_dates_as_iso_strings(client):
+    db = SessionLocal()
+    try:
+        fid = _make_fixture(db, gameweek=22, home="JsonHome", away="JsonAway")
+    finally:
+        db.close()
+
+    resp = client.get("/fixtures/", params={"gameweek": 22})
+    assert resp.status_code == 200
+    row = next(f for f in resp.json()["fixtures"] if f["id"] == fid)
+    assert row["date"] == "2025-08-01"
+    assert row["kickoff_time"] is None
+
+
+# ── Response compression ──────────────────────────────────────────────────────
+
+def test_large_json_response_is_gzipped(client):
+    """Bodies above the threshold are gzipped when the client accepts it."""
+    db = SessionLocal()
+    try:
+        for i in range(12):
+            _make_fixture(db, gameweek=23, home=f"GzipHome{i}", away=f"GzipAway{i}")
+    finally:
+        db.close()
+
+    resp = client.get("/fixtures/", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    # httpx transparently decodes, so the JSON is intact.
+    assert any(f["home_team"] == "GzipHome0" for f in resp.json()["fixtures"])
+
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    plain = client.get("/fixtures/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_cached_leaderboard_reuses_compressed_variant(client, monkeypatch):
+    """The cached board is compressed once; repeats are served from the variant."""
+    import compression
+    from metrics import metrics
+
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 0)
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "gzip_metrics")
+    finally:
+        db.close()
+
+    first = client.get("/leaderboard/", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip"
+    hits_before = metrics.get("compression.cache_variant_hits")
+    second = client.get("/leaderboard/", headers={"Accept-Encoding": "gzip"})
+    assert second.json() == first.json()
+    assert metrics.get("compression.cache_variant_hits") == hits_before + 1
+
+    snapshot = client.get("/admin/metrics", headers=header).json()
+    assert snapshot["counters"]["compression.bytes_saved"] > 0
+
+
+# ── Admin predictions matrix (compact) ────────────────────────────────────────
+
+def test_points_expression_matches_calculate_points():
+    """The SQL scorer agrees with calculate_points on every 0-3 scoreline pair,
+    with and without a wildcard."""
+    from sqlalchemy import literal, select, true
+    from scoring import calculate_points, points_expression, wildcard_multiplier, wildcard_multiplier_expression
+
+    db = SessionLocal()
+    try:
+        for ph in range(4):
+            for pa in range(4):
+                for ah in range(4):
+                    for aa in range(4):
+                        expr = points_expression(literal(ph), literal(pa), literal(ah), literal(aa))
+                        assert db.execute(select(expr)).scalar() == calculate_points(ph, pa, ah, aa)
+        # A wildcarded row: the multiplier comes from the same source as scoring.
+        doubled = points_expression(literal(2), literal(1), literal(2), literal(1)) * wildcard_multiplier_expression(true())
+        assert db.execute(select(doubled)).scalar() == calculate_points(2, 1, 2, 1) * wildcard_multiplier(True)
+        assert db.execute(select(wildcard_multiplier_expression(~true()))).scalar() == wildcard_multiplier(False)
+    finally:
+        db.close()
+
+
+def test_admin_predictions_compact_matrix(client):
+    """compact=true returns per-fixture arrays aligned with the users order."""
+    db = SessionLocal()
+    try:
+        admin, header = _make_admin_and_header(db, "matrix")
+        doubler = _make_user(db, username="matrix_doubler", email="matrix_doubler@test.com")
+        fid = _make_fixture(db, gameweek=24, home="MatrixHome", away="MatrixAway")
+        _add_prediction(db, user_id=doubler.id, fixture_id=fid, gameweek=24, home=2, away=0)
+        db.add(Wildcard(user_id=doubler.id, gameweek=24))
+        db.commit()
+        _add_result(db, fixture_id=fid, gameweek=24, home=2, away=0)
+        doubler_id = doubler.id
+        admin_id = admin.id
+    finally:
+        db.close()
+
+    body = client.get("/admin/predictions", params={"gameweek": 24, "compact": True}, headers=header).json()
+    order = [u["id"] for u in body["users"]]
+    fixture = next(f for f in body["fixtures"] if f["fixture_id"] == fid)
+    assert "predictions" not in fixture
+    assert len(fixture["points"]) == len(order)
+
+    i = order.index(doubler_id)
+    assert (fixture["predicted_home"][i], fixture["predicted_away"][i]) == (2, 0)
+    assert fixture["points"][i] == 10  # exact score, wildcard doubled
+    j = order.index(admin_id)
+    assert fixture["predicted_home"][j] is None and fixture["points"][j] is None
+
+    # The verbose shape reports the same numbers.
+    verbose = client.get("/admin/predictions", params={"gameweek": 24}, headers=header).json()
+    cells = {p["user_id"]: p for p in next(f for f in verbose["fixtures"] if f["fixture_id"] == fid)["predictions"]}
+    assert cells[doubler_id]["points"] == 10
+
+
+def test_missing_all_open_gameweeks_matrix(client):
+    """all_open=true reports every gameweek still open for predictions in one
+    call; scored or fully kicked-off gameweeks drop out."""
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "missing_all_open")
+        chaser = _make_user(db, username="late_predictor", email="late_predictor@test.com")
+        f1 = _make_fixture(db, gameweek=25, home="OpenHome1", away="OpenAway1")
+        _make_fixture(db, gameweek=25, home="OpenHome2", away="OpenAway2")
+        _make_fixture(db, gameweek=25, home="OpenHome3", away="OpenAway3", status="postponed")
+        scored = _make_fixture(db, gameweek=26, home="ClosedHome", away="ClosedAway")
+        _add_prediction(db, user_id=chaser.id, fixture_id=f1, gameweek=25, home=1, away=1)
+        _add_result(db, fixture_id=scored, gameweek=26, home=0, away=0)
+        # GW9 has kicked off without results; GW8 still has a match to come.
+        now = datetime.now(timezone.utc)
+        kickoffs = {
+            _make_fixture(db, gameweek=9, home="StartedHome", away="StartedAway"): now - timedelta(hours=1),
+            _make_fixture(db, gameweek=8, home="EarlyHome8", away="EarlyAway8"): now - timedelta(hours=1),
+            _make_fixture(db, gameweek=8, home="LateHome8", away="LateAway8"): now + timedelta(days=1),
+        }
+        for fixture_id, kickoff in kickoffs.items():
+            db.get(Fixture, fixture_id).kickoff_time = kickoff
+        db.commit()
+        chaser_id = chaser.id
+    finally:
+        db.close()
+
+    body = client.get("/admin/missing-predictions", params={"all_open": True}, headers=header).json()
+    assert 25 in body["gameweeks"]
+    assert 26 not in body["gameweeks"]
+    assert 9 not in body["gameweeks"]
+    assert body["total_fixtures"][body["gameweeks"].index(8)] == 2
+    col = body["gameweeks"].index(25)
+    assert body["total_fixtures"][col] == 2  # postponed fixture excluded
+
+    row = next(r for r in body["summary"] if r["user_id"] == chaser_id)
+    assert row["missing"][col] == 1
+    assert row["complete"] is False
+
+    # The single-gameweek report agrees.
+    single = client.get("/admin/missing-predictions", params={"gameweek": 25}, headers=header).json()
+    one = next(r for r in single["summary"] if r["user_id"] == chaser_id)
+    assert (one["submitted"], one["missing"], one["total"]) == (1, 1, 2)
+
+
+# ── Fixture CSV upload ────────────────────────────────────────────────────────
+
+def _upload_csv(client, header, text, **params):
+    return client.post(
+        "/admin/fixtures/upload",
+        params=params,
+        files={"file": ("fixtures.csv", text.encode("utf-8"), "text/csv")},
+        headers=header,
+    )
+
+
+def test_fixture_upload_bulk_upsert(client):
+    """First upload inserts, a re-upload updates in place without touching
+    status, and a key repeated in one file is applied once."""
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "csv_bulk")
+    finally:
+        db.close()
+
+    first = _upload_csv(client, header, (
+        "week,date,time,home,away,venue\n"
+        "27,2026-03-07,15:00,CsvHome1,CsvAway1,Ground 1\n"
+        "27,2026-03-07,17:30,CsvHome2,CsvAway2,Ground 2\n"
+        "27,2026-03-07,17:30,CsvHome2,CsvAway2,Ground 2b\n"
+    ))
+    assert first.status_code == 200
+    body = first.json()
+    assert (body["inserted"], body["updated"]) == (2, 0)
+    assert set(body["timings_ms"]) >= {"parse_ms", "index_ms", "update_ms", "insert_ms", "commit_ms"}
+
+    db = SessionLocal()
+    try:
+        f1 = db.query(Fixture).filter(Fixture.home_team == "CsvHome1").one()
+        f2 = db.query(Fixture).filter(Fixture.home_team == "CsvHome2").one()
+        assert f2.venue == "Ground 2b"
+        f1.status = "postponed"
+        db.commit()
+        f1_id = f1.id
+    finally:
+        db.close()
+
+    second = _upload_csv(client, header, (
+        "week,date,time,home,away,venue\n"
+        "27,2026-03-08,12:30,CsvHome1,CsvAway1,Ground 1\n"
+        "27,2026-03-07,17:30,CsvHome3,CsvAway3,Ground 3\n"
+    ))
+    assert (second.json()["inserted"], second.json()["updated"]) == (1, 1)
+
+    db = SessionLocal()
+    try:
+        f1 = db.query(Fixture).filter(Fixture.id == f1_id).one()
+        assert f1.date.isoformat() == "2026-03-08"
+        assert f1.time == "12:30"
+        assert f1.kickoff_time is not None
+        assert f1.status == "postponed"
+    finally:
+        db.close()
+
+
+def test_fixture_upload_streams_in_batches_with_encoding_fallback(client, monkeypatch):
+    """Small batches and chunks still produce one consistent upsert; a BOM is
+    stripped, and non-UTF-8 bytes fall back to latin-1."""
+    import routes.admin as admin_routes
+
+    monkeypatch.setattr(admin_routes, "UPLOAD_BATCH_SIZE", 2)
+    monkeypatch.setattr(admin_routes, "UPLOAD_CHUNK_SIZE", 16)
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "csv_stream")
+    finally:
+        db.close()
+
+    lines = ["week,date,home,away"] + [f"28,2026-03-14,StreamHome{i},StreamAway{i}" for i in range(5)]
+    # Repeat the first fixture at the end: it was inserted in batch 1 and must
+    # be updated, not re-inserted, by the last batch.
+    lines.append("28,2026-03-15,StreamHome0,StreamAway0")
+    resp = client.post(
+        "/admin/fixtures/upload",
+        files={"file": ("s.csv", ("\ufeff" + "\n".join(lines) + "\n").encode("utf-8"), "text/csv")},
+        headers=header,
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["imported"], body["inserted"], body["updated"]) == (6, 5, 1)
+    assert body["batches"] == 3
+
+    # 0x85 (NEL once decoded as latin-1) and a form feed are characters in a
+    # name, not line breaks; \r\n split across a chunk is still one ending.
+    latin = (
+        "week,date,home,away\r\n28,2026-03-14,Málaga Streamers,StreamAway9\r\n"
+        "28,2026-03-14,Caf\x85 Rovers,Stream\x0cAway\r\n"
+    ).encode("latin-1")
+    resp = client.post(
+        "/admin/fixtures/upload", files={"file": ("l.csv", latin, "text/csv")}, headers=header,
+    )
+    assert resp.status_code == 200
+
+    db = SessionLocal()
+    try:
+        repeated = db.query(Fixture).filter(Fixture.home_team == "StreamHome0").all()
+        assert len(repeated) == 1
+        assert repeated[0].date.isoformat() == "2026-03-15"
+        assert db.query(Fixture).filter(Fixture.home_team == "Málaga Streamers").count() == 1
+        assert db.query(Fixture).filter(Fixture.home_team == "Caf\x85 Rovers").one().away_team == "Stream\x0cAway"
+    finally:
+        db.close()
+
+
+def test_fixture_upload_caps_errors_and_writes_nothing(client, monkeypatch):
+    import routes.admin as admin_routes
+
+    monkeypatch.setattr(admin_routes, "UPLOAD_BATCH_SIZE", 1)
+    monkeypatch.setattr(admin_routes, "UPLOAD_MAX_ERRORS", 3)
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "csv_errors")
+    finally:
+        db.close()
+
+    lines = ["week,date,home,away", "29,2026-03-21,CapHome0,CapAway0"]
+    lines += [f"99,2026-03-21,CapHome{i},CapAway{i}" for i in range(1, 8)]
+    resp = _upload_csv(client, header, "\n".join(lines) + "\n")
+    assert resp.status_code == 422
+    detail = resp.json()["detail"]
+    assert len(detail["errors"]) == 3
+    assert detail["error_count"] == 7
+
+    db = SessionLocal()
+    try:
+        # The valid first row was flushed in its own batch, then rolled back.
+        assert db.query(Fixture).filter(Fixture.home_team == "CapHome0").count() == 0
+    finally:
+        db.close()
+
+
+def test_fixture_upload_dry_run_diffs_without_writing(client):
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "csv_dry")
+    finally:
+        db.close()
+
+    seed = _upload_csv(client, header, (
+        "week,date,time,home,away,venue\n"
+        "26,2026-02-28,15:00,DryHome1,DryAway1,Old Ground\n"
+        "26,2026-02-28,15:00,DryHome2,DryAway2,Same Ground\n"
+    ))
+    assert seed.status_code == 200
+
+    resp = _upload_csv(client, header, (
+        "week,date,time,home,away,venue\n"
+        "26,2026-02-28,17:30,DryHome1,DryAway1,New Ground\n"
+        "26,2026-02-28,15:00,DryHome2,DryAway2,Same Ground\n"
+        "26,2026-02-28,15:00,DryHome3,DryAway3,\n"
+        "26,2026-02-28,20:00,DryHome3,DryAway3,\n"
+        "99,2026-02-28,15:00,DryHome4,DryAway4,\n"
+    ), dry_run="true")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["dry_run"] is True
+    assert body["summary"] == {"new": 1, "changed": 1, "unchanged": 1, "collisions": 1, "errors": 1}
+    assert body["new"][0]["home_team"] == "DryHome3"
+    changes = body["changed"][0]["changes"]
+    assert changes == {
+        "time": {"from": "15:00", "to": "17:30"},
+        "venue": {"from": "Old Ground", "to": "New Ground"},
+    }
+    assert body["collisions"][0] == {
+        "row": 5, "overrides_row": 4, "gameweek": 26, "home_team": "DryHome3", "away_team": "DryAway3",
+    }
+
+    db = SessionLocal()
+    try:
+        assert db.query(Fixture).filter(Fixture.home_team == "DryHome3").count() == 0
+        f1 = db.query(Fixture).filter(Fixture.home_team == "DryHome1").one()
+        assert (f1.time, f1.venue) == ("15:00", "Old Ground")
+    finally:
+        db.close()
+
+
+def test_fixture_upload_dry_run_previews_the_last_repeated_row(client):
+    """A repeated fixture is previewed with the values the import will write."""
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "csv_dry_repeat")
+    finally:
+        db.close()
+
+    seed = _upload_csv(client, header, (
+        "week,date,time,home,away,venue\n"
+        "27,2026-03-07,15:00,RepeatHome1,RepeatAway1,\n"
+    ))
+    assert seed.status_code == 200
+
+    csv_text = (
+        "week,date,time,home,away,venue\n"
+        "27,2026-03-07,17:30,RepeatHome1,RepeatAway1,\n"
+        "27,2026-03-08,12:00,RepeatHome1,RepeatAway1,\n"
+        "27,2026-03-07,15:00,RepeatHome2,RepeatAway2,\n"
+        "27,2026-03-07,20:00,RepeatHome2,RepeatAway2,\n"
+    )
+    body = _upload_csv(client, header, csv_text, dry_run="true").json()
+    assert body["summary"]["collisions"] == 2
+    assert [(c["row"], c["overrides_row"]) for c in body["collisions"]] == [(3, 2), (5, 4)]
+    [changed] = body["changed"]
+    assert changed["row"] == 3
+    assert changed["changes"] == {
+        "date": {"from": "2026-03-07", "to": "2026-03-08"},
+        "day": {"from": "Sat", "to": "Sun"},
+        "time": {"from": "15:00", "to": "12:00"},
+    }
+    [new] = body["new"]
+    assert (new["row"], new["time"]) == (5, "20:00")
+
+    assert _upload_csv(client, header, csv_text, replace="false").status_code == 200
+    db = SessionLocal()
+    try:
+        f1 = db.query(Fixture).filter(Fixture.home_team == "RepeatHome1").one()
+        assert (f1.date.isoformat(), f1.time) == ("2026-03-08", "12:00")
+        f2 = db.query(Fixture).filter(Fixture.home_team == "RepeatHome2").one()
+        assert f2.time == "20:00"
+    finally:
+        db.close()
+
+
+# ── Fixture sync (football-data.org stand-in) ─────────────────────────────────
+
+def _clear_stored_sync_diff():
+    from fixture_sync import clear_sync_diff
+
+    db = SessionLocal()
+    try:
+        clear_sync_diff(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def football_data_stub(monkeypatch):
+    """A local HTTP server standing in for football-data.org.
+
+    Serves ``stub.matches`` with an ETag and answers If-None-Match with 304.
+    ``stub.requests`` records (path, headers) for every hit.
+    """
+    import hashlib
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from types import SimpleNamespace
+
+    from football_data import football_data_client
+
+    stub = SimpleNamespace(matches=[], requests=[])
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            stub.requests.append((self.path, dict(self.headers)))
+            body = json.dumps({"matches": stub.matches}).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("FOOTBALL_DATA_API_KEY", "test-key")
+    monkeypatch.setattr(football_data_client, "base_url", f"http://127.0.0.1:{server.server_port}")
+    football_data_client.clear()
+    _clear_stored_sync_diff()
+    stub.client = football_data_client
+    try:
+        yield stub
+    finally:
+        football_data_client.clear()
+        _clear_stored_sync_diff()
+        server.shutdown()
+        server.server_close()
+
+
+def _api_match(home, away, matchday, utc_date):
+    return {
+        "homeTeam": {"name": home, "shortName": home},
+        "awayTeam": {"name": away, "shortName": away},
+        "matchday": matchday,
+        "utcDate": utc_date,
+    }
+
+
+def test_sync_preview_caches_schedule_and_revalidates(client, football_data_stub):
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "sync_cache")
+    finally:
+        db.close()
+
+    football_data_stub.matches = [_api_match("Arsenal FC", "Chelsea FC", 24, "2026-02-07T15:00:00Z")]
+
+    first = client.get("/admin/fixtures/sync/preview", headers=header)
+    assert first.status_code == 200
+    body = first.json()
+    assert body["cached"] is False
+    assert body["api_match_count"] == 1
+    assert len(football_data_stub.requests) == 1
+    path, sent = football_data_stub.requests[0]
+    assert path == "/competitions/PL/matches"
+    assert sent["X-Auth-Token"] == "test-key"
+
+    # Inside the cache window: no upstream call at all.
+    again = client.get("/admin/fixtures/sync/preview", headers=header).json()
+    assert again["cached"] is True
+    assert again["fetched_at"] == body["fetched_at"]
+    assert len(football_data_stub.requests) == 1
+
+    # Explicit refresh: a conditional request, answered 304, reuses the body.
+    revalidated = client.get(
+        "/admin/fixtures/sync/preview", params={"refresh": "true"}, headers=header,
+    ).json()
+    assert revalidated["cached"] is False
+    assert revalidated["fetched_at"] == body["fetched_at"]
+    assert len(football_data_stub.requests) == 2
+    assert "If-None-Match" in football_data_stub.requests[1][1]
+    assert revalidated["changes"] == [
+        {**c, "change_id": revalidated["changes"][i]["change_id"]}
+        for i, c in enumerate(body["changes"])
+    ]
+
+
+def _sync_change(change_type, **fields):
+    import uuid as _uuid
+    return {"change_id": str(_uuid.uuid4()), "type": change_type, **fields}
+
+
+def test_sync_apply_batches_changes_with_few_queries(client):
+    from sqlalchemy import event
+
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "sync_batch")
+        user = _make_user(db, username="sync_batch_player", email="sync_batch_player@test.com")
+        kickoff_ids = [
+            _make_fixture(db, gameweek=21, home=f"BatchHome{i}", away=f"BatchAway{i}") for i in range(30)
+        ]
+        mover_id = _make_fixture(db, gameweek=21, home="MoveHome", away="MoveAway")
+        _add_prediction(db, user_id=user.id, fixture_id=mover_id, gameweek=21, home=1, away=0)
+        blocked_id = _make_fixture(db, gameweek=21, home="BlockHome", away="BlockAway")
+        _make_fixture(db, gameweek=22, home="BlockHome", away="BlockAway")
+        scored_id = _make_fixture(db, gameweek=21, home="ScoredHome", away="ScoredAway")
+        _add_result(db, fixture_id=scored_id, gameweek=21, home=2, away=2)
+    finally:
+        db.close()
+
+    changes = [
+        _sync_change("KICKOFF_CHANGED", fixture_id=fid, new_date="2026-02-14", new_time="12:30")
+        for fid in kickoff_ids
+    ]
+    changes += [
+        _sync_change("GAMEWEEK_CHANGED", fixture_id=mover_id, new_gameweek=23,
+                     new_date="2026-02-21", new_time="15:00"),
+        _sync_change("GAMEWEEK_CHANGED", fixture_id=blocked_id, new_gameweek=22),
+        _sync_change("KICKOFF_CHANGED", fixture_id=scored_id, new_date="2026-02-14", new_time="20:00"),
+        _sync_change("NEW_FIXTURE", home_team="FreshHome", away_team="FreshAway",
+                     gameweek=24, date="2026-02-28", time="15:00"),
+        _sync_change("NEW_FIXTURE", home_team="FreshHome", away_team="FreshAway",
+                     gameweek=24, date="2026-02-28", time="15:00"),
+        _sync_change("BOGUS"),
+    ]
+
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        resp = client.post("/admin/fixtures/sync/apply", json={"changes": changes}, headers=header)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["applied"], body["skipped"], body["errors"]) == (32, 2, 2)
+    assert body["batches"] == 1
+    statuses = [r["status"] for r in body["results"]]
+    assert statuses[-6:] == ["applied", "error", "skipped", "applied", "skipped", "error"]
+    # 36 changes, yet the statement count is independent of the batch size:
+    # auth + 2 prefetches + 3 bulk writes + 1 scoring-event insert +
+    # savepoint/commit.
+    assert len(statements) < 16
+
+    db = SessionLocal()
+    try:
+        moved = db.query(Fixture).filter(Fixture.id == mover_id).one()
+        assert (moved.gameweek, moved.time) == (23, "15:00")
+        assert moved.kickoff_time is not None
+        assert db.query(Prediction).filter(Prediction.fixture_id == mover_id).one().gameweek == 23
+        assert db.query(Fixture).filter(Fixture.id == kickoff_ids[0]).one().time == "12:30"
+        assert db.query(Fixture).filter(Fixture.id == scored_id).one().time != "20:00"
+        assert db.query(Fixture).filter(Fixture.home_team == "FreshHome").count() == 1
+    finally:
+        db.close()
+
+
+def test_sync_apply_isolates_a_failing_change(client, monkeypatch):
+    import routes.admin as admin_routes
+
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "sync_isolate")
+        ok_id = _make_fixture(db, gameweek=25, home="IsoHome", away="IsoAway")
+    finally:
+        db.close()
+
+    real_execute = admin_routes._execute_sync_plan
+
+    def _explode_on_boom(db, plan):
+        if any(row["home_team"] == "BoomHome" for row in plan["inserts"]):
+            raise RuntimeError("simulated write failure")
+        real_execute(db, plan)
+
+    monkeypatch.setattr(admin_routes, "_execute_sync_plan", _explode_on_boom)
+
+    changes = [
+        _sync_change("KICKOFF_CHANGED", fixture_id=ok_id, new_date="2026-03-01", new_time="16:30"),
+        _sync_change("NEW_FIXTURE", home_team="BoomHome", away_team="BoomAway",
+                     gameweek=25, date="2026-03-01", time="14:00"),
+        _sync_change("NEW_FIXTURE", home_team="CalmHome", away_team="CalmAway",
+                     gameweek=25, date="2026-03-01", time="14:00"),
+    ]
+    resp = client.post("/admin/fixtures/sync/apply", json={"changes": changes}, headers=header)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["status"] for r in body["results"]] == ["applied", "error", "applied"]
+    assert body["results"][1]["detail"] == "Unexpected error applying this change"
+
+    db = SessionLocal()
+    try:
+        assert db.query(Fixture).filter(Fixture.id == ok_id).one().time == "16:30"
+        assert db.query(Fixture).filter(Fixture.home_team == "CalmHome").count() == 1
+        assert db.query(Fixture).filter(Fixture.home_team == "BoomHome").count() == 0
+    finally:
+        db.close()
+
+
+def test_sync_scheduler_stores_diff_served_by_preview(client, football_data_stub, tmp_path):
+    import asyncio
+
+    from fixture_sync import SyncScheduler
+
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "sync_sched")
+        _make_fixture(db, gameweek=26, home="Arsenal", away="Everton")
+    finally:
+        db.close()
+
+    football_data_stub.matches = [
+        _api_match("Arsenal FC", "Everton FC", 27, "2026-03-07T15:00:00Z"),
+        _api_match("Unknown Rovers", "Everton FC", 27, "2026-03-07T15:00:00Z"),
+    ]
+
+    async def _two_workers():
+        first = SyncScheduler(interval=3600, lock_path=str(tmp_path / "sync.lock"))
+        second = SyncScheduler(interval=3600, lock_path=str(tmp_path / "sync.lock"))
+        try:
+            # Only one worker may own the job; the first run fires immediately.
+            assert first.start() is True
+            assert second.start() is False
+            await asyncio.sleep(0.5)
+        finally:
+            await first.stop()
+            await second.stop()
+
+    asyncio.run(_two_workers())
+    assert len(football_data_stub.requests) == 1
+
+    stored = client.get("/admin/fixtures/sync/preview", headers=header).json()
+    assert stored["source"] == "scheduler"
+    assert stored["cached"] is True
+    assert stored["age_seconds"] >= 0
+    assert [c["type"] for c in stored["changes"]] == ["GAMEWEEK_CHANGED"]
+    assert stored["unmapped_teams"] == ["Unknown Rovers"]
+    assert len(football_data_stub.requests) == 1
+
+    refreshed = client.get(
+        "/admin/fixtures/sync/preview", params={"refresh": "true"}, headers=header,
+    ).json()
+    assert refreshed["source"] == "preview"
+    assert len(football_data_stub.requests) == 2
+
+    # Applying a change invalidates the stored diff; the next preview is
+    # recomputed from the client's cached schedule, without an upstream call.
+    change = refreshed["changes"][0]
+    applied = client.post("/admin/fixtures/sync/apply", headers=header, json={"changes": [{
+        "change_id": change["change_id"],
+        "type": change["type"],
+        "fixture_id": change["local"]["fixture_id"],
+        "new_gameweek": change["api"]["gameweek"],
+    }]})
+    assert applied.json()["applied"] == 1
+    after = client.get("/admin/fixtures/sync/preview", headers=header).json()
+    # With the gameweek fixed, the kickoff difference surfaces next.
+    assert [c["type"] for c in after["changes"]] == ["KICKOFF_CHANGED"]
+    assert after["cached"] is True
+    assert len(football_data_stub.requests) == 2
+
+    # Any other admin fixture edit drops the stored diff too, rather than
+    # leaving the preview on a diff of fixtures that have since changed.
+    from models import FixtureSyncDiff
+
+    db = SessionLocal()
+    try:
+        assert db.query(FixtureSyncDiff).count() == 1
+    finally:
+        db.close()
+    fixture_id = after["changes"][0]["local"]["fixture_id"]
+    resp = client.patch(f"/admin/fixtures/{fixture_id}", json={"venue": "Sync Park"}, headers=header)
+    assert resp.status_code == 200
+    db = SessionLocal()
+    try:
+        assert db.query(FixtureSyncDiff).count() == 0
+    finally:
+        db.close()
+
+
+def test_team_resolver_exact_fuzzy_and_ambiguous():
+    from team_mapping import map_team_name, resolve_team
+
+    assert resolve_team("Manchester United FC") == ("Manchester Utd", 1.0)
+    assert resolve_team("Nott'm Forest").name == "Nottingham Forest"
+    fuzzy = resolve_team("Tottenham Hotspurs")
+    assert fuzzy.name == "Tottenham" and 0.75 <= fuzzy.confidence < 1.0
+    assert resolve_team("Crystal Palce").name == "Crystal Palace"
+    # "Manchester" fits City and United equally well — don't guess.
+    assert resolve_team("Manchester").name is None
+    assert map_team_name("Burnley") is None
+
+
+def test_team_names_canonicalised_on_upload_and_filter(client):
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "team_resolve")
+    finally:
+        db.close()
+
+    resp = _upload_csv(client, header, (
+        "week,date,home,away\n"
+        "29,2026-03-21,Man United,Nottm Forest\n"
+        "29,2026-03-21,Brand New Rovers,Spurs\n"
+    ))
+    assert resp.status_code == 200
+
+    fixtures = client.get("/fixtures/", params={"gameweek": 29, "team": "Manchester United"}).json()["fixtures"]
+    assert [(f["home_team"], f["away_team"]) for f in fixtures] == [("Manchester Utd", "Nottingham Forest")]
+    away = client.get("/fixtures/", params={"gameweek": 29, "away_team": "Tottenham Hotspur"}).json()["fixtures"]
+    assert [(f["home_team"], f["away_team"]) for f in away] == [("Brand New Rovers", "Tottenham")]
+
+
+def test_fixtures_link_to_team_rows_and_filter_by_team_id(client):
+    from sqlalchemy import text
+
+    from models import Team
+
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "team_ids")
+        # ORM path: any spelling lands on the canonical team row.
+        orm_id = _make_fixture(db, gameweek=28, home="Man United", away="Wolverhampton Wanderers")
+    finally:
+        db.close()
+    # Bulk path: CSV upload.
+    resp = _upload_csv(client, header, (
+        "week,date,home,away,venue\n"
+        "28,2026-03-14,Wolves,Manchester Utd,Molineux\n"
+        "28,2026-03-14,Team Id Town,Crystal Palace,Id Park\n"
+    ))
+    assert resp.status_code == 200
+
+    db = SessionLocal()
+    try:
+        utd = db.query(Team).filter(Team.name == "Manchester Utd").one()
+        assert utd.short_name == "Man Utd"
+        assert "man united" in utd.aliases
+        assert db.query(Team).filter(Team.name == "Team Id Town").one().venue == "Id Park"
+        assert db.query(Fixture).filter(Fixture.id == orm_id).one().home_team_id == utd.id
+        wolves_id = db.query(Team.id).filter(Team.name == "Wolves").scalar()
+    finally:
+        db.close()
+
+    both = client.get("/fixtures/", params={"gameweek": 28, "team_id": wolves_id}).json()["fixtures"]
+    assert sorted((f["home_team"], f["away_team"]) for f in both) == [
+        ("Man United", "Wolverhampton Wanderers"), ("Wolves", "Manchester Utd"),
+    ]
+    home = client.get("/fixtures/", params={"gameweek": 28, "team": "Manchester United"}).json()["fixtures"]
+    assert [f["id"] for f in home] == [orm_id]
+    partial = client.get("/fixtures/", params={"gameweek": 28, "team": "Id To"}).json()["fixtures"]
+    assert [f["home_team"] for f in partial] == ["Team Id Town"]
+    assert any(t["id"] == wolves_id for t in client.get("/fixtures/teams").json()["teams"])
+
+    # Rows written around the ORM (old data, raw SQL) are linked on startup.
+    db = SessionLocal()
+    try:
+        db.execute(text("UPDATE fixtures SET home_team_id = NULL, away_team_id = NULL WHERE gameweek = 28"))
+        db.commit()
+    finally:
+        db.close()
+    run_migrations()
+    db = SessionLocal()
+    try:
+        unlinked = db.query(Fixture).filter(Fixture.gameweek == 28, Fixture.home_team_id.is_(None)).count()
+        assert unlinked == 0
+        orm_fixture = db.query(Fixture).filter(Fixture.id == orm_id).one()
+        assert orm_fixture.home_team_id == utd.id
+        # ...and stored under the canonical spelling.
+        assert (orm_fixture.home_team, orm_fixture.away_team) == ("Manchester Utd", "Wolves")
+    finally:
+        db.close()
+
+
+def test_manual_fixture_writes_use_canonical_team_names(client):
+    """Add and edit store the same spelling as the CSV upload, so a re-upload
+    updates the fixture instead of inserting a duplicate."""
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "team_manual")
+    finally:
+        db.close()
+
+    added = client.post("/admin/fixtures", json={
+        "gameweek": 27, "date": "2026-03-07", "time": "15:00",
+        "home_team": "Man United", "away_team": "Canon Town", "venue": "",
+    }, headers=header)
+    assert added.status_code == 200
+    assert added.json()["home_team"] == "Manchester Utd"
+    same = client.post("/admin/fixtures", json={
+        "gameweek": 27, "date": "2026-03-07", "time": "15:00",
+        "home_team": "Manchester United", "away_team": "Canon Town", "venue": "",
+    }, headers=header)
+    assert same.status_code == 409
+
+    edited = client.patch(f"/admin/fixtures/{added.json()['id']}",
+                          json={"away_team": "Spurs"}, headers=header)
+    assert edited.json()["away_team"] == "Tottenham"
+
+    resp = _upload_csv(client, header, (
+        "week,date,time,home,away\n"
+        "27,2026-03-07,17:30,Manchester United,Tottenham Hotspur\n"
+    ), replace="false")
+    assert resp.status_code == 200
+    db = SessionLocal()
+    try:
+        [fixture] = db.query(Fixture).filter(Fixture.gameweek == 27, Fixture.home_team == "Manchester Utd").all()
+        assert fixture.time == "17:30"
+    finally:
+        db.close()
+
+
+def test_fixture_bundles_rebuild_only_touched_gameweeks(client):
+    from metrics import metrics
+
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "bundles")
+        edited_id = _make_fixture(db, gameweek=20, home="BundleHome1", away="BundleAway1")
+        _make_fixture(db, gameweek=21, home="BundleHome2", away="BundleAway2")
+    finally:
+        db.close()
+
+    def gw(n):
+        return client.get("/fixtures/", params={"gameweek": n}).json()["fixtures"]
+
+    gw(20), gw(21)
+    hits, misses = metrics.get("fixture_bundles.hits"), metrics.get("fixture_bundles.misses")
+    assert any(f["home_team"] == "BundleHome1" for f in gw(20))
+    assert metrics.get("fixture_bundles.hits") == hits + 1
+
+    # An admin edit rebuilds GW20 only; GW21 stays a hit.
+    resp = client.patch(f"/admin/fixtures/{edited_id}", json={"venue": "Bundle Park"}, headers=header)
+    assert resp.status_code == 200
+    assert next(f for f in gw(20) if f["id"] == edited_id)["venue"] == "Bundle Park"
+    gw(21)
+    assert metrics.get("fixture_bundles.misses") == misses + 1
+    assert metrics.get("fixture_bundles.hits") == hits + 2
+
+    # A write that bypasses the admin routes is still noticed.
+    db = SessionLocal()
+    try:
+        _make_fixture(db, gameweek=21, home="BundleHome3", away="BundleAway3")
+    finally:
+        db.close()
+    assert any(f["home_team"] == "BundleHome3" for f in gw(21))
+
+    gauges = client.get("/admin/metrics", headers=header).json()["gauges"]
+    assert 0 < gauges["fixture_bundles.hit_rate"] <= 1
+
+    # Gameweeks outside the season are rejected and never become cache keys.
+    from fixture_bundles import fixture_bundles
+
+    assert client.get("/fixtures/", params={"gameweek": 39}).status_code == 422
+    assert client.get("/fixtures/", params={"gameweek": 0}).status_code == 422
+    db = SessionLocal()
+    try:
+        assert fixture_bundles.get(db, 1000).body == b'{"fixtures":[]}'
+    finally:
+        db.close()
+    assert 1000 not in fixture_bundles._bundles
+
+
+def test_gameweek_view_embeds_prediction_result_lock_and_wildcard(client):
+    db = SessionLocal()
+    try:
+        user = _make_user(db, username="viewer", email="viewer@test.com")
+        other = _make_user(db, username="viewer2", email="viewer2@test.com")
+        open_id = _make_fixture(db, gameweek=30, home="ViewHome1", away="ViewAway1")
+        kicked_id = _make_fixture(db, gameweek=30, home="ViewHome2", away="ViewAway2")
+        scored_id = _make_fixture(db, gameweek=30, home="ViewHome3", away="ViewAway3")
+        db.get(Fixture, kicked_id).kickoff_time = datetime.now(timezone.utc) - timedelta(hours=1)
+        db.commit()
+        _add_prediction(db, user_id=user.id, fixture_id=open_id, gameweek=30, home=2, away=1)
+        _add_prediction(db, user_id=other.id, fixture_id=kicked_id, gameweek=30, home=0, away=0)
+        _add_result(db, fixture_id=scored_id, gameweek=30, home=1, away=1)
+        db.add(Wildcard(user_id=user.id, gameweek=31))
+        db.commit()
+        header = _auth_header(user)
+    finally:
+        db.close()
+
+    resp = client.get("/gameweeks/30/view", headers=header)
+    assert resp.status_code == 200
+    view = resp.json()
+    fixtures = {f["id"]: f for f in view["fixtures"]}
+    assert {open_id, kicked_id, scored_id} <= set(fixtures)
+
+    assert fixtures[open_id]["prediction"]["predicted_home"] == 2
+    assert fixtures[open_id]["lock"]["locked"] is False
+    # Another player's prediction never leaks into the caller's view.
+    assert fixtures[kicked_id]["prediction"] is None
+    assert fixtures[kicked_id]["lock"]["kickoff_passed"] is True
+    assert fixtures[scored_id]["result"] == {
+        "id": fixtures[scored_id]["result"]["id"], "actual_home": 1, "actual_away": 1,
+    }
+    assert fixtures[scored_id]["lock"]["result_entered"] is True
+    assert view["wildcard"] == {"active": False, "used_gameweek": 31, "locked": True}
+
+    assert client.get("/gameweeks/31/view", headers=header).json()["wildcard"]["active"] is True
+    assert client.get("/gameweeks/39/view", headers=header).status_code == 422
+    assert client.get("/gameweeks/30/view").status_code in (401, 403)
+
+    current = client.get("/gameweeks/current/view", headers=header).json()
+    assert current["gameweek"] not in current["completed_gameweeks"]
+
+
+def test_prediction_lock_index_tracks_admin_edits_and_results(client):
+    from metrics import metrics
+
+    db = SessionLocal()
+    try:
+        _, admin_header = _make_admin_and_header(db, "locks")
+        user = _make_user(db, username="lockidx", email="lockidx@test.com")
+        future = datetime.now(timezone.utc) + timedelta(days=2)
+        timed = Fixture(gameweek=32, date=future.date(), home_team="LockHome1",
+                        away_team="LockAway1", kickoff_time=future)
+        db.add(timed)
+        db.commit()
+        timed_id = timed.id
+        untimed_id = _make_fixture(db, gameweek=32, home="LockHome2", away="LockAway2")
+        header = _auth_header(user)
+    finally:
+        db.close()
+
+    def submit(fixture_id):
+        return client.post(
+            "/predictions/",
+            json={"fixture_id": fixture_id, "gameweek": 32, "predicted_home": 1, "predicted_away": 0},
+            headers=header,
+        ).status_code
+
+    assert submit(timed_id) == 200
+    hits = metrics.get("fixture_locks.hits")
+    assert submit(timed_id) == 200
+    assert metrics.get("fixture_locks.hits") == hits + 1
+
+    # Moving the kickoff into the past through the admin route locks at once.
+    resp = client.patch(f"/admin/fixtures/{timed_id}", json={"date": "2020-01-01", "time": "15:00"}, headers=admin_header)
+    assert resp.status_code == 200
+    assert submit(timed_id) == 403
+
+    # Without a kickoff the result is the only gate, so it is always confirmed
+    # against the database — even when the result was written around the API.
+    assert submit(untimed_id) == 200
+    db = SessionLocal()
+    try:
+        _add_result(db, fixture_id=untimed_id, gameweek=32, home=0, away=0)
+    finally:
+        db.close()
+    assert submit(untimed_id) == 400
+    assert submit(999999) == 404
+
+
+def test_prediction_queue_acknowledges_then_flushes_in_batches(client, monkeypatch, tmp_path):
+    import routes.gameweeks
+    import routes.predictions
+    from metrics import metrics
+    from prediction_queue import PredictionQueue
+
+    queue = PredictionQueue(str(tmp_path / "queue.sqlite3"), enabled=True)
+    monkeypatch.setattr(routes.predictions, "prediction_queue", queue)
+    monkeypatch.setattr(routes.gameweeks, "prediction_queue", queue)
+
+    db = SessionLocal()
+    try:
+        user = _make_user(db, username="queued", email="queued@test.com")
+        open_id = _make_fixture(db, gameweek=33, home="QueueHome1", away="QueueAway1")
+        scored_id = _make_fixture(db, gameweek=33, home="QueueHome2", away="QueueAway2")
+        fresh_id = _make_fixture(db, gameweek=33, home="QueueHome3", away="QueueAway3")
+        _add_result(db, fixture_id=scored_id, gameweek=33, home=1, away=0)
+        existing = _add_prediction(db, user_id=user.id, fixture_id=open_id, gameweek=33, home=0, away=0)
+        header = _auth_header(user)
+    finally:
+        db.close()
+
+    def submit(fixture_id, home, away):
+        return client.post(
+            "/predictions/",
+            json={"fixture_id": fixture_id, "gameweek": 33, "predicted_home": home, "predicted_away": away},
+            headers=header,
+        )
+
+    assert submit(open_id, 1, 1).status_code == 202
+    assert submit(open_id, 3, 1).json()["queued"] is True
+    # Locks are still checked at acceptance; rejected entries never reach the journal.
+    assert submit(scored_id, 2, 2).status_code == 400
+    assert queue.depth() == 2
+    assert metrics.get("prediction_queue.accepted") >= 2
+
+    # The gameweek view shows the accepted entry before it is flushed.
+    view = client.get("/gameweeks/33/view", headers=header).json()
+    mine = next(f for f in view["fixtures"] if f["id"] == open_id)["prediction"]
+    assert (mine["predicted_home"], mine["queued"]) == (3, True)
+    # So does the plain predictions list, for updates and first predictions alike.
+    assert submit(fresh_id, 2, 0).status_code == 202
+    listed = client.get("/predictions/", params={"gameweek": 33}, headers=header).json()["predictions"]
+    assert sorted((p["fixture_id"], p["predicted_home"], p["predicted_away"], p.get("queued")) for p in listed) == [
+        (open_id, 3, 1, True), (fresh_id, 2, 0, True),
+    ]
+    assert queue.depth() == 3
+
+    assert queue.flush() == 3
+    assert queue.depth() == 0
+    db = SessionLocal()
+    try:
+        stored = db.query(Prediction).filter(Prediction.user_id == user.id).all()
+        assert sorted((p.fixture_id, p.predicted_home, p.predicted_away) for p in stored) == [
+            (open_id, 3, 1), (fresh_id, 2, 0),
+        ]
+        assert existing.id in {p.id for p in stored}
+    finally:
+        db.close()
+    gauges = metrics.snapshot()["gauges"]
+    assert gauges["prediction_queue.depth"] == 0
+    assert gauges["prediction_queue.flush_latency_ms"] >= 0
+    queue.close()
+
+
+def test_prediction_queue_flush_moves_to_another_worker(tmp_path):
+    import asyncio
+
+    from prediction_queue import PredictionQueue, PredictionQueueWorker
+
+    db = SessionLocal()
+    try:
+        fixture_id = _make_fixture(db, gameweek=33, home="QueueHome3", away="QueueAway3")
+        user_id = _make_user(db, username="handover", email="handover@test.com").id
+    finally:
+        db.close()
+
+    queue = PredictionQueue(str(tmp_path / "queue.sqlite3"), enabled=True)
+
+    async def _two_workers():
+        first = PredictionQueueWorker(queue, interval=0.02)
+        second = PredictionQueueWorker(queue, interval=0.02)
+        try:
+            assert first.start() and second.start()
+            await asyncio.sleep(0.1)
+            assert first.holding_lock and not second.holding_lock
+            # The flushing worker goes away; the other picks the job up.
+            await first.stop()
+            queue.append(user_id=user_id, fixture_id=fixture_id, gameweek=33, predicted_home=2, predicted_away=2)
+            await asyncio.sleep(0.2)
+            assert second.holding_lock
+            assert queue.depth() == 0
+        finally:
+            await first.stop()
+            await second.stop()
+
+    asyncio.run(_two_workers())
+    queue.close()
+    db = SessionLocal()
+    try:
+        stored = db.query(Prediction).filter(Prediction.user_id == user_id).one()
+        assert (stored.predicted_home, stored.predicted_away) == (2, 2)
+    finally:
+        db.close()
+
+
+def test_idempotency_key_replays_result_submission(client):
+    from metrics import metrics
+
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "idem")
+        fixture_id = _make_fixture(db, gameweek=34, home="IdemHome", away="IdemAway")
+        user = _make_user(db, username="idemuser", email="idemuser@test.com")
+    finally:
+        db.close()
+
+    body = {"fixture_id": fixture_id, "gameweek": 34, "actual_home": 2, "actual_away": 0}
+    keyed = {**header, "Idempotency-Key": "result-idem-1"}
+    first = client.post("/results/", json=body, headers=keyed)
+    assert first.status_code == 200
+    version = client.get("/leaderboard").json()["version"]
+
+    replay = client.post("/results/", json=body, headers=keyed)
+    assert replay.json() == first.json()
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    # No second scoring event, so the board version doesn't move.
+    assert client.get("/leaderboard").json()["version"] == version
+
+    changed = client.post("/results/", json={**body, "actual_home": 3}, headers=keyed)
+    assert changed.status_code == 422
+
+    # Keys are scoped per caller and endpoint, and failures don't burn a key.
+    user_header = {**_auth_header(user), "Idempotency-Key": "result-idem-1"}
+    for _ in range(2):
+        locked = client.post(
+            "/predictions/",
+            json={"fixture_id": fixture_id, "gameweek": 34, "predicted_home": 1, "predicted_away": 0},
+            headers=user_header,
+        )
+        assert locked.status_code == 400
+        assert "Idempotent-Replayed" not in locked.headers
+    assert metrics.get("idempotency.replays") >= 1
+
+
+def test_result_batch_upserts_gameweek_with_one_scoring_event(client):
+    from models import ScoringEvent
+
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "batch")
+        ids = [
+            _make_fixture(db, gameweek=35, home=f"BatchHome{i}", away=f"BatchAway{i}")
+            for i in range(3)
+        ]
+        other_gw = _make_fixture(db, gameweek=36, home="BatchHome9", away="BatchAway9")
+        _add_result(db, fixture_id=ids[0], gameweek=35, home=0, away=0)
+        events_before = db.query(ScoringEvent).count()
+    finally:
+        db.close()
+
+    def batch(scores):
+        return client.post("/results/batch", json={"gameweek": 35, "results": [
+            {"fixture_id": f, "actual_home": h, "actual_away": a} for f, h, a in scores
+        ]}, headers=header)
+
+    resp = batch([(ids[0], 2, 1), (ids[1], 1, 1), (ids[2], 0, 3)])
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["created"], body["updated"], body["unchanged"]) == (2, 1, 0)
+    assert body["scoring_version"] == client.get("/leaderboard").json()["version"]
+
+    db = SessionLocal()
+    try:
+        assert db.query(ScoringEvent).count() == events_before + 1
+        scores = {r.fixture_id: (r.actual_home, r.actual_away)
+                  for r in db.query(Result).filter(Result.fixture_id.in_(ids))}
+        assert scores == {ids[0]: (2, 1), ids[1]: (1, 1), ids[2]: (0, 3)}
+    finally:
+        db.close()
+
+    # Re-sending the same scores writes nothing and logs nothing.
+    assert batch([(ids[0], 2, 1)]).json()["unchanged"] == 1
+
+    # One bad row rejects the whole batch.
+    bad = batch([(ids[1], 5, 5), (other_gw, 1, 0), (999999, 1, 0)])
+    assert bad.status_code == 400
+    assert len(bad.json()["detail"]["errors"]) == 2
+    db = SessionLocal()
+    try:
+        assert db.query(Result).filter(Result.fixture_id == ids[1]).one().actual_home == 1
+        assert db.query(ScoringEvent).count() == events_before + 1
+    finally:
+        db.close()
+
+
+def test_results_are_refused_before_kickoff(client):
+    """Neither result route accepts a score for a fixture that hasn't started."""
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "early")
+        fid = _make_fixture(db, gameweek=35, home="EarlyHome", away="EarlyAway")
+        fixture = db.get(Fixture, fid)
+        fixture.kickoff_time = datetime.now(timezone.utc) + timedelta(hours=2)
+        db.commit()
+    finally:
+        db.close()
+
+    single = client.post("/results/", json={
+        "gameweek": 35, "fixture_id": fid, "actual_home": 1, "actual_away": 0,
+    }, headers=header)
+    assert single.status_code == 400
+    batch = client.post("/results/batch", json={"gameweek": 35, "results": [
+        {"fixture_id": fid, "actual_home": 1, "actual_away": 0},
+    ]}, headers=header)
+    assert batch.status_code == 400
+    assert batch.json()["detail"]["errors"] == [f"Fixture {fid} hasn't kicked off yet"]
+
+    db = SessionLocal()
+    try:
+        assert db.query(Result).filter(Result.fixture_id == fid).count() == 0
+        db.get(Fixture, fid).kickoff_time = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db.commit()
+    finally:
+        db.close()
+    assert client.post("/results/", json={
+        "gameweek": 35, "fixture_id": fid, "actual_home": 1, "actual_away": 0,
+    }, headers=header).status_code == 200
+
+
+def test_scoring_event_paging_waits_for_late_commits(client):
+    from models import ScoringEvent
+    from scoring_log import SCORING_EVENT_SETTLE_SECONDS, current_scoring_version, events_after
+
+    db = SessionLocal()
+    try:
+        _, header = _make_admin_and_header(db, "events")
+        fixture_id = _make_fixture(db, gameweek=24, home="EventHome", away="EventAway")
+        start = current_scoring_version(db)
+    finally:
+        db.close()
+
+    resp = client.patch(f"/admin/fixtures/{fixture_id}/gameweek", json={"gameweek": 25}, headers=header)
+    assert resp.status_code == 200
+    resp = client.patch(f"/admin/fixtures/{fixture_id}/status", json={"status": "postponed"}, headers=header)
+    assert resp.status_code == 200
+
+    page = client.get("/admin/scoring-events", params={"since": start, "limit": 2}, headers=header).json()
+    assert [(e["kind"], e["gameweek"]) for e in page["events"]] == [("fixture_moved", 24), ("fixture_moved", 25)]
+    assert page["has_more"] is True
+    page = client.get("/admin/scoring-events", params={"since": page["next_since"]}, headers=header).json()
+    assert [e["kind"] for e in page["events"]] == ["status"]
+    last = page["next_since"]
+
+    # Id last+2 commits while last+1 is still in flight: a consumer must not
+    # be handed last+2 (and move past last+1) until last+1 has had time to land.
+    db = SessionLocal()
+    try:
+        db.add(ScoringEvent(id=last + 2, kind="wildcard", gameweek=25))
+        db.commit()
+        assert events_after(db, last) == []
+        db.add(ScoringEvent(id=last + 1, kind="result", fixture_id=fixture_id, gameweek=25))
+        db.commit()
+        assert [e.id for e in events_after(db, last)] == [last + 1, last + 2]
+
+        # A gap that never fills (a rolled-back writer) is skipped once settled.
+        db.add(ScoringEvent(id=last + 4, kind="wildcard", gameweek=25,
+                            created_at=datetime.now(timezone.utc) - timedelta(seconds=SCORING_EVENT_SETTLE_SECONDS + 1)))
+        db.commit()
+        assert [e.id for e in events_after(db, last + 2)] == [last + 4]
+    finally:
+        db.close()
+
+
+def test_prediction_consensus_tracks_submissions_and_unlocks_at_kickoff(client):
+    db = SessionLocal()
+    try:
+        _, admin_header = _make_admin_and_header(db, "consensus")
+        players = [
+            _make_user(db, username=f"crowd{i}", email=f"crowd{i}@test.com") for i in range(3)
+        ]
+        future = datetime.now(timezone.utc) + timedelta(days=2)
+        fixture = Fixture(gameweek=27, date=future.date(), home_team="CrowdHome",
+                          away_team="CrowdAway", kickoff_time=future)
+        db.add(fixture)
+        db.commit()
+        fixture_id = fixture.id
+        headers = [_auth_header(p) for p in players]
+        leaver_id = players[2].id
+    finally:
+        db.close()
+
+    def submit(header, home, away):
+        resp = client.post(
+            "/predictions/",
+            json={"fixture_id": fixture_id, "gameweek": 27, "predicted_home": home, "predicted_away": away},
+            headers=header,
+        )
+        assert resp.status_code == 200
+
+    submit(headers[0], 2, 1)
+    submit(headers[1], 2, 1)
+    submit(headers[2], 0, 0)
+    submit(headers[1], 1, 1)  # an update moves the count, not adds to it
+
+    # Players can't peek before kickoff; admins can.
+    assert client.get(f"/fixtures/{fixture_id}/consensus", headers=headers[0]).status_code == 403
+    resp = client.get(f"/fixtures/{fixture_id}/consensus", headers=admin_header)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["locked"] is False
+    assert body["predictions"] == 3
+    assert body["outcomes"] == {"home": 1, "draw": 2, "away": 0}
+    assert body["scorelines"] == {"2-1": 1, "1-1": 1, "0-0": 1}
+    assert body["average_goals"] == {"home": 1.0, "away": 0.67}
+
+    # Deleting a player takes their prediction out of the aggregate.
+    assert client.delete(f"/admin/users/{leaver_id}", headers=admin_header).status_code == 200
+    viewer = client.get("/admin/predictions", params={"gameweek": 27}, headers=admin_header).json()
+    entry = next(f for f in viewer["fixtures"] if f["fixture_id"] == fixture_id)
+    assert entry["consensus"]["scorelines"] == {"2-1": 1, "1-1": 1}
+    assert entry["consensus"]["outcome_pct"] == {"home": 50.0, "draw": 50.0, "away": 0.0}
+
+    # Once kicked off, players see it — and a rebuild agrees with the
+    # incrementally maintained row.
+    resp = client.patch(f"/admin/fixtures/{fixture_id}", json={"date": "2020-01-01", "time": "15:00"},
+                        headers=admin_header)
+    assert resp.status_code == 200
+    resp = client.get(f"/fixtures/{fixture_id}/consensus", headers=headers[0])
+    assert resp.status_code == 200
+    assert resp.json()["locked"] is True
+
+    from consensus import consensus_summary, rebuild_consensus
+    from models import PredictionConsensus
+
+    db = SessionLocal()
+    try:
+        incremental = consensus_summary(db.get(PredictionConsensus, fixture_id))
+        rebuild_consensus(db, [fixture_id])
+        db.commit()
+        assert consensus_summary(db.get(PredictionConsensus, fixture_id)) == incremental
+    finally:
+        db.close()
+    assert client.get("/fixtures/999999/consensus", headers=headers[0]).status_code == 404
+
+
+def test_interleaved_prediction_updates_keep_consensus_exact(client):
+    """An update that read the prediction before another update committed
+    must not move the same old scoreline out of the consensus twice."""
+    from fastapi import Response
+    from consensus import consensus_summary, rebuild_consensus
+    from models import PredictionConsensus
+    from routes.predictions import PredictionSubmit, _save_prediction
+
+    db = SessionLocal()
+    try:
+        fid = _make_fixture(db, gameweek=27, home="InterHome", away="InterAway")
+        user = _make_user(db, username="interleaver", email="interleaver@test.com")
+    finally:
+        db.close()
+
+    def save(session, home, away):
+        submit = PredictionSubmit(fixture_id=fid, gameweek=27, predicted_home=home, predicted_away=away)
+        return _save_prediction(submit, Response(), user, session)
+
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        save(first, 1, 1)
+        # The first request has the 1-1 row loaded when the second commits 3-0.
+        seen = first.query(Prediction).filter(Prediction.fixture_id == fid).one()
+        assert (seen.predicted_home, seen.predicted_away) == (1, 1)
+        save(second, 3, 0)
+        save(first, 0, 2)
+    finally:
+        first.close()
+        second.close()
+
+    db = SessionLocal()
+    try:
+        incremental = consensus_summary(db.get(PredictionConsensus, fid))
+        assert incremental["scorelines"] == {"0-2": 1}
+        assert incremental["outcomes"] == {"home": 0, "draw": 0, "away": 1}
+        rebuild_consensus(db, [fid])
+        db.commit()
+        assert consensus_summary(db.get(PredictionConsensus, fid)) == incremental
+    finally:
+        db.close()
+
+
+def test_season_projection_is_reproducible_across_worker_counts(client):
+    import projection
+    from metrics import metrics
+
+    db = SessionLocal()
+    try:
+        _, admin_header = _make_admin_and_header(db, "projection")
+        user = _make_user(db, username="projector", email="projector@test.com")
+        fid = _make_fixture(db, gameweek=28, home="ProjHome", away="ProjAway")
+        open_fid = _make_fixture(db, gameweek=28, home="ProjHome2", away="ProjAway2")
+        db.get(Fixture, fid).kickoff_time = datetime.now(timezone.utc) - timedelta(minutes=5)
+        db.get(Fixture, open_fid).kickoff_time = datetime.now(timezone.utc) + timedelta(days=2)
+        db.commit()
+        _add_prediction(db, user_id=user.id, fixture_id=fid, gameweek=28, home=1, away=1)
+        _add_prediction(db, user_id=user.id, fixture_id=open_fid, gameweek=28, home=1, away=1)
+        header = _auth_header(user)
+    finally:
+        db.close()
+
+    params = {"simulations": 2000, "seed": 7}
+    resp = client.get("/leaderboard/projection", params=params, headers=header)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["seed"] == 7 and body["simulations"] == 2000
+    assert body["predictions_counted"] == "locked"
+    mine = next(p for p in body["players"] if p["player"] == "projector")
+    assert mine["current_points"] == 0
+    # Only the kicked-off fixture counts for players. A 1-1 call scores 5
+    # on 1-1 (9%) and 2 on any other draw (12.54%).
+    assert abs(mine["expected_points"] - 0.7) <= 0.15
+    for p in body["players"]:
+        assert 0 <= p["p_first"] <= p["p_top3"] <= 1
+
+    # Admins see both predictions.
+    admin_body = client.get("/leaderboard/projection", params=params, headers=admin_header).json()
+    assert admin_body["predictions_counted"] == "all"
+    mine = next(p for p in admin_body["players"] if p["player"] == "projector")
+    assert abs(mine["expected_points"] - 1.4) <= 0.3
+
+    # A repeat run is served from the cache.
+    runs, hits = metrics.get("projection.runs"), metrics.get("projection.cache_hits")
+    assert client.get("/leaderboard/projection", params=params, headers=header).json() == body
+    assert metrics.get("projection.runs") == runs
+    assert metrics.get("projection.cache_hits") == hits + 1
+
+    # Chunks are seeded independently of the pool, so spreading them across
+    # processes gives the same numbers as running them inline.
+    db = SessionLocal()
+    try:
+        projection._cache.clear()
+        pooled = projection.project_season(db, simulations=2000, seed=7, workers=2, locked_only=True)
+        projection._cache.clear()
+        inline = projection.project_season(db, simulations=2000, seed=7, workers=1, locked_only=True)
+    finally:
+        db.close()
+        projection.shutdown_pool()
+    assert pooled["players"] == inline["players"] == body["players"]
+
+    assert client.get("/leaderboard/projection", params={"simulations": 10}, headers=header).status_code == 422
+    assert client.get("/leaderboard/projection").status_code == 403
+
+
+def test_what_if_standings_apply_hypothetical_results_without_saving(client):
+    db = SessionLocal()
+    try:
+        _, admin_header = _make_admin_and_header(db, "whatif")
+        alice = _make_user(db, username="whatif_a", email="whatif_a@test.com")
+        bob = _make_user(db, username="whatif_b", email="whatif_b@test.com")
+        past = datetime.now(timezone.utc) - timedelta(hours=1)
+        live = Fixture(gameweek=29, date=past.date(), home_team="WhatIfHome1",
+                       away_team="WhatIfAway1", kickoff_time=past)
+        db.add(live)
+        db.commit()
+        live_id = live.id
+        played_id = _make_fixture(db, gameweek=29, home="WhatIfHome2", away="WhatIfAway2")
+        future_id = _make_fixture(db, gameweek=29, home="WhatIfHome3", away="WhatIfAway3")
+        postponed_id = _make_fixture(db, gameweek=29, home="WhatIfHome4", away="WhatIfAway4",
+                                     status="postponed")
+        _add_prediction(db, user_id=alice.id, fixture_id=live_id, gameweek=29, home=2, away=0)
+        _add_prediction(db, user_id=bob.id, fixture_id=live_id, gameweek=29, home=1, away=0)
+        _add_prediction(db, user_id=bob.id, fixture_id=played_id, gameweek=29, home=0, away=0)
+        _add_result(db, fixture_id=played_id, gameweek=29, home=0, away=0)
+        db.add(Wildcard(user_id=alice.id, gameweek=29))
+        db.commit()
+        header = _auth_header(alice)
+    finally:
+        db.close()
+
+    before = {r["player"]: r for r in client.get("/leaderboard/").json()["leaderboard"]}
+    assert before["whatif_b"]["total"] == 5
+
+    resp = client.post("/leaderboard/what-if", headers=header, json={"results": [
+        {"fixture_id": live_id, "actual_home": 2, "actual_away": 0},
+        # Replaces the real 0-0: bob's exact score becomes a wrong result.
+        {"fixture_id": played_id, "actual_home": 0, "actual_away": 1},
+    ]})
+    assert resp.status_code == 200
+    rows = {r["player"]: r for r in resp.json()["leaderboard"]}
+    alice_row, bob_row = rows["whatif_a"], rows["whatif_b"]
+    assert alice_row["points_change"] == 10  # exact score, wildcard x2
+    assert alice_row["week_29"] == 10 and alice_row["exact_scores"] == 1
+    assert alice_row["previous_rank"] is None and alice_row["rank_change"] is None
+    assert bob_row["points_change"] == 2 - 5
+    assert bob_row["total"] == 2 and bob_row["exact_scores"] == before["whatif_b"]["exact_scores"] - 1
+    assert bob_row["previous_rank"] == before["whatif_b"]["rank"]
+    assert bob_row["rank_change"] == bob_row["previous_rank"] - bob_row["rank"]
+    ranks = [r["rank"] for r in resp.json()["leaderboard"]]
+    assert ranks == list(range(1, len(ranks) + 1))
+
+    # Nothing was saved.
+    after = {r["player"]: r for r in client.get("/leaderboard/").json()["leaderboard"]}
+    assert after == before
+
+    def ask(fixture_id, headers):
+        return client.post("/leaderboard/what-if", headers=headers, json={"results": [
+            {"fixture_id": fixture_id, "actual_home": 1, "actual_away": 1},
+        ]})
+
+    # Before kickoff only admins may ask; it would reveal predictions.
+    assert ask(future_id, header).status_code == 403
+    assert ask(future_id, admin_header).status_code == 200
+    resp = ask(postponed_id, admin_header)
+    assert resp.status_code == 400
+    assert resp.json()["detail"]["errors"] == [f"Fixture {postponed_id} is postponed"]
+    assert ask(999999, admin_header).status_code == 400
+
+
+def test_mini_league_boards_rerank_members_from_the_shared_board(client):
+    db = SessionLocal()
+    try:
+        owner = _make_user(db, username="league_owner", email="league_owner@test.com")
+        friend = _make_user(db, username="league_friend", email="league_friend@test.com")
+        outsider = _make_user(db, username="league_outsider", email="league_outsider@test.com")
+        fid = _make_fixture(db, gameweek=26, home="LeagueHome", away="LeagueAway")
+        _add_prediction(db, user_id=friend.id, fixture_id=fid, gameweek=26, home=3, away=1)
+        _add_prediction(db, user_id=owner.id, fixture_id=fid, gameweek=26, home=0, away=2)
+        _add_result(db, fixture_id=fid, gameweek=26, home=3, away=1)
+        owner_h, friend_h, outsider_h = (_auth_header(u) for u in (owner, friend, outsider))
+    finally:
+        db.close()
+
+    resp = client.post("/leagues/", json={"name": "  Station crew  "}, headers=owner_h)
+    assert resp.status_code == 200
+    league = resp.json()
+    assert league["name"] == "Station crew" and league["member_count"] == 1
+
+    joined = client.post("/leagues/join", json={"token": league["invite_token"]}, headers=friend_h).json()
+    assert joined["joined"] is True and joined["member_count"] == 2
+    again = client.post("/leagues/join", json={"token": league["invite_token"]}, headers=friend_h).json()
+    assert again["joined"] is False and again["member_count"] == 2
+    mine = client.get("/leagues/mine", headers=friend_h).json()["leagues"]
+    assert [(l["id"], l["member_count"]) for l in mine] == [(league["id"], 2)]
+
+    overall = {r["player"]: r for r in client.get("/leaderboard/").json()["leaderboard"]}
+    resp = client.get(f"/leagues/{league['id']}/leaderboard", headers=owner_h)
+    assert resp.status_code == 200
+    rows = resp.json()["leaderboard"]
+    assert [(r["player"], r["rank"]) for r in rows] == [("league_friend", 1), ("league_owner", 2)]
+    assert rows[0]["total"] == 5 and rows[0]["overall_rank"] == overall["league_friend"]["rank"]
+    assert rows[1]["total"] == 0 and rows[1]["overall_rank"] == overall["league_owner"]["rank"]
+
+    assert client.get(f"/leagues/{league['id']}/leaderboard", headers=outsider_h).status_code == 403
+    assert client.get("/leagues/missing/leaderboard", headers=owner_h).status_code == 404
+
+    # Only the creator can rotate the invite; the old token then stops working.
+    assert client.post(f"/leagues/{league['id']}/invite/rotate", headers=friend_h).status_code == 403
+    rotated = client.post(f"/leagues/{league['id']}/invite/rotate", headers=owner_h).json()
+    assert rotated["invite_token"] != league["invite_token"]
+    assert client.post("/leagues/join", json={"token": league["invite_token"]},
+                       headers=outsider_h).status_code == 404
+
+    # The last member out deletes the league.
+    assert client.delete(f"/leagues/{league['id']}/members/me", headers=friend_h).status_code == 200
+    assert client.delete(f"/leagues/{league['id']}/members/me", headers=owner_h).status_code == 200
+    assert client.get(f"/leagues/{league['id']}/leaderboard", headers=owner_h).status_code == 404
+
+
+def test_active_season_ignores_a_season_name_too_long_for_the_columns(client):
+    from models import SiteSetting
+    from seasons import default_season_label, ensure_active_season
+
+    db = SessionLocal()
+    try:
+        # As on a database migrated before seasons existed.
+        db.query(SiteSetting).filter(SiteSetting.key == "active_season").delete()
+        db.merge(SiteSetting(key="season_name", value="Premier League Predictor 2025/26 season"))
+        db.flush()
+        assert ensure_active_season(db) == default_season_label()
+        db.merge(SiteSetting(key="season_name", value=" 2025/26 "))
+        db.query(SiteSetting).filter(SiteSetting.key == "active_season").delete()
+        db.flush()
+        assert ensure_active_season(db) == "2025/26"
+    finally:
+        db.rollback()
+        db.close()
+
+
+def test_archiving_a_season_freezes_standings_and_empties_hot_tables(client):
+    # Archives everything in the shared database, so it has to run last.
+    from models import PredictionConsensus, SeasonArchive
+    from seasons import archive_data
+
+    active = client.get("/seasons").json()["active"]
+    assert active
+
+    db = SessionLocal()
+    try:
+        _, admin_header = _make_admin_and_header(db, "seasons")
+        user_id = _make_user(db, username="season_player", email="season_player@test.com").id
+        fid = _make_fixture(db, gameweek=37, home="SeasonHome", away="SeasonAway")
+        _add_prediction(db, user_id=user_id, fixture_id=fid, gameweek=37, home=1, away=0)
+        _add_result(db, fixture_id=fid, gameweek=37, home=1, away=0)
+        _make_fixture(db, gameweek=38, home="SeasonAway", away="SeasonHome")
+        assert db.get(Fixture, fid).season == active
+        assert db.query(Prediction).filter(Prediction.fixture_id == fid).one().season == active
+        hot_fixtures = db.query(Fixture).count()
+        hot_predictions = db.query(Prediction).count()
+    finally:
+        db.close()
+
+    resp = client.put("/settings/active_season", json={"value": "1999/00"}, headers=admin_header)
+    assert resp.status_code == 400
+
+    final = client.get("/leaderboard/").json()["leaderboard"]
+    # The gameweek 38 fixture has no result, so a plain archive is refused.
+    resp = client.post("/admin/seasons/archive", json={"next_season": "2099/00"}, headers=admin_header)
+    assert resp.status_code == 400 and "still have no result" in resp.json()["detail"]
+    resp = client.post("/admin/seasons/archive", json={"next_season": "2099/00", "force": True},
+                       headers=admin_header)
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "archived": active, "active": "2099/00", "season_name": "2099/00", "fixtures": hot_fixtures,
+        "predictions": hot_predictions, "champion": final[0]["player"],
+    }
+
+    db = SessionLocal()
+    try:
+        for model in (Fixture, Prediction, Result, Wildcard, PredictionConsensus):
+            assert db.query(model).count() == 0
+        data = archive_data(db.get(SeasonArchive, active))
+        assert len(data["predictions"]["rows"]) == hot_predictions
+        assert data["users"][user_id] == "season_player"
+        assert [fid, 37, 1, 0] in data["results"]["rows"]
+        # New rows belong to the new season.
+        new_fid = _make_fixture(db, gameweek=1, home="SeasonHome", away="SeasonAway")
+        assert db.get(Fixture, new_fid).season == "2099/00"
+    finally:
+        db.close()
+
+    seasons = client.get("/seasons").json()
+    assert seasons["active"] == "2099/00"
+    assert [a["season"] for a in seasons["archived"]] == [active]
+    frozen = client.get(f"/seasons/{active}/standings").json()
+    assert frozen["leaderboard"] == final and frozen["champion"] == final[0]["player"]
+    assert client.get("/leaderboard/").json()["leaderboard"] == []
+    assert client.get("/settings").json()["season_name"] == "2099/00"
+
+    resp = client.post("/admin/seasons/archive", json={"next_season": "2099/00", "force": True},
+                       headers=admin_header)
+    assert resp.status_code == 400
+    assert client.get("/seasons/1066/standings").status_code == 404
+
+
+def test_simulate_archives_the_active_season_before_reseeding(client):
+    # Replaces every hot row, so it runs after the archive test above.
+    from models import FixtureSyncDiff
+
+    db = SessionLocal()
+    try:
+        _, admin_header = _make_admin_and_header(db, "simulate")
+        _make_fixture(db, gameweek=2, home="SimKeepHome", away="SimKeepAway")
+        db.add(FixtureSyncDiff(id=1, fetched_at=datetime.now(timezone.utc), source="preview",
+                               api_match_count=0, changes=[], unmapped_teams=[]))
+        db.commit()
+    finally:
+        db.close()
+    before = client.get("/seasons").json()
+    name = client.get("/settings").json()["season_name"]
+
+    resp = client.post("/admin/simulate", headers=admin_header)
+    assert resp.status_code == 200
+    assert resp.json()["archived"] == before["active"]
+
+    after = client.get("/seasons").json()
+    assert after["active"].startswith("sim-")
+    assert before["active"] in [a["season"] for a in after["archived"]]
+    assert client.get("/settings").json()["season_name"] == name
+
+    db = SessionLocal()
+    try:
+        assert db.query(Fixture).filter(Fixture.home_team == "SimKeepHome").count() == 0
+        assert {s for (s,) in db.query(Fixture.season).distinct()} == {after["active"]}
+        # The stored sync diff named fixtures that no longer exist.
+        assert db.query(FixtureSyncDiff).count() == 0
+    finally:
+        db.close()
+
+    # reset_data.py's soft reset: the fixtures carry over into a new season.
+    from seasons import archive_before_reset
+
+    db = SessionLocal()
+    try:
+        fixtures = db.query(Fixture).count()
+        summary = archive_before_reset(db, "reset", keep_fixtures=True)
+        db.commit()
+        assert summary["archived"] == after["active"] and summary["fixtures"] == fixtures
+        assert {s for (s,) in db.query(Fixture.season).distinct()} == {summary["active"]}
+        assert db.query(Fixture).count() == fixtures
+        assert db.query(Prediction).count() == db.query(Result).count() == 0
+    finally:
+        db.close()
@@ -14,6 +14,7 @@ import Predictions from "./pages/Predictions";
 import Results from "./pages/Results";
 import Leaderboard from "./pages/Leaderboard";
 import Dashboard from "./pages/Dashboard";
+import Leagues from "./pages/Leagues";
 import Admin from "./pages/Admin";
 import NotFound from "./pages/NotFound";
 
@@ -65,6 +66,14 @@ export default function App() {
                 </ProtectedRoute>
               }
             />
+            <Route
+              path="/leagues"
+              element={
+                <ProtectedRoute>
+                  <Leagues />
+                </ProtectedRoute>
+              }
+            />
 
             {/* Admin Only Routes */}
             <Route
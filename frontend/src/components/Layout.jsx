@@ -45,6 +45,7 @@ export default function Layout({ children }) {
     { to: '/fixtures', label: 'Fixtures' },
     ...(isAuthenticated ? [{ to: '/predictions', label: 'Predictions' }] : []),
     { to: '/leaderboard', label: 'Leaderboard' },
+    ...(isAuthenticated ? [{ to: '/leagues', label: 'Leagues' }] : []),
     ...(isAuthenticated ? [{ to: '/dashboard', label: 'Dashboard' }] : []),
     ...(isAdmin ? [{ to: '/results', label: 'Results' }] : []),
     ...(isAdmin ? [{ to: '/admin', label: 'Admin Panel' }] : []),
@@ -29,6 +29,8 @@ function OverviewTab() {
   const [editingSeason, setEditingSeason] = useState(false);
   const [seasonInput, setSeasonInput] = useState('');
   const [savingSeason, setSavingSeason] = useState(false);
+  const [nextSeason, setNextSeason] = useState('');
+  const [archiving, setArchiving] = useState(false);
 
   useEffect(() => {
     adminAPI.getOverview()
@@ -53,6 +55,27 @@ function OverviewTab() {
     }
   };
 
+  const handleArchive = async () => {
+    const trimmed = nextSeason.trim();
+    if (!trimmed) return;
+    const unscored = data.total_fixtures - data.total_results;
+    const warning = unscored > 0 ? `\n\n${unscored} fixtures still have no result and will be archived unscored.` : '';
+    if (!window.confirm(`Archive ${seasonName} and start ${trimmed}? Fixtures, predictions and results move to the archive, and the season name shown to players becomes "${trimmed}".${warning}`)) return;
+    setArchiving(true);
+    try {
+      const r = await adminAPI.archiveSeason(trimmed, unscored > 0);
+      reloadSettings();
+      setNextSeason('');
+      toast.success(`${r.data.archived} archived — ${r.data.season_name} is now active`);
+      const overview = await adminAPI.getOverview();
+      setData(overview.data);
+    } catch (err) {
+      toast.error(err.response?.data?.detail || 'Failed to archive season');
+    } finally {
+      setArchiving(false);
+    }
+  };
+
   if (loading) return (
     <div className="animate-pulse space-y-4">
       <div className="grid grid-cols-2 lg:grid-cols-4 gap-3 sm:gap-4">
@@ -132,6 +155,29 @@ function OverviewTab() {
           </div>
         )}
       </div>
+
+      {/* End of season */}
+      <div className="adm-card">
+        <p className="adm-section-title mb-1">End of Season</p>
+        <p className="text-xs text-gray-400 mb-4">
+          Freezes the final table and moves this season&apos;s fixtures, predictions and results to the archive,
+          leaving a clean slate for the next season. Players and invites are kept; the season name becomes the
+          next season&apos;s label (rename it above afterwards if you like).
+        </p>
+        <div className="flex items-center gap-3">
+          <input
+            type="text"
+            value={nextSeason}
+            onChange={(e) => setNextSeason(e.target.value)}
+            placeholder="Next season, e.g. 2026/27"
+            maxLength={20}
+            className="input-field w-56 text-sm"
+          />
+          <button onClick={handleArchive} disabled={archiving || !nextSeason.trim()} className="adm-btn-primary text-sm px-4 py-2">
+            {archiving ? 'Archiving…' : 'Archive season'}
+          </button>
+        </div>
+      </div>
     </div>
   );
 }
@@ -510,6 +556,32 @@ function PredictionsTab() {
                 </tr>
               ))}
             </tbody>
+            <tfoot>
+              {/* League-wide consensus: H/D/A split and the most popular scoreline. */}
+              <tr>
+                <td className="adm-matrix-td-player">League</td>
+                {data.fixtures.map(f => {
+                  const c = f.consensus;
+                  return (
+                    <td key={f.fixture_id} className="adm-matrix-td">
+                      {c && c.predictions > 0 ? (
+                        <span
+                          className="adm-matrix-score"
+                          title={`Home ${c.outcome_pct.home}% · Draw ${c.outcome_pct.draw}% · Away ${c.outcome_pct.away}%`}
+                        >
+                          {c.top_scorelines[0]?.score.replace('-', '–')}
+                          <span className="block text-[10px] text-gray-400">
+                            {Math.round(c.outcome_pct.home)}/{Math.round(c.outcome_pct.draw)}/{Math.round(c.outcome_pct.away)}
+                          </span>
+                        </span>
+                      ) : (
+                        <span className="adm-matrix-empty" aria-label="No predictions">{'—'}</span>
+                      )}
+                    </td>
+                  );
+                })}
+              </tr>
+            </tfoot>
           </table>
         </div>
       )}
@@ -1017,10 +1089,12 @@ function FixturesTab() {
 
   const handleFile = (f) => { setFile(f); setResult(null); setError(null); setConfirmed(false); };
 
-  const checkForUpdates = async () => {
+  // The preview is normally served from the diff the background job stored;
+  // refresh=true recomputes it against football-data.org right now.
+  const checkForUpdates = async (refresh = false) => {
     setSyncLoading(true); setSyncResult(null); setApplyResult(null); setSelectedChanges(new Set());
     try {
-      const res = await adminAPI.getFixtureSync();
+      const res = await adminAPI.getFixtureSync(refresh);
       setSyncResult(res.data);
       if (res.data.sync_available && res.data.changes.length === 0) {
         toast.success('All fixtures are up to date.');
@@ -1102,7 +1176,7 @@ function FixturesTab() {
               Check football-data.org for schedule changes. Nothing applies until you confirm.
             </p>
           </div>
-          <button onClick={checkForUpdates} disabled={syncLoading || applying}
+          <button onClick={() => checkForUpdates()} disabled={syncLoading || applying}
             className="adm-btn-primary flex items-center gap-2 disabled:opacity-50 text-sm py-2 px-3">
             {syncLoading
               ? <><div className="animate-spin rounded-full h-4 w-4 border-b-2 border-white" /> Checking…</>
@@ -1120,6 +1194,19 @@ function FixturesTab() {
           </div>
         )}
 
+        {/* Diff age + manual refresh */}
+        {syncResult?.sync_available && syncResult.age_seconds != null && (
+          <p className="text-xs text-gray-400 mb-2">
+            Checked {syncResult.age_seconds < 60 ? 'just now' : `${Math.round(syncResult.age_seconds / 60)} min ago`}
+            {syncResult.source === 'scheduler' ? ' by the scheduled sync' : ''}
+            {' · '}
+            <button onClick={() => checkForUpdates(true)} disabled={syncLoading || applying}
+              className="underline hover:text-gray-600 dark:hover:text-gray-200 disabled:opacity-50">
+              Refresh now
+            </button>
+          </p>
+        )}
+
         {/* No changes */}
         {syncResult?.sync_available && syncResult.changes.length === 0 && (
           <p className="text-sm text-green-600 dark:text-green-400">
@@ -0,0 +1,203 @@
+import { useEffect, useState } from 'react';
+import { useSearchParams } from 'react-router-dom';
+import toast from 'react-hot-toast';
+import { FiUsers, FiPlus, FiCopy, FiRefreshCw, FiLogOut } from 'react-icons/fi';
+import { leaguesAPI } from '../services/api';
+import { useAuth } from '../context/AuthContext';
+
+function LeagueBoard({ league, onLeft, onRotated }) {
+  const { user } = useAuth();
+  const [board, setBoard] = useState(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    setBoard(null);
+    leaguesAPI.getLeaderboard(league.id)
+      .then(r => { if (!cancelled) setBoard(r.data.leaderboard); })
+      .catch(() => { if (!cancelled) toast.error('Failed to load league table'); });
+    return () => { cancelled = true; };
+  }, [league.id]);
+
+  const inviteLink = `${window.location.origin}${league.invite_url}`;
+
+  const copyInvite = () => {
+    navigator.clipboard.writeText(inviteLink)
+      .then(() => toast.success('Invite link copied'))
+      .catch(() => toast.error('Could not copy the link'));
+  };
+
+  const rotate = async () => {
+    try {
+      const r = await leaguesAPI.rotateInvite(league.id);
+      onRotated(r.data);
+      toast.success('New invite link created — the old one no longer works');
+    } catch (err) {
+      toast.error(err.response?.data?.detail || 'Failed to reset invite');
+    }
+  };
+
+  const leave = async () => {
+    if (!window.confirm(`Leave ${league.name}?`)) return;
+    try {
+      await leaguesAPI.leave(league.id);
+      onLeft(league.id);
+    } catch {
+      toast.error('Failed to leave league');
+    }
+  };
+
+  return (
+    <div className="card space-y-4">
+      <div className="flex flex-wrap items-center justify-between gap-3">
+        <h2 className="text-xl font-bold text-rnli-blue dark:text-white">{league.name}</h2>
+        <div className="flex flex-wrap gap-2">
+          <button onClick={copyInvite} className="btn-secondary flex items-center gap-2 text-sm">
+            <FiCopy className="w-4 h-4" /> Copy invite link
+          </button>
+          <button onClick={rotate} className="btn-secondary flex items-center gap-2 text-sm" title="Create a new link">
+            <FiRefreshCw className="w-4 h-4" />
+          </button>
+          <button onClick={leave} className="btn-secondary flex items-center gap-2 text-sm" title="Leave league">
+            <FiLogOut className="w-4 h-4" />
+          </button>
+        </div>
+      </div>
+
+      {!board && <div className="animate-pulse h-32 rounded bg-gray-100 dark:bg-gray-800" />}
+
+      {board && (
+        <table className="w-full text-sm">
+          <thead>
+            <tr className="text-left text-gray-500 dark:text-gray-400">
+              <th className="py-2 w-12">#</th>
+              <th className="py-2">Player</th>
+              <th className="py-2 text-right">Exact</th>
+              <th className="py-2 text-right">Overall</th>
+              <th className="py-2 text-right">Points</th>
+            </tr>
+          </thead>
+          <tbody>
+            {board.map(row => (
+              <tr
+                key={row.player}
+                className={`border-t border-gray-100 dark:border-gray-800 ${row.player === user?.username ? 'font-semibold' : ''}`}
+              >
+                <td className="py-2">{row.rank}</td>
+                <td className="py-2">{row.player}</td>
+                <td className="py-2 text-right">{row.exact_scores}</td>
+                <td className="py-2 text-right text-gray-500">{row.overall_rank ?? '—'}</td>
+                <td className="py-2 text-right">{row.total}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      )}
+    </div>
+  );
+}
+
+export default function Leagues() {
+  const [searchParams, setSearchParams] = useSearchParams();
+  const [leagues, setLeagues] = useState([]);
+  const [selectedId, setSelectedId] = useState(null);
+  const [name, setName] = useState('');
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    const token = searchParams.get('join');
+    const load = () => leaguesAPI.getMine().then(r => {
+      setLeagues(r.data.leagues);
+      setSelectedId(id => id ?? r.data.leagues[0]?.id ?? null);
+    });
+
+    // An invite link lands here as /leagues?join=<token>.
+    const joining = token
+      ? leaguesAPI.join(token)
+          .then(r => {
+            toast.success(r.data.joined ? `Joined ${r.data.name}` : `You're already in ${r.data.name}`);
+            setSelectedId(r.data.id);
+          })
+          .catch(err => toast.error(err.response?.data?.detail || 'Failed to join league'))
+          .finally(() => setSearchParams({}, { replace: true }))
+      : Promise.resolve();
+
+    joining
+      .then(load)
+      .catch(() => toast.error('Failed to load leagues'))
+      .finally(() => setLoading(false));
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, []);
+
+  const create = async (e) => {
+    e.preventDefault();
+    if (!name.trim()) return;
+    try {
+      const r = await leaguesAPI.create(name.trim());
+      setLeagues(ls => [...ls, r.data].sort((a, b) => a.name.localeCompare(b.name)));
+      setSelectedId(r.data.id);
+      setName('');
+      toast.success('League created — share the invite link with your friends');
+    } catch (err) {
+      toast.error(err.response?.data?.detail || 'Failed to create league');
+    }
+  };
+
+  const selected = leagues.find(l => l.id === selectedId);
+
+  return (
+    <div className="max-w-4xl mx-auto space-y-6">
+      <div className="flex items-center gap-3">
+        <FiUsers className="w-7 h-7 text-rnli-blue dark:text-rnli-yellow" />
+        <h1 className="text-3xl font-bold text-rnli-blue dark:text-white">Mini-leagues</h1>
+      </div>
+
+      <form onSubmit={create} className="flex gap-3">
+        <input
+          value={name}
+          onChange={e => setName(e.target.value)}
+          maxLength={60}
+          placeholder="New league name, e.g. Station crew"
+          className="input-field flex-1"
+        />
+        <button type="submit" className="btn-primary flex items-center gap-2" disabled={!name.trim()}>
+          <FiPlus className="w-4 h-4" /> Create
+        </button>
+      </form>
+
+      {loading && <div className="animate-pulse card h-40" />}
+
+      {!loading && leagues.length === 0 && (
+        <div className="card text-center text-gray-500 dark:text-gray-400 py-10">
+          You're not in any mini-leagues yet. Create one, or open an invite link from a friend.
+        </div>
+      )}
+
+      {!loading && leagues.length > 0 && (
+        <>
+          <div className="flex flex-wrap gap-2">
+            {leagues.map(l => (
+              <button
+                key={l.id}
+                onClick={() => setSelectedId(l.id)}
+                className={l.id === selectedId ? 'btn-primary text-sm' : 'btn-secondary text-sm'}
+              >
+                {l.name} <span className="opacity-70">({l.member_count})</span>
+              </button>
+            ))}
+          </div>
+          {selected && (
+            <LeagueBoard
+              key={selected.id}
+              league={selected}
+              onRotated={updated => setLeagues(ls => ls.map(l => (l.id === updated.id ? updated : l)))}
+              onLeft={id => {
+                setLeagues(ls => ls.filter(l => l.id !== id));
+                setSelectedId(null);
+              }}
+            />
+          )}
+        </>
+      )}
+    </div>
+  );
+}
@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
-import { fixturesAPI, predictionsAPI, resultsAPI } from '../services/api';
+import { gameweeksAPI, predictionsAPI } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import toast from 'react-hot-toast';
 import { FiSave, FiZap, FiLock, FiCheck, FiStar, FiChevronDown } from 'react-icons/fi';
@@ -74,33 +74,38 @@ export default function Predictions() {
     if (wildcardConfirmOpen) wildcardCancelRef.current?.focus();
   }, [wildcardConfirmOpen]);
 
+  // Gameweek whose view is on screen. The first load asks the server for the
+  // current gameweek and then moves the selector there; this stops that move
+  // from triggering a second fetch for the same gameweek.
+  const loadedGameweek = useRef(null);
+
   const fetchData = useCallback(async () => {
+    if (selectedGameweek === loadedGameweek.current) return;
     try {
       setLoading(true);
-      const [fixturesRes, predictionsRes, resultsRes] = await Promise.allSettled([
-        fixturesAPI.getByGameweek(selectedGameweek),
-        predictionsAPI.getByGameweek(selectedGameweek),
-        resultsAPI.getByGameweek(selectedGameweek),
-      ]);
-
-      if (fixturesRes.status !== 'fulfilled' || predictionsRes.status !== 'fulfilled') {
-        throw fixturesRes.reason ?? predictionsRes.reason;
-      }
+      // One request: fixtures with my prediction, result, lock state and wildcard.
+      const firstLoad = loadedGameweek.current === null;
+      const res = firstLoad
+        ? await gameweeksAPI.getCurrentView()
+        : await gameweeksAPI.getView(selectedGameweek);
+      const view = res.data;
 
       const predictionsLookup = {};
-      predictionsRes.value.data.predictions.forEach((p) => {
-        predictionsLookup[p.fixture_id] = { home: p.predicted_home, away: p.predicted_away };
+      view.fixtures.forEach((f) => {
+        if (f.prediction) {
+          predictionsLookup[f.id] = { home: f.prediction.predicted_home, away: f.prediction.predicted_away };
+        }
       });
 
-      const resultFixtureIds =
-        resultsRes.status === 'fulfilled'
-          ? (resultsRes.value.data?.results ?? []).map((r) => r.fixture_id)
-          : [];
-
-      setFixtures(fixturesRes.value.data.fixtures);
+      setFixtures(view.fixtures);
       setPredictions(predictionsLookup);
-      setSavedOnServer(new Set(predictionsRes.value.data.predictions.map((p) => p.fixture_id)));
-      setResultIds(new Set(resultFixtureIds));
+      setSavedOnServer(new Set(view.fixtures.filter((f) => f.prediction).map((f) => f.id)));
+      setResultIds(new Set(view.fixtures.filter((f) => f.lock.result_entered).map((f) => f.id)));
+      setWildcardGameweeks(new Set(view.wildcard.used_gameweek ? [view.wildcard.used_gameweek] : []));
+      if (view.completed_gameweeks) setCompletedGameweeks(new Set(view.completed_gameweeks));
+
+      loadedGameweek.current = view.gameweek;
+      if (firstLoad) setSelectedGameweek(view.gameweek);
     } catch (error) {
       console.error('Error fetching data:', error);
       toast.error('Failed to load fixtures');
@@ -111,32 +116,6 @@ export default function Predictions() {
 
   useEffect(() => { fetchData(); }, [fetchData]);
 
-  useEffect(() => {
-    let cancelled = false;
-    const loadCompleted = async () => {
-      try {
-        const res = await resultsAPI.getCompletedGameweeks();
-        if (cancelled) return;
-        const completed = new Set(res.data?.completed_gameweeks ?? []);
-        setCompletedGameweeks(completed);
-        const firstOpen = Array.from({ length: 38 }, (_, i) => i + 1).find((gw) => !completed.has(gw));
-        if (firstOpen) setSelectedGameweek(firstOpen);
-      } catch (err) {
-        console.error('Error loading completed gameweeks:', err);
-      }
-    };
-    loadCompleted();
-    return () => { cancelled = true; };
-  }, []);
-
-  useEffect(() => {
-    let cancelled = false;
-    predictionsAPI.getWildcards()
-      .then((res) => { if (!cancelled) setWildcardGameweeks(new Set(res.data?.gameweeks ?? [])); })
-      .catch((err) => { console.error('Error loading wildcards:', err); });
-    return () => { cancelled = true; };
-  }, []);
-
   const wildcardActive = wildcardGameweeks.has(selectedGameweek);
   // Wildcard is a one-per-season chip — used on any other GW means it's spent.
   const wildcardUsedGW = wildcardGameweeks.size > 0 && !wildcardActive
@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback } from 'react';
-import { fixturesAPI, resultsAPI } from '../services/api';
+import { gameweeksAPI, resultsAPI } from '../services/api';
 import toast from 'react-hot-toast';
 import { FiSave, FiCheckCircle, FiSlash } from 'react-icons/fi';
 
@@ -15,19 +15,17 @@ export default function Results() {
   const fetchData = useCallback(async () => {
     try {
       setLoading(true);
-      const [fixturesRes, resultsRes] = await Promise.all([
-        fixturesAPI.getByGameweek(selectedGameweek),
-        resultsAPI.getByGameweek(selectedGameweek),
-      ]);
+      const res = await gameweeksAPI.getView(selectedGameweek);
 
       const resultsLookup = {};
       const serverSavedIds = new Set();
-      resultsRes.data.results.forEach((r) => {
-        resultsLookup[r.fixture_id] = { home: r.actual_home, away: r.actual_away };
-        serverSavedIds.add(r.fixture_id);
+      res.data.fixtures.forEach((f) => {
+        if (!f.result) return;
+        resultsLookup[f.id] = { home: f.result.actual_home, away: f.result.actual_away };
+        serverSavedIds.add(f.id);
       });
 
-      setFixtures(fixturesRes.data.fixtures);
+      setFixtures(res.data.fixtures);
       setResults(resultsLookup);
       setSavedIds(serverSavedIds);
     } catch (error) {
@@ -78,21 +76,19 @@ export default function Results() {
     if (fixtures.length === 0) return;
     setBulkSaving(true);
     try {
-      const settledResults = await Promise.allSettled(
+      await resultsAPI.submitBatch(
+        selectedGameweek,
         fixtures.map((fixture) => {
           const result = results[fixture.id] ?? { home: 0, away: 0 };
-          return resultsAPI.submit({
+          return {
             fixture_id: fixture.id,
-            gameweek: selectedGameweek,
             actual_home: parseInt(result.home) || 0,
             actual_away: parseInt(result.away) || 0,
-          }).then((res) => {
-            setSavedIds((prev) => new Set([...prev, fixture.id]));
-            return res;
-          });
+          };
         })
       );
-      const saved = settledResults.filter((r) => r.status === 'fulfilled').length;
+      setSavedIds(new Set(fixtures.map((f) => f.id)));
+      const saved = fixtures.length;
       toast.success(`${saved} result${saved !== 1 ? 's' : ''} saved!`);
     } catch (err) {
       toast.error('Failed to save results');
@@ -38,6 +38,25 @@ api.interceptors.response.use(
   }
 );
 
+// Submissions carry an Idempotency-Key and are retried with the same key when
+// the request never got a response (dropped connection, timeout). The server
+// replays the first response for a repeated key instead of writing twice.
+const SUBMIT_RETRIES = 2;
+
+const newIdempotencyKey = () =>
+  (globalThis.crypto?.randomUUID?.() ?? `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+
+async function postIdempotent(url, data) {
+  const headers = { 'Idempotency-Key': newIdempotencyKey() };
+  for (let attempt = 0; ; attempt += 1) {
+    try {
+      return await api.post(url, data, { headers });
+    } catch (error) {
+      if (error.response || attempt >= SUBMIT_RETRIES) throw error;
+    }
+  }
+}
+
 // ============================================================================
 // Authentication API
 // ============================================================================
@@ -57,6 +76,11 @@ export const authAPI = {
 export const fixturesAPI = {
   getAll: (params) => api.get('/fixtures', { params }),
   getByGameweek: (gameweek) => api.get('/fixtures', { params: { gameweek } }),
+  // Team ids for the team_id filter (matches home and away)
+  getTeams: () => api.get('/fixtures/teams'),
+  getByTeam: (teamId) => api.get('/fixtures', { params: { team_id: teamId } }),
+  // How everyone predicted a fixture; 403 for players until kickoff
+  getConsensus: (fixtureId) => api.get(`/fixtures/${fixtureId}/consensus`),
 };
 
 // ============================================================================
@@ -64,7 +88,7 @@ export const fixturesAPI = {
 // ============================================================================
 
 export const predictionsAPI = {
-  submit: (data) => api.post('/predictions', data),
+  submit: (data) => postIdempotent('/predictions', data),
   get: (params) => api.get('/predictions', { params }),
   getByGameweek: (gameweek) => api.get('/predictions', { params: { gameweek } }),
   // Wildcard (double points for a chosen gameweek).
@@ -79,7 +103,9 @@ export const predictionsAPI = {
 // ============================================================================
 
 export const resultsAPI = {
-  submit: (data) => api.post('/results', data),
+  submit: (data) => postIdempotent('/results', data),
+  // Whole gameweek in one transaction: results = [{ fixture_id, actual_home, actual_away }]
+  submitBatch: (gameweek, results) => postIdempotent('/results/batch', { gameweek, results }),
   get: (params) => api.get('/results', { params }),
   getByGameweek: (gameweek) => api.get('/results', { params: { gameweek } }),
   // Returns { completed_gameweeks: number[] } — gameweeks where every fixture
@@ -87,12 +113,46 @@ export const resultsAPI = {
   getCompletedGameweeks: () => api.get('/results/completed-gameweeks'),
 };
 
+// ============================================================================
+// Gameweeks API
+// ============================================================================
+
+export const gameweeksAPI = {
+  // Fixtures with the caller's prediction, result and lock state embedded,
+  // plus wildcard state — everything a gameweek page needs in one request.
+  getView: (gameweek) => api.get(`/gameweeks/${gameweek}/view`),
+  // Same shape for the first uncompleted gameweek, plus completed_gameweeks.
+  getCurrentView: () => api.get('/gameweeks/current/view'),
+};
+
 // ============================================================================
 // Leaderboard API
 // ============================================================================
 
 export const leaderboardAPI = {
   get: () => api.get('/leaderboard'),
+  // Returns { version, full_reload, changed, removed } — only the rows that
+  // moved since the `version` returned by a previous get().
+  getChanges: (since) => api.get('/leaderboard/changes', { params: { since } }),
+  // Monte Carlo title / top-3 odds for every player over the remaining fixtures
+  // (players' runs only count predictions on fixtures that have kicked off)
+  getProjection: (params) => api.get('/leaderboard/projection', { params }),
+  // Standings under hypothetical results: [{ fixture_id, actual_home, actual_away }]
+  whatIf: (results) => api.post('/leaderboard/what-if', { results }),
+};
+
+// ============================================================================
+// Mini-leagues API
+// ============================================================================
+
+export const leaguesAPI = {
+  getMine: () => api.get('/leagues/mine'),
+  create: (name) => api.post('/leagues', { name }),
+  // Invite tokens are reusable until rotated; joining twice is a no-op
+  join: (token) => api.post('/leagues/join', { token }),
+  getLeaderboard: (leagueId) => api.get(`/leagues/${leagueId}/leaderboard`),
+  rotateInvite: (leagueId) => api.post(`/leagues/${leagueId}/invite/rotate`),
+  leave: (leagueId) => api.delete(`/leagues/${leagueId}/members/me`),
 };
 
 // ============================================================================
@@ -112,12 +172,21 @@ export const settingsAPI = {
   update: (key, value) => api.put(`/settings/${key}`, { value }),
 };
 
+export const seasonsAPI = {
+  // { active, archived: [{ season, season_name, champion, ... }] }
+  getAll: () => api.get('/seasons'),
+  getStandings: (season) => api.get(`/seasons/${season}/standings`),
+};
+
 // ============================================================================
 // Admin API
 // ============================================================================
 
 export const adminAPI = {
   getOverview: () => api.get('/admin/overview'),
+  // Freezes the active season and starts nextSeason; force skips the all-scored check
+  archiveSeason: (nextSeason, force = false) =>
+    api.post('/admin/seasons/archive', { next_season: nextSeason, force }),
   getUsers: () => api.get('/admin/users'),
   updateUserRole: (userId, role) => api.patch(`/admin/users/${userId}/role`, { role }),
   deleteUser: (userId) => api.delete(`/admin/users/${userId}`),
@@ -127,15 +196,19 @@ export const adminAPI = {
     api.get('/admin/predictions', { params: gameweek != null ? { gameweek } : {} }),
   getMissingPredictions: (gameweek) =>
     api.get('/admin/missing-predictions', { params: gameweek != null ? { gameweek } : {} }),
+  // Missing counts for every open gameweek in one call (matrix shape).
+  getMissingPredictionsAllOpen: () =>
+    api.get('/admin/missing-predictions', { params: { all_open: true } }),
   updateFixtureStatus: (fixtureId, status) =>
     api.patch(`/admin/fixtures/${fixtureId}/status`, { status }),
   // CSV fixture upload. The instance default Content-Type (application/json)
   // must be removed so the browser sets multipart/form-data with its boundary.
-  uploadFixtures: (file, replace = true) => {
+  // dryRun=true returns a diff against existing fixtures without writing.
+  uploadFixtures: (file, replace = true, dryRun = false) => {
     const formData = new FormData();
     formData.append('file', file);
     return api.post('/admin/fixtures/upload', formData, {
-      params: { replace },
+      params: { replace, dry_run: dryRun },
       headers: { 'Content-Type': undefined },
     });
   },
@@ -145,7 +218,7 @@ export const adminAPI = {
   moveFixture: (fixtureId, gameweek) => api.patch(`/admin/fixtures/${fixtureId}/gameweek`, { gameweek }),
   deleteFixture: (fixtureId, force = false) => api.delete(`/admin/fixtures/${fixtureId}`, { params: { force } }),
   // Fixture sync (football-data.org preview + apply)
-  getFixtureSync: () => api.get('/admin/fixtures/sync/preview'),
+  getFixtureSync: (refresh = false) => api.get('/admin/fixtures/sync/preview', { params: { refresh } }),
   applyFixtureSync: (data) => api.post('/admin/fixtures/sync/apply', data),
   // Invites
   getInvites: () => api.get('/admin/invites'),